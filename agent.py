@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+import os
+import time
+import socket
+import argparse
+
+from lib.remote_executor import RemoteAgent, RemoteExecutor
+
+# Worker of the remote backend, it executes the nodes of the flows with BACKEND "remote"
+# The folders of the flows must be at the same paths in all the hosts
+def get_script_paths(base_path):
+    script_paths = []
+    for root, dirs, files in os.walk(os.path.join(base_path, "component")):
+        for file in files:
+            if file.endswith(".py"):
+                script_paths.append(os.path.join(root, file))
+    return sorted(script_paths)
+
+def parse_arguments():
+    # Create argument parser
+    parser = argparse.ArgumentParser()
+
+    # Optional arguments with parameter
+    parser.add_argument("--address", type=str, help="REMOTE_ADDRESS of the flows, host:port", default="127.0.0.1:50000")
+    parser.add_argument("--authkey", type=str, help="REMOTE_AUTHKEY of the flows, default the environment variable {}".format(RemoteExecutor.ENVIRONMENT_VARIABLE), default=os.environ.get(RemoteExecutor.ENVIRONMENT_VARIABLE))
+    parser.add_argument("--workers", type=int, help="Nodes executed at the same time by this agent and CPU tokens of its host, default CPU count", default=os.cpu_count())
+
+    # Optional arguments without parameter
+    parser.add_argument("--once", help="Exit when the flow is finished, otherwise it waits for the next one", action="store_true")
+
+    # Others
+    parser.add_argument("--version", help="Check Version", action="version", version='%(prog)s - Version 1.0')
+
+    # Parse arguments
+    args = vars(parser.parse_args())
+    # There is no default secret, any host reaching the address could execute commands
+    if not args["authkey"]:
+        parser.error("--authkey or {} is required".format(RemoteExecutor.ENVIRONMENT_VARIABLE))
+
+    return args
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    base_path = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+    agent = RemoteAgent(
+        args["address"],
+        args["authkey"],
+        args["workers"],
+        os.path.join(base_path, "execution", ".agent", "{}_{}".format(socket.gethostname(), os.getpid())),
+        get_script_paths(base_path)
+    )
+
+    while True:
+        try:
+            agent.run()
+            if args["once"]:
+                break
+        except (EOFError, ConnectionError):
+            # No flow running, the coordinator is started with the flow
+            time.sleep(1)
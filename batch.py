@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+import os
+import time
+import argparse
+import threading
+
+import concurrent.futures
+
+from concurrent.futures.process import BrokenProcessPool
+
+from lib.utils import *
+from lib.cpu_tokens import CPUTokens
+from lib.flow_trace import FlowTrace
+from lib.execution_lock import ExecutionLock
+from lib.log_writer import LogWriter, QueueLogHandler
+
+from main import DataProcessExecutor
+
+# Many flows, or the same flow with many ids, executed with one pool
+# Each flow keeps its nodes, manifest, log and trace, the nodes are identified by flow id and node
+class DataProcessBatch:
+
+    def __init__(self, args):
+        self._args = args
+        self._id = "_".join(["batch", self._args["id"]])
+
+        self._BASE_PATH = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+        self._LOG_PATH = os.path.join(self._BASE_PATH, "log")
+        self._EXECUTION_PATH = os.path.join(self._BASE_PATH, "execution")
+
+        create_if_not_exists_folders([
+            self._LOG_PATH
+        ])
+
+        self.__batch_flows = []
+        for file in self._args["file"]:
+            for flow_id in self._args["flow_id"] or [None]:
+                self.__batch_flows.append(DataProcessExecutor({
+                    "file" : file,
+                    "id" : "_".join(value for value in [self._args["id"], flow_id] if value is not None),
+                    "resume" : None,
+                    "execution_mode" : self._args["execution_mode"],
+                    "show_command" : False,
+                    "keep_going" : self._args["keep_going"]
+                }))
+
+        for flow in self.__batch_flows:
+            self._check_backend(flow)
+
+        flow_ids = [ flow._get_id() for flow in self.__batch_flows ]
+        for flow_id in flow_ids:
+            if flow_ids.count(flow_id) > 1:
+                raise ImportError("Flow {} duplicated in the batch".format(flow_id))
+
+        # One pool for all the flows, so all of them are executed the same way
+        execution_modes = set(flow._get_execution_mode() for flow in self.__batch_flows)
+        if len(execution_modes) != 1:
+            raise ImportError("Flows with different EXECUTION_MODE {}, use --execution-mode".format(", ".join(sorted(execution_modes))))
+        self._execution_mode = execution_modes.pop()
+
+        self._workers = self._args["workers"] or os.cpu_count()
+        self._cpu_budget = self._args["cpu_budget"] or max(self._workers, os.cpu_count())
+
+        self._logger = self._get_logger(os.path.join(self._LOG_PATH, self._id + ".log"))
+
+        self.log_info("Batch Initialized")
+        self.log_info("Flows: {}".format(", ".join(flow_ids)))
+
+    def log_info(self, message):
+        self._logger.info("{} ~> {}".format(self._id, message))
+
+    def log_error(self, message):
+        self._logger.error("{} ~> {}".format(self._id, message))
+
+    def _get_logger(self, log_file):
+        logger_key = "flow"
+        fileConfig(
+            os.path.join(self._BASE_PATH, "config", "logging.ini"),
+            defaults={'LOG_FILE' : log_file},
+            disable_existing_loggers=False
+        )
+        logger = logging.getLogger("{}_{}".format(logger_key, self._id))
+        logger.handlers = [ QueueLogHandler(LogWriter.get_writer(log_file, list(logging.getLogger(logger_key).handlers))) ]
+        logger.propagate = False
+        return logger
+
+    # Namespaced id of a node of the batch
+    def _get_node_id(self, flow, node):
+        return "{}/{}".format(flow._get_id(), node)
+
+    def _get_script_paths(self):
+        return [ script_path for flow in self.__batch_flows for script_path in flow._get_script_paths() ]
+
+    def _get_executor_size(self):
+        return self._workers + sum(flow._get_executor_size() - flow._get_workers() for flow in self.__batch_flows)
+
+    def __create_executor(self):
+        return DataProcessExecutor._create_executor(self._execution_mode, self._get_executor_size(), self._get_script_paths())
+
+    def __recreate_executor(self):
+        self.log_info("Executor broken, a new one is created")
+        self.__executor.shutdown(wait=True)
+        self.__executor = self.__create_executor()
+        for flow in self._flows:
+            flow._set_executor(self.__executor)
+
+    # Requests from other threads are seen on the next iteration of the loop
+    def _wake_up(self):
+        with self.__wake_lock:
+            if not self.__wake.done():
+                self.__wake.set_result(True)
+
+    def __get_running_components(self):
+        return {
+            future : flow
+            for flow in self._flows
+            for future in flow._get_running_components()
+        }
+
+    # Fair share of the workers, the flow with less running nodes submits first
+    # On a tie, the flow with less nodes submitted, so a big flow does not delay the small ones
+    def __submit_ready_components(self):
+        blocked_flows = set()
+        while len(self.__get_running_components()) < self._workers:
+            flows = [
+                flow
+                for flow in self._flows
+                if flow not in blocked_flows and flow._can_submit()
+            ]
+            if len(flows) == 0:
+                break
+
+            flow = min(flows, key=lambda flow : (len(flow._get_running_components()), self.__submitted[flow._get_id()]))
+            try:
+                if flow._submit_next():
+                    self.__submitted[flow._get_id()] += 1
+                else:
+                    # Waits for CPU tokens, the other flows can still submit smaller nodes
+                    blocked_flows.add(flow)
+            except BrokenProcessPool:
+                self.__recreate_executor()
+
+    def __finish_flows(self):
+        for flow in list(self._flows):
+            if not flow._is_pending():
+                self._flows.remove(flow)
+                self._returncodes[flow._get_id()] = flow._finish()
+                flow._close_logger()
+                self._on_flow_finished(flow, self._returncodes[flow._get_id()])
+
+    def _on_node_finished(self, flow, node, future):
+        if not future.cancelled() and future.exception() is None:
+            self.__trace.set_result(self._get_node_id(flow, node), future.result())
+
+    def _on_flow_finished(self, flow, returncode):
+        self.log_info("Flow {} finished with result {}".format(flow._get_id(), returncode))
+
+    # Requests received by _wake_up, none in a batch
+    def _on_wake(self):
+        pass
+
+    def _is_active(self):
+        return len(self._flows) > 0
+
+    # CPU tokens, pool and trace shared by all the flows
+    def _start(self):
+        # The folder of the CPU tokens is not collected by the flows while it runs
+        self._execution_lock = ExecutionLock(os.path.join(self._EXECUTION_PATH, self._id, ".lock"))
+        self._execution_lock.acquire()
+        self._cpu_tokens = CPUTokens(os.path.join(self._EXECUTION_PATH, self._id, ".cpu_tokens"), self._cpu_budget)
+        # Inherited by the workers and the components
+        os.environ[CPUTokens.ENVIRONMENT_VARIABLE] = self._cpu_tokens.get_path()
+
+        self._flows = []
+        self._returncodes = {}
+        self.__submitted = {}
+        self.__wake = concurrent.futures.Future()
+        self.__wake_lock = threading.Lock()
+        self.__trace = FlowTrace(self._id, self._workers)
+        self.__executor = self.__create_executor()
+
+    # Starts all the workers of the pool, otherwise they are started with the first nodes
+    def _warm_up(self):
+        concurrent.futures.wait([ self.__executor.submit(time.sleep, 0.1) for idx in range(self._get_executor_size()) ])
+
+    # The nodes of all the flows are executed by the local pool, the BACKEND of a flow would be ignored
+    def _check_backend(self, flow):
+        if flow._get_backend() != "local":
+            raise ImportError("Flow {} with BACKEND {}, only the local backend is supported".format(flow._get_id(), flow._get_backend()))
+
+    def _add_flow(self, flow):
+        self._check_backend(flow)
+        if not flow._check():
+            raise RuntimeError("Flow {} check failed".format(flow._get_id()))
+        flow._prepare(self._cpu_tokens)
+        flow._set_executor(self.__executor)
+        self.__submitted[flow._get_id()] = 0
+        self._flows.append(flow)
+
+    def _loop(self):
+        try:
+            self.__finish_flows()
+            self.__submit_ready_components()
+            while self._is_active():
+                running_components = self.__get_running_components()
+
+                # While cancelling, the signals are sent again until every node is stopped
+                # Without running nodes, the CPU tokens are taken outside of this batch
+                timeout = None
+                if any(flow._is_cancelled() for flow in self._flows) or (len(running_components) == 0 and len(self._flows) > 0):
+                    timeout = 0.1
+                done, not_done = concurrent.futures.wait(
+                    list(running_components) + [self.__wake],
+                    timeout=timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                with self.__wake_lock:
+                    woken_up = self.__wake.done()
+                    if woken_up:
+                        self.__wake = concurrent.futures.Future()
+                if woken_up:
+                    self._on_wake()
+
+                broken = False
+                for future in done:
+                    if future not in running_components:
+                        continue
+                    flow = running_components[future]
+                    # A worker died, the pool does not execute more nodes
+                    broken = broken or (not future.cancelled() and isinstance(future.exception(), BrokenProcessPool))
+                    node = flow._get_running_components()[future]
+                    node_future = flow._on_future_done(future)
+                    # Otherwise its cache key was computed and it is executed now
+                    if node_future is not None:
+                        self._on_node_finished(flow, node, node_future)
+                for flow in self._flows:
+                    flow._signal_cancelled_components()
+                if broken:
+                    self.__recreate_executor()
+
+                self.__finish_flows()
+                self.__submit_ready_components()
+        except KeyboardInterrupt:
+            self.log_error("Batch interrupted")
+            for flow in self._flows:
+                flow._cancel()
+            raise
+        finally:
+            self.__executor.shutdown(wait=True)
+            for flow in self._flows:
+                self._returncodes[flow._get_id()] = flow._finish()
+                flow._close_logger()
+            self.log_info("Trace: {}".format(self.__trace.export_chrome_trace(os.path.join(self._LOG_PATH, self._id + "_trace.json"))))
+            self.log_info(self.__trace.get_summary())
+            self._execution_lock.release()
+
+    def run(self):
+        for flow in self.__batch_flows:
+            if not flow._check():
+                raise RuntimeError("Flow {} check failed".format(flow._get_id()))
+
+        self.log_info("Start Batch")
+        batch_start_time = time.time()
+
+        self._start()
+        for flow in self.__batch_flows:
+            self._add_flow(flow)
+        self._loop()
+
+        failed_flows = sorted(flow_id for flow_id, returncode in self._returncodes.items() if returncode != 0)
+        self.log_info("End Batch, {} flows in {:.3f}s".format(len(self._returncodes), time.time() - batch_start_time))
+        if len(failed_flows) > 0:
+            self.log_error("Flows failed: {}".format(", ".join(failed_flows)))
+            return 1
+        return 0
+
+def parse_arguments():
+    # Create argument parser
+    parser = argparse.ArgumentParser()
+
+    # Positional mandatory arguments
+    parser.add_argument("file", help="Flow Configuration files", type=str, nargs="+")
+
+    # Optional arguments with parameter
+    parser.add_argument("--id", type=str, help="Batch ID", default=get_time(dateformat="%Y%m%d%H%M%S"))
+    parser.add_argument("--flow-id", type=str, help="Execution ID of each flow, every flow is executed once per ID", action="append")
+    parser.add_argument("--workers", type=int, help="Nodes executed at the same time by all the flows, default CPU count")
+    parser.add_argument("--cpu-budget", type=int, help="CPU tokens shared by all the flows, default the workers or the CPU count if higher")
+    parser.add_argument("--execution-mode", type=str, help="Overwrite EXECUTION_MODE of the flows", choices=["subprocess", "inprocess"])
+
+    # Optional arguments without parameter
+    parser.add_argument("--keep-going", help="Execute the components that do not depend on a failed component", action="store_true")
+
+    # Others
+    parser.add_argument("--version", help="Check Version", action="version", version='%(prog)s - Version 1.0')
+
+    # Parse arguments
+    return vars(parser.parse_args())
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    # Stopped as with Ctrl+C, the nodes are cancelled before the process ends
+    handle_termination_signals()
+    data_process_batch = DataProcessBatch(args)
+    exit(data_process_batch.run())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time of csv_filter on a process pool by size of the input
+# line: one task per line and its result waited before the next one, as the filter did before
+# chunks: tasks of BATCH_BYTES of the file, the workers read the lines and return the text of the matched ones
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from collections import OrderedDict
+
+import concurrent.futures
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "lib")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "component")))
+
+from utils import read_file_line_by_line
+from async_component import FileChunk, _process_chunk
+from csv_filter import CSVFilterComponent
+
+CONDITIONS = [ [ "equals($2, 'aaa')", "greater_than($1, '5')" ], [ "equals($2, 'bbb')" ] ]
+
+def generate_input(filepath, size):
+    values = ["aaa", "bbb", "ccc"]
+    with open(filepath, "w") as fw:
+        fw.write("id,name,value\n")
+        idx = 0
+        while fw.tell() < size:
+            fw.write("{},{},{}\n".format(idx, values[idx % len(values)], idx * 7))
+            idx += 1
+
+def run_line(executor, filepath, output_filepath):
+    lines = read_file_line_by_line(filepath)
+    header = next(lines).split(",")
+    with open(output_filepath, "w") as fw:
+        for line in lines:
+            line = OrderedDict((header[idx], field) for idx, field in enumerate(line.split(",")))
+            if executor.submit(CSVFilterComponent.check_line, line, CONDITIONS).result():
+                fw.write("{}\n".format(",".join(line.values())))
+
+def run_chunks(executor, filepath, output_filepath, batch_bytes):
+    with open(filepath, "rb") as fr:
+        header = fr.readline().decode("utf-8").strip().split(",")
+        size = os.fstat(fr.fileno()).st_size
+        chunks = []
+        start = fr.tell()
+        while start < size:
+            fr.seek(min(start + batch_bytes, size))
+            fr.readline()
+            chunks.append(FileChunk(filepath, start, fr.tell()))
+            start = fr.tell()
+
+    futures = [ executor.submit(_process_chunk, CSVFilterComponent.filter_lines, chunk, (header, ",", ",", CONDITIONS)) for chunk in chunks ]
+    with open(output_filepath, "w") as fw:
+        for future in futures:
+            fw.write(future.result())
+
+def measure(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256 * 1024, 1024 * 1024, 4 * 1024 * 1024], help="Bytes of the input")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers of the pool")
+    parser.add_argument("--batch-bytes", type=int, default=1024 * 1024, help="Bytes of the chunks")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    print("CPUs: {}, workers: {}, batch bytes: {}".format(os.cpu_count(), args["workers"], args["batch_bytes"]))
+    print("| Bytes | line(s) | chunks(s) | Speedup |")
+    print("| ----- | ------- | --------- | ------- |")
+    for size in args["sizes"]:
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "input.csv")
+            generate_input(filepath, size)
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=args["workers"]) as executor:
+                # The workers are started before the measures
+                executor.submit(len, []).result()
+                line_seconds = measure(run_line, executor, filepath, os.path.join(directory, "line.csv"))
+                chunks_seconds = measure(run_chunks, executor, filepath, os.path.join(directory, "chunks.csv"), args["batch_bytes"])
+
+            with open(os.path.join(directory, "line.csv")) as fr_line, open(os.path.join(directory, "chunks.csv")) as fr_chunks:
+                if fr_line.read() != fr_chunks.read():
+                    raise AssertionError("Different outputs for {} bytes".format(size))
+
+        print("| {} | {:.4f} | {:.4f} | {:.1f}x |".format(size, line_seconds, chunks_seconds, line_seconds / chunks_seconds))
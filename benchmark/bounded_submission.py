@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Peak memory of the pending tasks and their results by number of tasks, as csv_aggregator and csv_matcher_compare_by_key submit them
+# unbounded: all the tasks submitted and their results read at the end, as the components did before
+# bounded: at most IN_FLIGHT tasks pending, as AsyncComponent._submit_bounded
+import os
+import time
+import argparse
+import tracemalloc
+
+import concurrent.futures
+
+# Records of a key and the line of its result
+def aggregate(key, size):
+    records = [ "{},{}".format(key, idx) for idx in range(size // 8) ]
+    return "{},{}\n".format(key, len(records)) * (size // 16)
+
+def run_unbounded(executor, tasks, size, in_flight):
+    futures = [ executor.submit(aggregate, key, size) for key in range(tasks) ]
+    written = 0
+    for future in concurrent.futures.as_completed(futures):
+        written += len(future.result())
+    return written
+
+def run_bounded(executor, tasks, size, in_flight):
+    pending = set()
+    written = 0
+    for key in range(tasks):
+        if len(pending) >= in_flight:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            written += sum(len(future.result()) for future in done)
+        pending.add(executor.submit(aggregate, key, size))
+    for future in concurrent.futures.as_completed(pending):
+        written += len(future.result())
+    return written
+
+# Seconds and peak of bytes allocated
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.time()
+    function(*args)
+    seconds = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 30000], help="Tasks submitted")
+    parser.add_argument("--size", type=int, default=4096, help="Bytes of the result of a task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers of the pool")
+    parser.add_argument("--in-flight", type=int, default=None, help="Pending tasks of bounded, twice the workers by default")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    in_flight = args["in_flight"] or 2 * args["workers"]
+
+    print("CPUs: {}, workers: {}, in flight: {}".format(os.cpu_count(), args["workers"], in_flight))
+    print("| Tasks | unbounded(s) | unbounded(MB) | bounded(s) | bounded(MB) |")
+    print("| ----- | ------------ | ------------- | ---------- | ----------- |")
+    for tasks in args["tasks"]:
+        results = []
+        for run in [run_unbounded, run_bounded]:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=args["workers"]) as executor:
+                results.append(measure(run, executor, tasks, args["size"], in_flight))
+        print("| {} | {} |".format(tasks, " | ".join("{:.4f} | {:.1f}".format(seconds, peak / 1024 / 1024) for seconds, peak in results)))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time taken by a node to clean the output of its previous execution before starting its work
+# rmtree: deleted by the node, trash: moved to the trash and deleted by the background thread of the flow
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
+from lib.trash import Trash
+
+# Like the temporary files of a sort, many small files in some folders
+def generate_output(path, files, size):
+    os.makedirs(path)
+    content = "x" * size
+    for idx in range(files):
+        folder = os.path.join(path, "part_{}".format(idx // 1000))
+        if idx % 1000 == 0:
+            os.makedirs(folder)
+        with open(os.path.join(folder, "chunk_{}.csv".format(idx)), "w") as fw:
+            fw.write(content)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000], help="Files of the previous output")
+    parser.add_argument("--size", type=int, default=1024, help="Bytes of each file")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    print("| Files | rmtree(s) | trash move(s) | background delete(s) |")
+    print("| ----- | --------- | ------------- | -------------------- |")
+    for files in args["files"]:
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "C001_output")
+
+            generate_output(output_path, files, args["size"])
+            start = time.time()
+            shutil.rmtree(output_path)
+            rmtree_seconds = time.time() - start
+
+            trash = Trash(os.path.join(directory, ".trash"))
+            generate_output(output_path, files, args["size"])
+            start = time.time()
+            trash.move(output_path)
+            move_seconds = time.time() - start
+
+            start = time.time()
+            trash.start()
+            trash.stop(wait=True)
+            background_seconds = time.time() - start
+
+        print("| {} | {:.4f} | {:.4f} | {:.4f} |".format(files, rmtree_seconds, move_seconds, background_seconds))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Modules imported by a component process with -X importtime, ordered by cumulative time
+# Python 3.7 or later is needed for -X importtime
+import os
+import sys
+import argparse
+import subprocess
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+def get_import_times(module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        cwd=os.path.join(BASE_PATH, "lib"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+    # import time: self [us] | cumulative | imported package
+    import_times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        import_times.append((name.strip(), int(self_time), int(cumulative_time), len(name) - len(name.lstrip())))
+    return import_times
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", type=str, default="component", help="Module of lib imported by the components")
+    parser.add_argument("--top", type=int, default=20, help="Modules shown")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    import_times = get_import_times(args["module"])
+
+    print("Import of {}: {:.1f}ms".format(args["module"], sum(self_time for name, self_time, cumulative_time, level in import_times) / 1000))
+    print("| Module | Self(ms) | Cumulative(ms) |")
+    print("| ------ | -------- | -------------- |")
+    for name, self_time, cumulative_time, level in sorted(import_times, key=lambda import_time : -import_time[2])[:args["top"]]:
+        print("| {} | {:.1f} | {:.1f} |".format(name, self_time / 1000, cumulative_time / 1000))
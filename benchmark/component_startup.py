@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Latency of a component that does nothing, sleep.py with 0 seconds, compared with an empty interpreter
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+def measure(command, runs):
+    seconds = []
+    for idx in range(runs):
+        start = time.time()
+        subprocess.check_call(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        seconds.append(time.time() - start)
+    return sorted(seconds)[len(seconds) // 2]
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20, help="Executions of each command, the median is shown")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Node file as written by the compiled plan of the flow
+        node_file = os.path.join(directory, "node.json")
+        with open(node_file, "w") as fw:
+            json.dump({ "name" : "sleep", "config" : { "seconds" : 0 }, "script" : "sleep.py", "type" : "component" }, fw)
+
+        results = [
+            ("python", measure([sys.executable, "-c", "pass"], args["runs"])),
+            ("import component", measure([sys.executable, "-c", "import sys; sys.path.append('{}'); import component".format(os.path.join(BASE_PATH, "lib"))], args["runs"])),
+            ("empty component", measure([
+                sys.executable, os.path.join(BASE_PATH, "component", "sleep.py"),
+                "-z", "benchmark", "--id", "benchmark_component_startup", "-f", node_file, "-n", node_file
+            ], args["runs"]))
+        ]
+
+    print("Runs: {}".format(args["runs"]))
+    for name, seconds in results:
+        print("{} {:10.1f}ms".format(name.ljust(20), 1000 * seconds))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Compare the latency of a flow of one empty node executed by main.py and submitted to the daemon
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from collections import OrderedDict
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+def generate_flow(directory):
+    flow = OrderedDict([
+        ("nodes", {
+            "N00000" : {
+                "name" : "sleep",
+                "config" : { "seconds" : 0, "LOGGING_LEVEL" : "ERROR" },
+                "script" : "sleep.py",
+                "type" : "component"
+            }
+        }),
+        ("dependencies", {}),
+        ("LOGGING_LEVEL", "ERROR"),
+        ("WORKERS", 1)
+    ])
+
+    filepath = os.path.join(directory, "benchmark_daemon_latency.json")
+    with open(filepath, "w") as fw:
+        json.dump(flow, fw, indent=4)
+    return filepath
+
+def measure(command, runs):
+    seconds = []
+    for idx in range(runs):
+        start = time.time()
+        subprocess.check_call(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        seconds.append(time.time() - start)
+    return sorted(seconds)[len(seconds) // 2]
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10, help="Executions of the flow, the median is shown")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with tempfile.TemporaryDirectory() as directory:
+        flow_file = generate_flow(directory)
+        socket_path = os.path.join(directory, "daemon.sock")
+
+        daemon = subprocess.Popen(
+            [sys.executable, os.path.join(BASE_PATH, "daemon.py"), "--socket", socket_path, "--workers", "2"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.1)
+
+            results = [
+                ("main.py", measure([sys.executable, os.path.join(BASE_PATH, "main.py"), flow_file], args["runs"])),
+                ("main.py inprocess", measure([sys.executable, os.path.join(BASE_PATH, "main.py"), flow_file, "--execution-mode", "inprocess"], args["runs"])),
+                ("client.py", measure([sys.executable, os.path.join(BASE_PATH, "client.py"), "submit", flow_file, "--socket", socket_path], args["runs"]))
+            ]
+
+            subprocess.check_call([sys.executable, os.path.join(BASE_PATH, "client.py"), "stop", "--socket", socket_path], stdout=subprocess.DEVNULL)
+        finally:
+            daemon.wait()
+
+    print("Runs: {}".format(args["runs"]))
+    for name, seconds in results:
+        print("{} {:10.1f}ms".format(name.ljust(20), 1000 * seconds))
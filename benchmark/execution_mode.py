@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Compare the startup cost of the execution modes with a flow of many small nodes
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
+from main import DataProcessExecutor
+
+def generate_flow(directory, nodes, workers):
+    flow = OrderedDict([
+        ("nodes", OrderedDict(
+            ("N{}".format(str(idx).zfill(5)), {
+                "name" : "sleep",
+                "config" : { "seconds" : 0, "LOGGING_LEVEL" : "ERROR" },
+                "script" : "sleep.py",
+                "type" : "component"
+            })
+            for idx
+            in range(nodes)
+        )),
+        ("dependencies", {}),
+        ("LOGGING_LEVEL", "ERROR"),
+        ("WORKERS", workers)
+    ])
+
+    filepath = os.path.join(directory, "benchmark_execution_mode.json")
+    with open(filepath, "w") as fw:
+        json.dump(flow, fw, indent=4)
+    return filepath
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100, help="Number of nodes of the flow")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Flow WORKERS")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        flow_file = generate_flow(directory, args["nodes"], args["workers"])
+        for execution_mode in ["subprocess", "inprocess"]:
+            start = time.time()
+            DataProcessExecutor({
+                "file" : flow_file,
+                "id" : "benchmark_{}".format(execution_mode),
+                "show_command" : False,
+                "execution_mode" : execution_mode
+            }).run()
+            results.append((execution_mode, time.time() - start))
+
+    print("Nodes: {}, Workers: {}".format(args["nodes"], args["workers"]))
+    for execution_mode, seconds in results:
+        print("{} {:10.3f}s {:10.2f}ms/node".format(execution_mode.ljust(12), seconds, 1000 * seconds / args["nodes"]))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time of the EXECUTOR kinds of AsyncComponent by size of the input, the pool is started inside the measure
+# cpu: lines parsed and hashed by chunks, like the filters and converters of csv
+# io: gzip files decompressed, like packing
+# The crossover is the first size where the pool is faster than inline, the default EXECUTOR_INLINE_BYTES of auto
+import os
+import sys
+import gzip
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+import concurrent.futures
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "lib")))
+
+from task_executors import InlineExecutor, LazyExecutor
+
+CHUNK_LINES = 1000
+
+def create_executor(kind, workers):
+    if kind == "inline":
+        return InlineExecutor()
+    if kind == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+def hash_lines(lines):
+    return sum(int(hashlib.md5(line.encode("utf-8")).hexdigest()[:4], 16) for line in lines for field in line.split(","))
+
+def decompress(source, destination):
+    with gzip.open(source, "rb") as f_in, open(destination, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+def run_cpu(kind, workers, lines):
+    executor = LazyExecutor(lambda : create_executor(kind, workers))
+    futures = [ executor.submit(hash_lines, lines[idx:idx + CHUNK_LINES]) for idx in range(0, len(lines), CHUNK_LINES) ]
+    result = sum(future.result() for future in futures)
+    executor.shutdown(wait=True)
+    return result
+
+def run_io(kind, workers, files, destination):
+    executor = LazyExecutor(lambda : create_executor(kind, workers))
+    futures = [ executor.submit(decompress, filepath, os.path.join(destination, "{}.csv".format(idx))) for idx, filepath in enumerate(files) ]
+    for future in futures:
+        future.result()
+    executor.shutdown(wait=True)
+
+def measure(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024], help="Bytes of the input")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers of the pools")
+    parser.add_argument("--files", type=int, default=8, help="Files of the io input")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    kinds = ["inline", "thread", "process"]
+    line = "12345,abcdefghij,2024-01-01,987.65,some text of the line"
+
+    print("CPUs: {}, workers: {}".format(os.cpu_count(), args["workers"]))
+    for work in ["cpu", "io"]:
+        crossover = None
+        print("\n{}".format(work))
+        print("| Bytes | {} |".format(" | ".join("{}(s)".format(kind) for kind in kinds)))
+        print("| ----- | {} |".format(" | ".join("-" * (len(kind) + 3) for kind in kinds)))
+        for size in args["sizes"]:
+            seconds = {}
+            with tempfile.TemporaryDirectory() as directory:
+                if work == "cpu":
+                    lines = [ line ] * max(1, size // (len(line) + 1))
+                    for kind in kinds:
+                        seconds[kind] = measure(run_cpu, kind, args["workers"], lines)
+                else:
+                    files = []
+                    content = "\n".join([ line ] * max(1, size // args["files"] // (len(line) + 1))).encode("utf-8")
+                    for idx in range(args["files"]):
+                        files.append(os.path.join(directory, "{}.csv.gz".format(idx)))
+                        with gzip.open(files[-1], "wb") as fw:
+                            fw.write(content)
+                    for kind in kinds:
+                        destination = os.path.join(directory, kind)
+                        os.makedirs(destination)
+                        seconds[kind] = measure(run_io, kind, args["workers"], files, destination)
+
+            pool = "process" if work == "cpu" else "thread"
+            if crossover is None and seconds[pool] < seconds["inline"]:
+                crossover = size
+            print("| {} | {} |".format(size, " | ".join("{:.4f}".format(seconds[kind]) for kind in kinds)))
+        print("Crossover of {} over inline: {}".format(pool, crossover if crossover is not None else "not reached"))
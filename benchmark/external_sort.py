@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time and peak memory of sort_files on large inputs by SORT_MEMORY_MB
+# The component is executed as in a flow, the runs and the merge passes are taken from its metrics
+# Peak MB: the largest resident memory of the component and its workers
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+# Executes the command given and prints the largest resident memory of its processes in KB
+PEAK_MEMORY = "import resource, subprocess, sys; subprocess.check_call(sys.argv[1:]); print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)"
+
+def generate_input(filepath, size):
+    with open(filepath, "w") as fw:
+        fw.write("id,name,value\n")
+        while fw.tell() < size:
+            fw.write("".join("{},name_{},{}\n".format(random.randrange(10 ** 9), idx % 1000, idx) for idx in range(10000)))
+
+def check_sorted(filepath):
+    with open(filepath, "r") as fr:
+        fr.readline()
+        previous = None
+        rows = 0
+        for line in fr:
+            key = line.split(",")[0]
+            if previous is not None and key < previous:
+                return False, rows
+            previous = key
+            rows += 1
+    return True, rows
+
+def run(directory, input_path, memory, fan_in, workers):
+    execution_id = "benchmark_external_sort_{}".format(memory)
+    node_file = os.path.join(directory, "node.json")
+    with open(node_file, "w") as fw:
+        json.dump({
+            "name" : "sort",
+            "config" : { "key" : [1], "SORT_MEMORY_MB" : memory, "SORT_FAN_IN" : fan_in, "WORKERS" : workers, "LOGGING_LEVEL" : "ERROR" },
+            "script" : "sort_files.py",
+            "type" : "component"
+        }, fw)
+
+    start = time.time()
+    peak = subprocess.check_output([
+        sys.executable, "-c", PEAK_MEMORY,
+        sys.executable, os.path.join(BASE_PATH, "component", "sort_files.py"),
+        "-z", "S001", "--id", execution_id, "-f", node_file, "-n", node_file, "-i", input_path
+    ], stderr=subprocess.DEVNULL)
+    seconds = time.time() - start
+
+    execution_path = os.path.join(BASE_PATH, "execution", execution_id)
+    output_path = os.path.join(execution_path, "S001_sort")
+    with open(output_path + ".metrics.json", "r") as fr:
+        metrics = json.load(fr)
+    is_sorted, rows = check_sorted(os.path.join(output_path, "input.csv"))
+
+    shutil.rmtree(execution_path)
+    # Nothing is logged below ERROR
+    if os.path.exists(os.path.join(BASE_PATH, "log", execution_id + ".log")):
+        os.remove(os.path.join(BASE_PATH, "log", execution_id + ".log"))
+
+    return seconds, int(peak) / 1024, metrics, is_sorted, rows
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10], help="GB of the input")
+    parser.add_argument("--memory", type=float, nargs="+", default=[64, 256, 1024], help="SORT_MEMORY_MB")
+    parser.add_argument("--fan-in", type=int, default=64, help="SORT_FAN_IN")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="WORKERS")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    random.seed(0)
+
+    print("CPUs: {}, workers: {}, fan in: {}".format(os.cpu_count(), args["workers"], args["fan_in"]))
+    print("| GB | SORT_MEMORY_MB | Runs | Passes | sort(s) | merge(s) | Total(s) | Peak MB | Sorted |")
+    print("| -- | -------------- | ---- | ------ | ------- | -------- | -------- | ------- | ------ |")
+    for size in args["sizes"]:
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input")
+            os.makedirs(input_path)
+            generate_input(os.path.join(input_path, "input.csv"), int(size * 1024 ** 3))
+
+            for memory in args["memory"]:
+                seconds, peak, metrics, is_sorted, rows = run(directory, input_path, memory, args["fan_in"], args["workers"])
+                print("| {} | {} | {} | {} | {:.1f} | {:.1f} | {:.1f} | {:.0f} | {} |".format(
+                    size,
+                    memory,
+                    metrics["counters"].get("sort_runs", 0),
+                    metrics["counters"].get("merge_passes", 0),
+                    metrics["timers"].get("sort", 0.0),
+                    metrics["timers"].get("merge", 0.0),
+                    seconds,
+                    peak,
+                    "{} rows".format(rows) if is_sorted else "no"
+                ))
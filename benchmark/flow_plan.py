@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Compare the startup cost of a flow of many nodes with and without the compiled plan
+# Without the plan, every component parses the whole flow, so the work of all the nodes grows with nodes x nodes
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
+from lib.utils import json_custom_process
+from lib.flow_plan import FlowPlan
+
+def generate_flow(directory, nodes):
+    flow = OrderedDict([
+        ("nodes", OrderedDict(
+            ("N{}".format(str(idx).zfill(5)), {
+                "name" : "copy",
+                "config" : { "path" : "{base_path}/flow/helloworld/", "match" : [ ".*.xlsx" ], "LOGGING_LEVEL" : "ERROR" },
+                "script" : "copy_files.py",
+                "type" : "component"
+            })
+            for idx
+            in range(nodes)
+        )),
+        ("dependencies", OrderedDict(
+            ("N{}".format(str(idx).zfill(5)), [ "N{}".format(str(idx - 1).zfill(5)) ])
+            for idx
+            in range(1, nodes)
+        )),
+        ("LOGGING_LEVEL", "ERROR"),
+        ("WORKERS", 1)
+    ])
+
+    filepath = os.path.join(directory, "benchmark_flow_plan.json")
+    with open(filepath, "w") as fw:
+        json.dump(flow, fw, indent=4)
+    return filepath
+
+# What each component did before the plan, the whole flow parsed to take its node
+def read_flow(flow_file, node, execution_variables):
+    with open(flow_file, "r") as fr:
+        flow_config = json.load(fr, object_pairs_hook=lambda dictionary : json_custom_process(dictionary, execution_variables))
+    return flow_config["nodes"][node]
+
+def read_node_file(node_file, execution_variables):
+    with open(node_file, "r") as fr:
+        return json.load(fr, object_pairs_hook=lambda dictionary : json_custom_process(dictionary, execution_variables))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=2000, help="Number of nodes of the flow")
+    parser.add_argument("--sample", type=int, default=50, help="Nodes read to estimate the time of all of them")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    execution_variables = { "base_path" : "/tmp" }
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        flow_file = generate_flow(directory, args["nodes"])
+        plans_path = os.path.join(directory, ".plans")
+
+        start = time.time()
+        plan = FlowPlan(plans_path, flow_file)
+        results.append(("compile", time.time() - start))
+
+        start = time.time()
+        plan = FlowPlan(plans_path, flow_file)
+        results.append(("cached plan", time.time() - start))
+
+        nodes = list(plan.get_config()["nodes"])[:args["sample"]]
+        scale = args["nodes"] / len(nodes)
+
+        start = time.time()
+        for node in nodes:
+            read_flow(flow_file, node, execution_variables)
+        results.append(("nodes read flow", scale * (time.time() - start)))
+
+        start = time.time()
+        for node in nodes:
+            read_node_file(plan.get_node_file(node), execution_variables)
+        results.append(("nodes read slice", scale * (time.time() - start)))
+
+    print("Nodes: {}".format(args["nodes"]))
+    for name, seconds in results:
+        print("{} {:10.3f}s".format(name.ljust(20), seconds))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time of the analysis of DirectedGraph with generated flows from 10 to 100k nodes
+# Each node depends on up to 3 of the 50 previous nodes, like the flows generated by scripts
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
+from lib.directed_graph import DirectedGraph
+
+def generate_graph(nodes, seed=0):
+    generator = random.Random(seed)
+    graph = DirectedGraph()
+
+    for idx in range(nodes):
+        graph.add_node(idx, None)
+        for origin in set(generator.randint(max(0, idx - 50), idx - 1) for edge in range(3) if idx > 0):
+            graph.add_edge(origin, idx)
+
+    return graph
+
+def measure(function):
+    start = time.time()
+    function()
+    return time.time() - start
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000], help="Number of nodes of the graphs")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    operations = ["build", "has_cycle", "topological_sort", "get_levels", "get_longest_path", "get_transitive_reduction"]
+
+    print("| Nodes | {} |".format(" | ".join(operations)))
+    print("| ----- | {} |".format(" | ".join("-" * len(operation) for operation in operations)))
+    for nodes in args["sizes"]:
+        seconds = {}
+
+        start = time.time()
+        graph = generate_graph(nodes)
+        seconds["build"] = time.time() - start
+
+        seconds["has_cycle"] = measure(graph.has_cycle)
+        seconds["topological_sort"] = measure(graph.topological_sort)
+        seconds["get_levels"] = measure(graph.get_levels)
+        seconds["get_longest_path"] = measure(graph.get_longest_path)
+        seconds["get_transitive_reduction"] = measure(graph.get_transitive_reduction)
+
+        print("| {} | {} |".format(
+            str(nodes).rjust(5),
+            " | ".join(
+                "{:.4f}".format(seconds[operation]).rjust(len(operation))
+                for operation
+                in operations
+            )
+        ))
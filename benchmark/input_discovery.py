@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time of a node to find its .csv input files in the output of the previous node
+# walk: os.walk with the files filtered after the walk, as the components did before
+# scandir: InputListing walking the folder, listing: InputListing reading the listing written by the previous node
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "lib")))
+
+from input_listing import InputListing
+
+# Output of a node, half of the files are .csv and the others are not inputs of the next node
+def generate_output(path, files, folders):
+    for idx in range(files):
+        folder = os.path.join(path, "part_{}".format(idx % folders))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        open(os.path.join(folder, "chunk_{}.{}".format(idx, "csv" if idx % 2 == 0 else "log")), "w").close()
+
+def walk(path):
+    files = []
+    for root, dirs, filenames in os.walk(path):
+        files = files + [ os.path.join(root, filename) for filename in filenames ]
+    return [ filepath for filepath in files if filepath.endswith(".csv") ]
+
+def measure(function, repeat):
+    start = time.time()
+    for idx in range(repeat):
+        result = function()
+    return (time.time() - start) / repeat, len(result)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 100000], help="Files of the output")
+    parser.add_argument("--folders", type=int, default=10, help="Subfolders of the output")
+    parser.add_argument("--repeat", type=int, default=3, help="Times each discovery is executed")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    print("| Files | walk(s) | scandir(s) | listing(s) | Inputs |")
+    print("| ----- | ------- | ---------- | ---------- | ------ |")
+    for files in args["files"]:
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "C001_output")
+            generate_output(output_path, files, args["folders"])
+
+            walk_seconds, walk_inputs = measure(lambda : walk(output_path), args["repeat"])
+            scandir_seconds, scandir_inputs = measure(lambda : InputListing([output_path], [ r"\.csv$" ]).get_files(), args["repeat"])
+            InputListing.write(output_path)
+            listing_seconds, listing_inputs = measure(lambda : InputListing([output_path], [ r"\.csv$" ]).get_files(), args["repeat"])
+
+            if not walk_inputs == scandir_inputs == listing_inputs:
+                raise AssertionError("Different inputs found: {}, {}, {}".format(walk_inputs, scandir_inputs, listing_inputs))
+
+        print("| {} | {:.4f} | {:.4f} | {:.4f} | {} |".format(files, walk_seconds, scandir_seconds, listing_seconds, walk_inputs))
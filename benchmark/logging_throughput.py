@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Records per second written to the log of an execution by many processes at the same time
+# direct: screen and file handlers called by each log call, queued: handed to the background writer of the log file
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
+from lib.log_writer import LogWriter, QueueLogHandler
+
+FORMAT = "%(asctime)s [%(levelname)-5s] PID-%(process)-8s: %(message)s"
+
+def get_handlers(log_file):
+    handlers = [
+        # The screen of the benchmark is not measured
+        logging.StreamHandler(open(os.devnull, "w")),
+        logging.FileHandler(log_file, "a", None, True)
+    ]
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(FORMAT))
+    return handlers
+
+# Seconds of the log calls and seconds until the records are written
+def log_records(mode, log_file, records):
+    logger = logging.getLogger("benchmark_{}_{}".format(mode, os.getpid()))
+    logger.propagate = False
+    logger.setLevel("INFO")
+    if mode == "queued":
+        logger.handlers = [ QueueLogHandler(LogWriter.get_writer(log_file, get_handlers(log_file))) ]
+    else:
+        logger.handlers = get_handlers(log_file)
+
+    start = time.time()
+    for idx in range(records):
+        logger.info("N{} ~> Record {} of {}".format(os.getpid(), idx, records))
+    calls = time.time() - start
+    for handler in logger.handlers:
+        handler.flush()
+    return calls, time.time() - start
+
+def run(mode, log_file, processes, records):
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(log_records, [ (mode, log_file, records) ] * processes)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4, help="Processes logging at the same time")
+    parser.add_argument("--records", type=int, default=50000, help="Records logged by each process")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ["direct", "queued"]:
+            log_file = os.path.join(directory, "{}.log".format(mode))
+            start = time.time()
+            times = run(mode, log_file, args["processes"], args["records"])
+            total = time.time() - start
+            with open(log_file, "r") as fr:
+                lines = sum(1 for line in fr)
+            results.append((mode, max(calls for calls, written in times), total, lines))
+
+    print("Processes: {}, records by process: {}".format(args["processes"], args["records"]))
+    print("| Mode | Log calls(s) | Total(s) | Records/s | Lines |")
+    print("| ---- | ------------ | -------- | --------- | ----- |")
+    for mode, calls, total, lines in results:
+        print("| {} | {:.3f} | {:.3f} | {:.0f} | {} |".format(mode, calls, total, lines / total, lines))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Time of the tasks of a node by window of tasks in flight, the tasks take a random time as the groups of csv_aggregator
+# completed: results in the order the tasks complete, as AsyncComponent._submit_bounded
+# ordered: results in the order of the tasks with the reorder buffer of ordered_map, the output stays sorted by key
+import os
+import sys
+import time
+import random
+import argparse
+
+import concurrent.futures
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "lib")))
+
+from ordered_map import ordered_map
+
+def task(key, seconds):
+    time.sleep(seconds)
+    return key
+
+def run_completed(executor, tasks, window):
+    pending = set()
+    for args in tasks:
+        if len(pending) >= window:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(task, *args))
+    for future in concurrent.futures.as_completed(pending):
+        yield future.result()
+
+def run_ordered(executor, tasks, window):
+    return ordered_map(executor, task, tasks, window)
+
+# Seconds and if the keys were returned sorted
+def measure(run, workers, tasks, window):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.time()
+        keys = list(run(executor, tasks, window))
+        return time.time() - start, keys == sorted(keys)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks submitted")
+    parser.add_argument("--windows", type=int, nargs="+", default=[4, 16, 64], help="Tasks in flight")
+    parser.add_argument("--workers", type=int, default=4, help="Workers of the pool, threads waiting as the disk")
+    parser.add_argument("--seconds", type=float, default=0.002, help="Mean seconds of a task")
+    return vars(parser.parse_args())
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    random.seed(0)
+    tasks = [ (key, random.expovariate(1 / args["seconds"])) for key in range(args["tasks"]) ]
+
+    print("Tasks: {}, workers: {}, mean seconds: {}".format(args["tasks"], args["workers"], args["seconds"]))
+    print("| Window | completed(s) | completed sorted | ordered(s) | ordered sorted |")
+    print("| ------ | ------------ | ---------------- | ---------- | -------------- |")
+    for window in args["windows"]:
+        results = [ measure(run, args["workers"], tasks, window) for run in [run_completed, run_ordered] ]
+        print("| {} | {} |".format(window, " | ".join("{:.4f} | {}".format(seconds, is_sorted) for seconds, is_sorted in results)))
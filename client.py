@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+# Client of daemon.py, only the standard library is imported so the flows start in milliseconds
+import os
+import json
+import socket
+import argparse
+
+def request(socket_path, message):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(socket_path)
+    try:
+        client.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with client.makefile("r") as fr:
+            for line in fr:
+                yield json.loads(line)
+    finally:
+        client.close()
+
+def print_event(event):
+    if event["event"] == "node":
+        if event["returncode"] is None:
+            print("{} {} failed: {}".format(event["flow"], event["node"], event.get("error", "cancelled")))
+        else:
+            print("{} {} finished with result {} in {:.3f}s".format(event["flow"], event["node"], event["returncode"], event["end"] - event["start"]))
+    elif event["event"] == "accepted":
+        print("{} accepted".format(event["flow"]))
+    elif event["event"] == "flow":
+        print("{} finished with result {}".format(event["flow"], event["returncode"]))
+    elif event["event"] == "status":
+        for flow in event["flows"]:
+            print("{} running {} nodes".format(flow["flow"], flow["running"]))
+    elif event["event"] == "stopping":
+        print("Daemon stopping, waiting for: {}".format(", ".join(event["flows"])))
+    elif event["event"] == "error":
+        print("Error: {}".format(event["message"]))
+
+def parse_arguments():
+    # Create argument parser
+    parser = argparse.ArgumentParser()
+
+    # Positional mandatory arguments
+    parser.add_argument("command", help="Request to the daemon", type=str, choices=["submit", "status", "stop"])
+    parser.add_argument("file", help="Flow Configuration file to submit", type=str, nargs="?")
+
+    # Optional arguments with parameter
+    parser.add_argument("--id", type=str, help="Execution ID, default time of the daemon and a sequence")
+    parser.add_argument("--socket", type=str, help="Unix socket of the daemon, default execution/daemon.sock",
+        default=os.path.join(os.path.abspath(os.path.dirname(os.path.realpath(__file__))), "execution", "daemon.sock"))
+
+    # Optional arguments without parameter
+    parser.add_argument("--keep-going", help="Execute the components that do not depend on a failed component", action="store_true")
+    parser.add_argument("--json", help="Show the events as JSON lines", action="store_true")
+
+    # Others
+    parser.add_argument("--version", help="Check Version", action="version", version='%(prog)s - Version 1.0')
+
+    # Parse arguments
+    args = vars(parser.parse_args())
+    if args["command"] == "submit" and args["file"] is None:
+        parser.error("submit requires the flow file")
+
+    return args
+
+if __name__ == '__main__':
+    args = parse_arguments()
+
+    message = { "command" : args["command"] }
+    if args["command"] == "submit":
+        message.update({
+            "file" : args["file"],
+            "cwd" : os.getcwd(),
+            "id" : args["id"],
+            "keep_going" : args["keep_going"]
+        })
+
+    # A submitted flow is successful only if the daemon reports its end
+    returncode = 1 if args["command"] == "submit" else 0
+    for event in request(args["socket"], message):
+        if args["json"]:
+            print(json.dumps(event))
+        else:
+            print_event(event)
+        if event["event"] == "flow":
+            returncode = 0 if event["returncode"] == 0 else 1
+        elif event["event"] == "error":
+            returncode = 1
+
+    exit(returncode)
@@ -9,12 +9,12 @@ import subprocess
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
 from collections import OrderedDict
-from data_process_lib import Component
+from component import Component
 
 class CommandComponent(Component):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -58,6 +58,7 @@ if __name__ == "__main__":
         component = CommandComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -2,18 +2,19 @@
 # Executed with Python 3.4.10
 import sys
 import os
-import re
 import shutil
 
 # Add the lib directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
-from data_process_lib import Component
+from component import Component
 
 class CopyFilesComponent(Component):
 
-    def __init__(self):
-        super().__init__()
+    _STREAMING = True
+
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -33,17 +34,8 @@ class CopyFilesComponent(Component):
         if len(input_list) == 0:
             raise ImportError("No input provided")
 
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        return files
+        # Only the files matched are listed
+        return self._list_input_files(input_list, self._config["match"], full_path=self._config["match_by_full_path"])
 
     # Abstract from parent
     def _read_config(self, node_info):
@@ -70,12 +62,18 @@ class CopyFilesComponent(Component):
 
         for origin_file in self._data:
             filename = os.path.basename(origin_file)
-            if any([ re.search(regex, filename if not self._config["match_by_full_path"] else origin_file) for regex in self._config["match"]]):
-                if self._config["skip_empty_files"] and os.stat(origin_file).st_size == 0:
-                    continue
-                destination_file = os.path.join(destination_path, filename)
-                if not self._config["overwrite"] and os.path.exists(destination_file):
-                    raise FileExistsError("{} file already exists in the destination folder".format(filename))
+            if self._config["skip_empty_files"] and self._input_listing.get_size(origin_file) == 0:
+                continue
+            destination_file = os.path.join(destination_path, filename)
+            # Content of the file sent to the next node
+            if self._output_stream is not None:
+                with open(origin_file, "r") as fr, self._open_output(destination_file) as fw:
+                    shutil.copyfileobj(fr, fw)
+                continue
+            if not self._config["overwrite"] and os.path.exists(destination_file):
+                raise FileExistsError("{} file already exists in the destination folder".format(filename))
+            # Copied as they are, the files can be binary so the rows are not counted
+            with self._metrics.timer("write"):
                 if self._config["move"]:
                     shutil.move(origin_file, destination_file)
                 else:
@@ -91,6 +89,7 @@ if __name__ == "__main__":
         component = CopyFilesComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -14,28 +14,19 @@ import concurrent.futures
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
 from utils import read_file_line_by_line
+from component_metrics import ComponentMetrics, MeteredOutput
 from data_process_lib import AsyncComponent
 
 class CSV2HTMLComponent(AsyncComponent):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        files = [ filepath for filepath in files if filepath.endswith(".csv")]
+        files = self._list_input_files(input_list, [ r"\.csv$" ])
         if len(files) == 0:
-            raise ImportError("No .xlsx files found")
+            raise ImportError("No .csv files found")
 
         return files
         
@@ -78,11 +69,17 @@ class CSV2HTMLComponent(AsyncComponent):
         file_basename, file_extension = os.path.splitext(os.path.basename(os.path.normpath(input_file)))
         output_filepath = os.path.join(output_directory, "{}.html".format(file_basename))
 
-        with open(output_filepath, "w") as fw:
+        # Metrics of the task, added to the ones of the component
+        metrics = ComponentMetrics.get_current()
+        rows = 0
+
+        # The lines of the table tags are not rows
+        with MeteredOutput(open(output_filepath, "w"), metrics, count_rows=False) as fw:
             fw.write("<table>\n")
             # Check if has to read header
             read_header = not has_header
             for line in read_file_line_by_line(input_file):
+                rows += 1
                 fw.write("<tr>{}</tr>\n".format("".join([
                     "<{tag}>{value}</{tag}>".format(**{
                         "value" : item,
@@ -94,11 +91,15 @@ class CSV2HTMLComponent(AsyncComponent):
                 read_header = True
             fw.write("</table>\n")
 
+        metrics.count("rows_read", rows)
+        metrics.count("rows_written", rows)
+
 if __name__ == "__main__":
     try:
         component = CSV2HTMLComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -20,8 +20,8 @@ class CSVAggregatorComponent(SortComponent):
     __CONDITION_PARAMETER_REGEX = '\\$([\\w-]+)'
     __CLASS_ID = "csv_aggregator"
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     def init(self):
         # to create the tmp folder
@@ -29,17 +29,7 @@ class CSVAggregatorComponent(SortComponent):
 
     # Abstract from parent
     def _read_input(self, input_list):
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        return files
+        return self._list_input_files(input_list)
         
     # Abstract from parent
     def _read_config(self, node_info):
@@ -65,7 +55,9 @@ class CSVAggregatorComponent(SortComponent):
                 key=MakeItPicklableWrapper(self.get_key).add_args(
                     self._config["key"], 
                     self._config["input_delimiter"]
-                )
+                ),
+                columns=self._config["key"],
+                delimiter=self._config["input_delimiter"]
             )
             for filepath 
             in self._data 
@@ -75,7 +67,7 @@ class CSVAggregatorComponent(SortComponent):
 
         file_handlers = [ open(sorted_file, "r") for sorted_file in sorted_files ]
 
-        fw = open(output_filepath, "w")
+        fw = self._open_output(output_filepath)
 
         # Read header
         if self._config["header"]:
@@ -90,6 +82,23 @@ class CSVAggregatorComponent(SortComponent):
 
             fw.write("{}\n".format(self._config["output_delimiter"].join(header + self._config["conditions"])))
 
+        # The groups are aggregated by the workers while the next ones are merged, written in the order of the keys
+        for line in self._submit_bounded(self.aggregate, self.__iter_groups(file_handlers), ordered=True):
+            fw.write("{}\n".format(self._config["output_delimiter"].join(line)))
+
+        fw.close()
+
+        # The key is in the first fields, joined as it was sorted only with the same delimiter
+        if self._config["output_delimiter"] == self._config["input_delimiter"]:
+            self._sorted_output.add(output_filepath, range(1, len(self._config["key"]) + 1), self._config["output_delimiter"], self._config["header"])
+
+        for fr in file_handlers:
+            fr.close()
+
+        self.log_info("End Process")
+
+    # Args of aggregate for the lines of each key, merged from the sorted files
+    def __iter_groups(self, file_handlers):
         # Initialize heaps
         queue = []
         for idx, fr in enumerate(file_handlers):
@@ -104,8 +113,6 @@ class CSVAggregatorComponent(SortComponent):
         agg_key = None 
         agg_records = []
 
-        futures = []
-
         while len(queue) > 0:
             key, idx, line = heapq.heappop(queue)
             line = line.split(self._config["input_delimiter"])
@@ -114,7 +121,7 @@ class CSVAggregatorComponent(SortComponent):
                 agg_records.append(line)
             else:
                 if agg_key is not None:
-                    futures.append(self._executor.submit(self.aggregate, agg_key.split(self._config["input_delimiter"]), agg_records, self._config["conditions"]))
+                    yield agg_key.split(self._config["input_delimiter"]), agg_records, self._config["conditions"]
                 agg_key = key
                 agg_records = [line]
 
@@ -127,18 +134,7 @@ class CSVAggregatorComponent(SortComponent):
                 ))
 
         if agg_key is not None:
-                futures.append(self._executor.submit(self.aggregate, agg_key.split(self._config["input_delimiter"]), agg_records, self._config["conditions"]))
-
-        for future in concurrent.futures.as_completed(futures):
-            line = future.result()
-            fw.write("{}\n".format(self._config["output_delimiter"].join(line)))
-
-        fw.close()
-
-        for fr in file_handlers:
-            fr.close()
-
-        self.log_info("End Process")
+            yield agg_key.split(self._config["input_delimiter"]), agg_records, self._config["conditions"]
 
     @classmethod
     def get_key(cls, line, index_list, delimiter):
@@ -197,6 +193,7 @@ if __name__ == "__main__":
         component = CSVAggregatorComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -11,7 +11,7 @@ from collections import OrderedDict
 # Add the lib directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
-from utils import read_file_line_by_line, FileWriter, UtilityFunction
+from utils import UtilityFunction
 from data_process_lib import AsyncComponent
 
 class CSVConverterComponent(AsyncComponent):
@@ -20,22 +20,14 @@ class CSVConverterComponent(AsyncComponent):
     __CONDITION_PARAMETER_REGEX = '\\$([\\w-]+)'
     __CLASS_ID = "csv_converter"
 
-    def __init__(self):
-        super().__init__()
+    _STREAMING = True
+
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        return files
+        return self._list_input_files(input_list, streams=True)
         
     # Abstract from parent
     def _read_config(self, node_info):
@@ -87,52 +79,50 @@ class CSVConverterComponent(AsyncComponent):
 
         return [ str(item) for item in line.values() ]
         
+    # Output of the converted lines of a chunk, executed by the workers
+    @classmethod
+    def convert_lines(cls, lines, header, input_delimiter, output_delimiter, conditions):
+        output = []
+        for line in lines:
+            line = OrderedDict(
+                (str(idx) if not header else header[idx], field) 
+                for idx, field 
+                in enumerate(line.split(input_delimiter))
+            )
+            output.append("{}\n".format(output_delimiter.join(cls.convert_line(line, conditions))))
+        return "".join(output)
+
     # Abstract from parent
     def process(self):
         super().process()
 
         self.log_info("Start Process")
 
-        file_writer = FileWriter(mode="a" if self._config["header"] else "w")
-
-        futures = []
-
-        for file_idx, filepath in enumerate(self._data):
+        for file_idx, (filepath, header, chunks) in enumerate(self._iter_input_chunks(self._data, self._config["header"])):
             
             file_basename, file_extension = os.path.splitext(os.path.basename(os.path.normpath(filepath)))
             output_filepath = os.path.join(self._OUTPUT_PATH, "{}_{}_converted{}".format(file_basename, file_idx, file_extension))
-            header = None
-
-            for line in read_file_line_by_line(filepath):
-                line = OrderedDict(
-                    (str(idx) if not header else header[idx], field) 
-                    for idx, field 
-                    in enumerate(line.split(self._config["input_delimiter"]))
-                )
-                if not header and self._config["header"]:
+
+            # Written in order by this process, the output can be a stream
+            with self._open_output(output_filepath) as fw:
+                if header is not None:
                     header = self.convert_line(
-                        line,
+                        OrderedDict((str(idx), field) for idx, field in enumerate(header.split(self._config["input_delimiter"]))),
                         self._config["conditions"], 
                         is_header=True
                     )
-                    with open(output_filepath, "w") as fw:
-                        fw.write("{}\n".format(self._config["output_delimiter"].join(header)))
-                else:
-                    future = self._executor.submit(
-                        self.convert_line, 
-                        line,
-                        self._config["conditions"]
-                    )
-                    # Convert the line
-                    converted_line = future.result()
-                    future = self._executor.submit(file_writer.write, output_filepath, self._config["output_delimiter"].join(converted_line))
-                    futures.append(future)
-
-        for future in concurrent.futures.as_completed(futures):
-            # Just to trigger exceptions if any
-            future.result()
-
-        file_writer.shutdown()
+                    fw.write("{}\n".format(self._config["output_delimiter"].join(header)))
+
+                # The workers read and convert whole chunks of lines
+                for text in self._map_chunks(
+                    self.convert_lines,
+                    chunks,
+                    header,
+                    self._config["input_delimiter"],
+                    self._config["output_delimiter"],
+                    self._config["conditions"]
+                ):
+                    fw.write(text)
 
         self.log_info("End Process")
 
@@ -141,6 +131,7 @@ if __name__ == "__main__":
         component = CSVConverterComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
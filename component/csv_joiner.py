@@ -17,8 +17,8 @@ from data_process_lib import SortComponent
 
 class CSVJoinerComponent(SortComponent):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     def init(self):
         # to create the tmp folder
@@ -28,16 +28,8 @@ class CSVJoinerComponent(SortComponent):
     def _read_input(self, input_list):
 
         if len(input_list) > 1:
-            data = list(map(
-                    lambda path : [
-                        os.path.join(root, filename) 
-                        for root, dirs, files 
-                        in os.walk(path) 
-                        if len(files) > 0 
-                            for filename in files 
-                    ], 
-                    input_list
-                ))
+            # Files of each input on its own
+            data = [ self._list_input_files([path]) for path in input_list ]
 
             for idx, files in enumerate(data):
                 if len(files) == 0:
@@ -75,7 +67,9 @@ class CSVJoinerComponent(SortComponent):
                     key=MakeItPicklableWrapper(self.get_key).add_args(
                         self._config["key"][input_idx], 
                         self._config["input_delimiter"]
-                    )
+                    ),
+                    columns=self._config["key"][input_idx],
+                    delimiter=self._config["input_delimiter"]
                 )
                 for filepath 
                 in files 
@@ -93,7 +87,7 @@ class CSVJoinerComponent(SortComponent):
             in sorted_files
         ]
 
-        fw = open(output_filepath, "w")
+        fw = self._open_output(output_filepath)
 
         # Read header
         if self._config["header"]:
@@ -124,6 +118,10 @@ class CSVJoinerComponent(SortComponent):
             ]
             fw.write("{}\n".format(self._config["output_delimiter"].join(list(flatten(header)))))
 
+        # join: sorted inputs merged by key, the writes are timed in the write phase
+        join_start = time.time()
+        header_seconds = fw.get_seconds()
+
         # Initialize heaps
         num_fields_without_key = [None] * len(sorted_files)
         queues = []
@@ -193,6 +191,8 @@ class CSVJoinerComponent(SortComponent):
             for fr in file_handler_list:
                 fr.close()
 
+        self._metrics.add_time("join", time.time() - join_start - (fw.get_seconds() - header_seconds))
+
         self.log_info("End Process")
 
     @classmethod
@@ -206,6 +206,7 @@ if __name__ == "__main__":
         component = CSVJoinerComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -16,8 +16,8 @@ from data_process_lib import SortComponent
 
 class CSVMatcherCompareByKeyComponent(SortComponent):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     def init(self):
         # to create the tmp folder
@@ -27,16 +27,8 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
     def _read_input(self, input_list):
 
         if len(input_list) > 1:
-            data = list(map(
-                    lambda path : [
-                        os.path.join(root, filename) 
-                        for root, dirs, files 
-                        in os.walk(path) 
-                        if len(files) > 0 
-                            for filename in files 
-                    ], 
-                    input_list
-                ))
+            # Files of each input on its own
+            data = [ self._list_input_files([path]) for path in input_list ]
 
             return data
 
@@ -71,7 +63,9 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
                     key=MakeItPicklableWrapper(self.get_key).add_args(
                         self._config["key"][input_idx], 
                         self._config["input_delimiter"]
-                    )
+                    ),
+                    columns=self._config["key"][input_idx],
+                    delimiter=self._config["input_delimiter"]
                 )
                 for filepath 
                 in files 
@@ -89,7 +83,7 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
             in sorted_files
         ]
 
-        fw = open(output_filepath, "w")
+        fw = self._open_output(output_filepath)
 
         # Read header
         if self._config["header"]:
@@ -104,6 +98,37 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
                         written_header = True
             fw.write("{}\n".format(self._config["input_delimiter"].join(header)))
 
+        # The key is the first field, the output is sorted by it if no key contains the output delimiter
+        sorted_output = True
+
+        # The records are compared by the workers while the next ones are merged, written in the order of the keys
+        for key, status, compared_record, all_equal in self._submit_bounded(self.compare_record, self.__iter_records(file_handlers), ordered=True):
+            sorted_output = sorted_output and self._config["output_delimiter"] not in key
+            fw.write("{}{}{}{}{}\n".format(
+                key,
+                self._config["output_delimiter"],
+                self._config["output_delimiter"].join([
+                    "" if not self._config["show_equal"] and all_equal[idx] else self._config["field_delimiter"].join(field) 
+                    for idx, field
+                    in enumerate(compared_record)
+                ]),
+                self._config["output_delimiter"],
+                self._config["field_delimiter"].join(status)
+            ))
+
+        fw.close()
+
+        if sorted_output:
+            self._sorted_output.add(output_filepath, [1], self._config["output_delimiter"], self._config["header"])
+
+        for file_handler_list in file_handlers:
+            for fr in file_handler_list:
+                fr.close()
+
+        self.log_info("End Process")
+
+    # Args of compare_record for the records of each key, merged from the sorted files of the inputs
+    def __iter_records(self, file_handlers):
         # Initialize heaps
         queues = []
         for input_idx, file_handler_list in enumerate(file_handlers):
@@ -119,9 +144,6 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
                     ))
 
         # Join Loop
-        join_line = []
-        futures = []
-
         while sum([ len(queue) for queue in queues]) > 0:
 
             selected = [ heapq.heappop(queue) if len(queue) > 0 else None for queue in queues ] 
@@ -161,30 +183,7 @@ class CSVMatcherCompareByKeyComponent(SortComponent):
                     to_compare_records.append(None)
 
             # key : minimum[0]
-            futures.append(self._executor.submit(self.compare_record, minimum[0], to_compare_records))
-
-        for future in concurrent.futures.as_completed(futures):
-            key, status, compared_record, all_equal = future.result()
-
-            fw.write("{}{}{}{}{}\n".format(
-                key,
-                self._config["output_delimiter"],
-                self._config["output_delimiter"].join([
-                    "" if not self._config["show_equal"] and all_equal[idx] else self._config["field_delimiter"].join(field) 
-                    for idx, field
-                    in enumerate(compared_record)
-                ]),
-                self._config["output_delimiter"],
-                self._config["field_delimiter"].join(status)
-            ))
-
-        fw.close()
-
-        for file_handler_list in file_handlers:
-            for fr in file_handler_list:
-                fr.close()
-
-        self.log_info("End Process")
+            yield minimum[0], to_compare_records
 
     @classmethod
     def get_key(cls, line, index_list, delimiter):
@@ -226,6 +225,7 @@ if __name__ == "__main__":
         component = CSVMatcherCompareByKeyComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -56,8 +56,11 @@ class Gz(Packing):
         
 class PackingComponent(AsyncComponent):
 
-    def __init__(self):
-        super().__init__()
+    # Most of the time is reading and writing the files
+    _WORK = "io"
+
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -111,6 +114,7 @@ if __name__ == "__main__":
         component = PackingComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -7,12 +7,12 @@ import time
 # Add the lib directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
-from data_process_lib import Component
+from component import Component
 
 class SleepComponent(Component):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -44,6 +44,7 @@ if __name__ == "__main__":
         component = SleepComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
\ No newline at end of file
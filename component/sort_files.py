@@ -17,8 +17,8 @@ from data_process_lib import SortComponent
 
 class CSVJoinerComponent(SortComponent):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     def init(self):
         # to create the tmp folder
@@ -26,17 +26,7 @@ class CSVJoinerComponent(SortComponent):
 
     # Abstract from parent
     def _read_input(self, input_list):
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        return files
+        return self._list_input_files(input_list)
         
     # Abstract from parent
     def _read_config(self, node_info):
@@ -56,15 +46,22 @@ class CSVJoinerComponent(SortComponent):
         self.log_info("Start Process")
         
         for filepath in self._data:
-            origin_file = self._sort_file(
+            # The last merge writes the output, not copied from the tmp folder
+            output_filepath = self._sort_file(
                 filepath, 
                 has_header=self._config["header"],
                 key=MakeItPicklableWrapper(self.get_key).add_args(
                     self._config["key"], 
                     self._config["input_delimiter"]
-                )
+                ),
+                columns=self._config["key"],
+                delimiter=self._config["input_delimiter"],
+                output_filepath=os.path.join(self._OUTPUT_PATH, os.path.basename(os.path.normpath(filepath)))
             )
-            shutil.copy2(origin_file, os.path.join(self._OUTPUT_PATH, os.path.basename(origin_file)))
+
+            # The column 0 is the first one only for some components
+            if all(idx > 0 for idx in self._config["key"]):
+                self._sorted_output.add(output_filepath, self._config["key"], self._config["input_delimiter"], self._config["header"])
 
         self.log_info("End Process")
 
@@ -79,6 +76,7 @@ if __name__ == "__main__":
         component = CSVJoinerComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
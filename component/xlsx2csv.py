@@ -13,6 +13,7 @@ import concurrent.futures
 # Add the lib directory to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../lib')))
 
+from component_metrics import ComponentMetrics, MeteredOutput
 from data_process_lib import AsyncComponent
 
 class XLSX2CSVComponent(AsyncComponent):
@@ -23,22 +24,12 @@ class XLSX2CSVComponent(AsyncComponent):
         'relationship' : 'http://schemas.openxmlformats.org/package/2006/relationships'
     }
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
-        files = []
-
-        for input_record in input_list:
-            if os.path.isdir(input_record):
-                files = files + [ os.path.join(root, filename) for root, dirs, files in os.walk(input_record) if len(files) > 0 for filename in files ]
-            elif os.path.isfile(input_record):
-                files.append(input_record)
-            else:
-                raise ImportError("Path {} is incorrect".format(input_record))
-
-        files = [ filepath for filepath in files if filepath.endswith(".xlsx")]
+        files = self._list_input_files(input_list, [ r"\.xlsx$" ])
         if len(files) == 0:
             raise ImportError("No .xlsx files found")
 
@@ -135,6 +126,9 @@ class XLSX2CSVComponent(AsyncComponent):
 
         cls.log_info("Reading workbook[{}]".format("{}{}".format(file_basename, file_extension)))
 
+        # Metrics of the task, added to the ones of the component
+        metrics = ComponentMetrics.get_current()
+
         with zipfile.ZipFile(origin_filepath, "r") as zip_file:
 
             with zip_file.open('xl/sharedStrings.xml') as xml:
@@ -159,14 +153,18 @@ class XLSX2CSVComponent(AsyncComponent):
                     for value, index_row, index_col in data:
                         matrix[index_row][index_col] = value
 
-                    with open(os.path.join(destination_folder, "{}_{}.csv".format(file_basename, sheetname)), "w") as fw:
+                    # The rows of the sheet, the values with new lines are quoted in one row
+                    with MeteredOutput(open(os.path.join(destination_folder, "{}_{}.csv".format(file_basename, sheetname)), "w"), metrics, count_rows=False) as fw:
                         csv.writer(fw).writerows(matrix)
+                    metrics.count("rows_read", num_rows)
+                    metrics.count("rows_written", num_rows)
 
 if __name__ == "__main__":
     try:
         component = XLSX2CSVComponent()
         component.init()
         component.process()
+        component.close()
     except:
         component.log_exception("Exception Occured !!!")
         exit(1)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# Executed with Python 3.4.10
+import os
+import json
+import queue
+import socket
+import argparse
+import threading
+import socketserver
+
+from lib.utils import *
+
+from main import DataProcessExecutor
+from batch import DataProcessBatch
+
+# Flows submitted through a Unix socket and executed by a pool of warm workers
+# The workers import the lib and all the components once, when the daemon starts
+# Requests and events are JSON lines, the connection of a flow is open until the flow finishes
+class DataProcessDaemon(DataProcessBatch):
+
+    def __init__(self, args):
+        self._args = args
+        self._id = "_".join(["daemon", self._args["id"]])
+
+        self._BASE_PATH = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+        self._LOG_PATH = os.path.join(self._BASE_PATH, "log")
+        self._EXECUTION_PATH = os.path.join(self._BASE_PATH, "execution")
+        self._SOCKET_PATH = self._args["socket"] or os.path.join(self._EXECUTION_PATH, "daemon.sock")
+
+        create_if_not_exists_folders([
+            self._LOG_PATH,
+            self._EXECUTION_PATH
+        ])
+
+        # The warm workers execute the components inside them
+        self._execution_mode = "inprocess"
+        self._workers = self._args["workers"] or os.cpu_count()
+        self._cpu_budget = self._args["cpu_budget"] or max(self._workers, os.cpu_count())
+
+        self._logger = self._get_logger(os.path.join(self._LOG_PATH, self._id + ".log"))
+
+        self.__requests = queue.Queue()
+        self.__connections = {}
+        self.__sequence = 0
+        self.__stopped = False
+
+        self.log_info("Daemon Initialized")
+
+    def _get_script_paths(self):
+        script_paths = []
+        for root, dirs, files in os.walk(os.path.join(self._BASE_PATH, "component")):
+            for file in files:
+                if file.endswith(".py"):
+                    script_paths.append(os.path.join(root, file))
+        return script_paths
+
+    # The flows are not known when the pool is created, a stream destination runs besides each origin
+    def _get_executor_size(self):
+        return 2 * self._workers
+
+    def _is_active(self):
+        return not self.__stopped or len(self._flows) > 0
+
+    # Called by the threads of the connections, the requests are handled by the loop
+    def _submit_request(self, request, connection, done):
+        self.__requests.put((request, connection, done))
+        self._wake_up()
+
+    def _on_wake(self):
+        while True:
+            try:
+                request, connection, done = self.__requests.get_nowait()
+            except queue.Empty:
+                return
+            self.__handle_request(request, connection, done)
+
+    def __handle_request(self, request, connection, done):
+        command = request.get("command")
+
+        if command == "submit":
+            if self.__stopped:
+                self.__send(connection, { "event" : "error", "message" : "Daemon stopping" })
+                done.set()
+                return
+            try:
+                self.__sequence += 1
+                flow = DataProcessExecutor({
+                    "file" : self.__get_flow_path(request),
+                    "id" : request.get("id") or "{}_{}".format(get_time(datetime.datetime.now(), "%Y%m%d%H%M%S"), self.__sequence),
+                    "resume" : None,
+                    "execution_mode" : self._execution_mode,
+                    "show_command" : False,
+                    "keep_going" : request.get("keep_going", False)
+                })
+                if flow._get_id() in self.__connections:
+                    raise ImportError("Flow {} already running".format(flow._get_id()))
+                self._add_flow(flow)
+            except Exception as exception:
+                self.log_error("Flow {} not accepted: {}".format(request.get("file"), exception))
+                self.__send(connection, { "event" : "error", "message" : str(exception) })
+                done.set()
+                return
+
+            self.__connections[flow._get_id()] = (connection, done)
+            self.log_info("Flow {} accepted".format(flow._get_id()))
+            self.__send(connection, { "event" : "accepted", "flow" : flow._get_id() })
+
+        elif command == "status":
+            self.__send(connection, {
+                "event" : "status",
+                "flows" : [
+                    { "flow" : flow._get_id(), "running" : len(flow._get_running_components()) }
+                    for flow in self._flows
+                ]
+            })
+            done.set()
+
+        elif command == "stop":
+            # Running flows finish, new flows are not accepted
+            self.log_info("Stop requested")
+            self.__stopped = True
+            self.__send(connection, { "event" : "stopping", "flows" : [ flow._get_id() for flow in self._flows ] })
+            done.set()
+
+        else:
+            self.__send(connection, { "event" : "error", "message" : "Command {} not supported".format(command) })
+            done.set()
+
+    # Same path the flow would have if main.py was executed from the directory of the client
+    def __get_flow_path(self, request):
+        return os.path.relpath(os.path.join(request.get("cwd", os.getcwd()), request["file"]))
+
+    def __send(self, connection, event):
+        try:
+            connection.sendall((json.dumps(event) + "\n").encode("utf-8"))
+        except OSError:
+            # The client is gone, the flow is executed anyway
+            pass
+
+    def _on_node_finished(self, flow, node, future):
+        super()._on_node_finished(flow, node, future)
+
+        if flow._get_id() not in self.__connections:
+            return
+        event = { "event" : "node", "flow" : flow._get_id(), "node" : node }
+        if future.cancelled():
+            event["returncode"] = None
+        elif future.exception() is not None:
+            event["returncode"] = None
+            event["error"] = str(future.exception())
+        else:
+            event.update(future.result())
+        self.__send(self.__connections[flow._get_id()][0], event)
+
+    def _on_flow_finished(self, flow, returncode):
+        super()._on_flow_finished(flow, returncode)
+
+        if flow._get_id() not in self.__connections:
+            return
+        connection, done = self.__connections.pop(flow._get_id())
+        self.__send(connection, { "event" : "flow", "flow" : flow._get_id(), "returncode" : returncode })
+        done.set()
+
+    def __create_server(self):
+        if os.path.exists(self._SOCKET_PATH):
+            try:
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(self._SOCKET_PATH)
+                client.close()
+                raise ImportError("Daemon already listening on {}".format(self._SOCKET_PATH))
+            except ConnectionRefusedError:
+                # Left by a daemon that did not stop
+                os.unlink(self._SOCKET_PATH)
+
+        server = DaemonServer(self._SOCKET_PATH, DaemonRequestHandler)
+        server.data_process_daemon = self
+        return server
+
+    def run(self):
+        self.log_info("Start Daemon")
+        # Workers are started and warmed up before accepting flows
+        self._start()
+        self._warm_up()
+
+        server = self.__create_server()
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.log_info("Listening on {}".format(self._SOCKET_PATH))
+
+        try:
+            self._loop()
+        finally:
+            server.shutdown()
+            server.server_close()
+            if os.path.exists(self._SOCKET_PATH):
+                os.unlink(self._SOCKET_PATH)
+            # Clients of the flows not finished
+            for connection, done in self.__connections.values():
+                done.set()
+
+        self.log_info("End Daemon")
+        return 0
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+# One request per connection, it waits until the request is completed
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        done = threading.Event()
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except ValueError:
+            self.connection.sendall((json.dumps({ "event" : "error", "message" : "Request is not JSON" }) + "\n").encode("utf-8"))
+            return
+        self.server.data_process_daemon._submit_request(request, self.connection, done)
+        done.wait()
+
+def parse_arguments():
+    # Create argument parser
+    parser = argparse.ArgumentParser()
+
+    # Optional arguments with parameter
+    parser.add_argument("--id", type=str, help="Daemon ID", default=get_time(dateformat="%Y%m%d%H%M%S"))
+    parser.add_argument("--socket", type=str, help="Unix socket of the daemon, default execution/daemon.sock")
+    parser.add_argument("--workers", type=int, help="Nodes executed at the same time by all the flows, default CPU count")
+    parser.add_argument("--cpu-budget", type=int, help="CPU tokens shared by all the flows, default the workers or the CPU count if higher")
+
+    # Others
+    parser.add_argument("--version", help="Check Version", action="version", version='%(prog)s - Version 1.0')
+
+    # Parse arguments
+    return vars(parser.parse_args())
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    # Stopped as with Ctrl+C, the nodes are cancelled before the process ends
+    handle_termination_signals()
+    data_process_daemon = DataProcessDaemon(args)
+    exit(data_process_daemon.run())
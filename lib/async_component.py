@@ -1,10 +1,54 @@
+import os
+import locale
+import collections
+import concurrent.futures
+
 from component import Component
-from concurrent.futures import ProcessPoolExecutor
-        
+from cpu_tokens import CPUTokens
+from component_metrics import ComponentMetrics, MetricsExecutor
+from task_executors import InlineExecutor, LazyExecutor
+from ordered_map import ordered_map
+from stream import is_stream
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Lines of a file from the byte start to the byte end, read by the task processing them
+# The ends are always after a new line, or the end of the file
+FileChunk = collections.namedtuple("FileChunk", ["filepath", "start", "end"])
+
+# Lines of a chunk, stripped as read_file_line_by_line does, the lines of the streams are already in the chunk
+def read_chunk(chunk):
+    if not isinstance(chunk, FileChunk):
+        return chunk
+    with open(chunk.filepath, "rb") as fr:
+        fr.seek(chunk.start)
+        text = fr.read(chunk.end - chunk.start).decode(locale.getpreferredencoding(False))
+    # Universal new lines, as the files opened in text mode, the text is not copied if it has only \n
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    text = None
+    # After the last new line
+    if lines[-1] == "":
+        lines.pop()
+    return [ line.strip() for line in lines ]
+
+# Task of the chunks, only the chunk is sent to the worker and only the text to write is sent back
+# function(lines, *args): returns the output of the lines, each one ended by a new line
+def _process_chunk(function, chunk, args):
+    lines = read_chunk(chunk)
+    text = function(lines, *args)
+
+    # The lines of the streams are counted by the component reading them, the text written by _open_output
+    if isinstance(chunk, FileChunk):
+        ComponentMetrics.get_current().count("rows_read", len(lines))
+    return text
+
 class AsyncComponent(Component):
 
-    def __init__(self):
-        super().__init__()
+    EXECUTORS = ["process", "thread", "inline", "auto"]
+    # Work of the tasks, cpu: executed by processes, io: threads are enough, the tasks wait for the disk
+    _WORK = "cpu"
+
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -15,12 +59,141 @@ class AsyncComponent(Component):
 
         # Default Setting 
         config["WORKERS"] = config.get("WORKERS", 10)
+        # process, thread, inline: executed by the component itself, auto: chosen by the size of the inputs and the work
+        config["EXECUTOR"] = config.get("EXECUTOR", "auto")
+        # auto: inputs smaller than this are processed inline, starting the pool would cost more than the work
+        config["EXECUTOR_INLINE_BYTES"] = config.get("EXECUTOR_INLINE_BYTES", 1024 * 1024)
+        # Bytes of the lines processed by one task of _map_chunks
+        config["BATCH_BYTES"] = config.get("BATCH_BYTES", 1024 * 1024)
+        # Tasks submitted and not yet consumed by _submit_bounded and _map_chunks, the results wait in memory
+        # Ordered results need room for the tasks done before a slow one, see benchmark/ordered_map.py
+        config["IN_FLIGHT"] = config.get("IN_FLIGHT", 4 * config["WORKERS"])
+
+        if config["EXECUTOR"] not in self.EXECUTORS:
+            raise ImportError("Executor {} not supported, expected one of {}".format(config["EXECUTOR"], ", ".join(self.EXECUTORS)))
+        if config["IN_FLIGHT"] < 1:
+            raise ImportError("IN_FLIGHT must be at least 1, {} given".format(config["IN_FLIGHT"]))
 
         return config
 
     def process(self):
         super().process()
-        self._executor = ProcessPoolExecutor(max_workers=self._config["WORKERS"])
+        self._executor_kind = self.__get_executor_kind()
+        self.log_info("Executor: {}".format(self._executor_kind))
+        # Started by the first task, the metrics of the tasks are added to the ones of the component
+        self._executor = MetricsExecutor(LazyExecutor(self.__create_executor), self._metrics)
+
+    # Size of the inputs known only if they are listed, the streams and the folders given as they are can be of any size
+    def __get_executor_kind(self):
+        if self._config["EXECUTOR"] != "auto":
+            return self._config["EXECUTOR"]
+
+        size = self._metrics.get_counter("bytes_read")
+        if size is not None and size < self._config["EXECUTOR_INLINE_BYTES"] and not any(is_stream(path) for path in self._INPUT_PATH):
+            return "inline"
+        return "thread" if self._WORK == "io" else "process"
+
+    def __create_executor(self):
+        if self._executor_kind == "inline":
+            return InlineExecutor()
+        if self._executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self._config["WORKERS"])
+        return ProcessPoolExecutor(max_workers=self.__acquire_workers())
+
+    # Inside a flow the pool is sized by the CPU budget
+    # The node already holds its "cpu" tokens from the flow, the other workers need free tokens
+    def __acquire_workers(self):
+        self._cpu_tokens = []
+        cpu_tokens = CPUTokens.from_environment()
+
+        if cpu_tokens is None:
+            return self._config["WORKERS"]
+
+        cpu = max(1, min(int(self._node_info.get("cpu", 1)), self._config["WORKERS"]))
+        self._cpu_tokens = cpu_tokens.acquire(self._config["WORKERS"] - cpu, partial=True)
+        self.log_info("Workers: {} ({} CPU tokens from the flow, {} acquired)".format(cpu + len(self._cpu_tokens), cpu, len(self._cpu_tokens)))
+
+        return cpu + len(self._cpu_tokens)
+
+    # (name, header, chunks) of the input files, a stream can contain many files
+    # header: first line if has_header, None if not or the file is empty
+    # chunks: byte ranges of about BATCH_BYTES of the files, read by the tasks, or lists of lines of the streams
+    def _iter_input_chunks(self, files, has_header=False):
+        for filepath in files:
+            if is_stream(filepath):
+                for name, lines in self._iter_input_files([filepath]):
+                    header = next(lines, None) if has_header else None
+                    yield name, header, self.__get_line_chunks(lines)
+            else:
+                header, chunks = self._get_file_chunks(filepath, has_header)
+                yield filepath, header, chunks
+
+    # (header, chunks) of a file, chunks of chunk_bytes, BATCH_BYTES by default
+    # The file is only read to find the new lines after the limits of the chunks
+    def _get_file_chunks(self, filepath, has_header=False, chunk_bytes=None):
+        chunk_bytes = chunk_bytes if chunk_bytes else self._config["BATCH_BYTES"]
+        header = None
+        chunks = []
+
+        with open(filepath, "rb") as fr:
+            size = os.fstat(fr.fileno()).st_size
+            if has_header and size > 0:
+                header = fr.readline().decode(locale.getpreferredencoding(False)).strip()
+                self._metrics.count("rows_read")
+
+            start = fr.tell()
+            while start < size:
+                fr.seek(min(start + chunk_bytes, size))
+                fr.readline()
+                end = fr.tell()
+                chunks.append(FileChunk(filepath, start, end))
+                start = end
+
+        return header, chunks
+
+    def __get_line_chunks(self, lines):
+        chunk = []
+        size = 0
+        for line in lines:
+            chunk.append(line)
+            size += len(line) + 1
+            if size >= self._config["BATCH_BYTES"]:
+                yield chunk
+                chunk = []
+                size = 0
+        if len(chunk) > 0:
+            yield chunk
+
+    # Results of function(*args) for the args of the tasks, in the order the tasks complete
+    # At most IN_FLIGHT tasks are pending, the next args are taken from tasks only when one of them is consumed
+    # ordered: results in the order of the tasks, the ones done early wait for the previous ones within IN_FLIGHT
+    def _submit_bounded(self, function, tasks, ordered=False):
+        if ordered:
+            yield from ordered_map(self._executor, function, tasks, self._config["IN_FLIGHT"])
+            return
+
+        pending = set()
+        for args in tasks:
+            if len(pending) >= self._config["IN_FLIGHT"]:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(self._executor.submit(function, *args))
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+    # Texts of the chunks processed by function(lines, *args) in the executor, in the order of the chunks
+    # The chunks are submitted while the previous ones are processed, IN_FLIGHT at most
+    def _map_chunks(self, function, chunks, *args):
+        return self._submit_bounded(_process_chunk, ((function, chunk, args) for chunk in chunks), ordered=True)
+
+    def close(self):
+        super().close()
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        CPUTokens.release(getattr(self, "_cpu_tokens", []))
+        self._cpu_tokens = []
 
     def __del__(self):
-        self._executor.shutdown(wait=True)
\ No newline at end of file
+        self.close()
\ No newline at end of file
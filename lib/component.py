@@ -2,50 +2,37 @@ import os
 import argparse
 import logging
 import json
-import shutil
 import re
+import time
 
-from logging.config import fileConfig
 from utils import *
+from log_writer import LogWriter, QueueLogHandler
+from stream import is_stream, StreamReader, StreamWriter
+from trash import Trash
+from input_listing import InputListing
+from component_metrics import ComponentMetrics, MeteredOutput
 from collections import OrderedDict
 
-def json_custom_process(key_value_pairs, mapping_values):
-
-    mapped_key_value_pairs = [ 
-        (
-            key, ( lambda function: function(function, value) )(
-                lambda self, parameter: re.sub(
-                    # {word} pattern
-                    "\\{(\\w+)\\}",
-                    lambda ocurrence : str(mapping_values.get(ocurrence.group(1), ocurrence.group(0))),
-                    parameter
-                ) 
-                if isinstance(parameter, str) 
-                else [ self(self, element) for element in parameter ] if isinstance(parameter, list) 
-                else parameter
-            )
-        )
-        for key, value 
-        in key_value_pairs 
-    ]
-
-    registered_keys = json_raise_on_duplicates(mapped_key_value_pairs, [
-        # Reservation for comments, not check, for example "__comment"
-        lambda key : key.startswith("__")
-    ], OrderedDict)
-
-    return registered_keys
-
 # Component Class
 # Used to be the parents of all the scripts in component folder
 # Data process is based on the rules defined in this parent class
 class Component(object):
 
     _BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+    # log file -> logger, a worker can execute components of many executions
     _loggers = {}
-
-    def __init__(self):
-        self._args = self.__parseArguments()
+    # Log file of the last component initialized in this process, the one used by log_*
+    _log_file = None
+    # Settings of the logger of the last component initialized in this process
+    _log_structured_format = None
+    _log_prefix = None
+    _log_level = "INFO"
+    # Components that can read and write streams instead of files, see _iter_input_files and _open_output
+    _STREAMING = False
+
+    def __init__(self, args=None):
+        # Arguments can be given directly when the component is executed inside an executor worker
+        self._args = args if args is not None else self.__parseArguments()
 
         self._execution_id = self._args["id"]
         self._component_id = self._args["component_id"]
@@ -67,75 +54,133 @@ class Component(object):
             "time_now_YYYYMMDDHH24MISS" : get_time(dateformat="%Y%m%d%H%M%S")
         }
 
-        logger = self._get_logger(self._LOG_FILE)
+        # The logger is created by the first log_* call, see _get_current_logger
+        # STRUCTURED_LOG of the flow, given by the executor
+        Component._log_file = self._LOG_FILE
+        Component._log_structured_format = self._args.get("structured_log")
+        Component._log_prefix = self.whoami()
         # Default value, after init it will be overwritted
-        logger.setLevel("INFO")
+        Component._log_level = "INFO"
+        # Logger of a previous component of this process with the same log file
+        if self._LOG_FILE in self._loggers:
+            self.__set_logger_format(self._loggers[self._LOG_FILE])
+
+        # Counters and seconds by phase, also the ones of the tasks of the pools
+        self._metrics = ComponentMetrics()
+        ComponentMetrics.set_current(self._metrics)
+
+    # Logger of the current component, the classmethods are called by the pools of the components too
+    @classmethod
+    def _get_current_logger(cls):
+        if Component._log_file is None:
+            return logging.getLogger("component")
+        if Component._log_file not in cls._loggers:
+            cls.__set_logger_format(cls._get_logger(Component._log_file, Component._log_structured_format))
+        return cls._loggers[Component._log_file]
+
+    # Level and prefix of the messages of the current component
+    @staticmethod
+    def __set_logger_format(logger):
+        logger.setLevel(Component._log_level)
         for handler in logger.handlers:
-            formatter = handler.formatter._fmt
-            handler.setFormatter(logging.Formatter(re.sub("%\(message\)s", "{} ~> %(message)s".format(self.whoami()), formatter)))
+            handler.setFormatter(logging.Formatter("{} ~> %(message)s".format(Component._log_prefix)))
 
     @classmethod
     def log_info(cls, message):
-        # Message on all loggers
-        for logger in cls._loggers.values():
-            logger.info(message)
+        cls._get_current_logger().info(message)
 
     @classmethod
     def log_error(cls, message):
-        # Message on all loggers
-        for logger in cls._loggers.values():
-            logger.error(message)
+        cls._get_current_logger().error(message)
 
     @classmethod
     def log_debug(cls, message):
-        # Message on all loggers
-        for logger in cls._loggers.values():
-            logger.debug(message)
+        cls._get_current_logger().debug(message)
 
     @classmethod
     def log_exception(cls, message):
-        # Message on all loggers
-        for logger in cls._loggers.values():
-            logger.exception(message)
+        cls._get_current_logger().exception(message)
 
     def get_class_name_snake_case(self):
         return re.sub(r'([a-z]) ([A-Z])', r'\1_\2', self.__class__.__name__).lower()
 
     def init(self, tmp=False):
-        self._node_info = self._read_flow(self._FLOW_CONFIG)
+        if self._args.get("node") is not None:
+            self._node_info = self._read_node(self._args["node"])
+        elif self._args.get("node_file") is not None:
+            self._node_info = self._read_node_file(self._args["node_file"])
+        else:
+            self._node_info = self._read_flow(self._FLOW_CONFIG)
         self._config = self._read_config(self._node_info)
 
-        self._get_logger(self._LOG_FILE).setLevel(self._config["LOGGING_LEVEL"])
+        Component._log_level = self._config["LOGGING_LEVEL"]
+        if self._LOG_FILE in self._loggers:
+            self._loggers[self._LOG_FILE].setLevel(self._config["LOGGING_LEVEL"])
 
         self._OUTPUT_PATH = os.path.join(self._BASE_PATH, "execution", self._execution_id, "_".join([self.whoami(), self._node_info["name"]]))
         self._execution_variables["output_path"] = self._OUTPUT_PATH
         self._INPUT_PATH = self._args["input"]
         self._execution_variables["input_path"] = self._INPUT_PATH
         self._TMP_PATH = None
+        # Output written to the stream of the next node instead of the output folder
+        self._OUTPUT_STREAM = self._args.get("stream")
+        self._output_stream = StreamWriter(self._OUTPUT_STREAM) if self._OUTPUT_STREAM else None
+        if not self._STREAMING and (self._OUTPUT_STREAM or any(is_stream(path) for path in self._INPUT_PATH)):
+            raise ImportError("Component {} does not support streams".format(self.whoami()))
         if tmp:
             self._TMP_PATH = os.path.join(self._BASE_PATH, "execution", self._execution_id, "." + "_".join([self.whoami(), self._node_info["name"]]))
             self._execution_variables["tmp_path"] = self._TMP_PATH
 
-        self._data = self._read_input(self._INPUT_PATH)
+        with self._metrics.timer("read_input"):
+            self._data = self._read_input(self._INPUT_PATH)
 
         self.log_info("Component Initialized")
 
+    # One logger per log file, its records are written by the background writer of the log file
+    # Handlers of logging.ini, configured as the ones of the flows
+    # structured_format: the one of the first call for the log file
     @classmethod
-    def _get_logger(cls, log_file):
+    def _get_logger(cls, log_file, structured_format=None):
         if log_file not in cls._loggers:
             logger_key = "component"
             fileConfig(
                 os.path.join(cls._BASE_PATH, "config", "logging.ini"),
-                defaults={"LOG_FILE" : log_file}
+                defaults={"LOG_FILE" : log_file},
+                disable_existing_loggers=False
             )
-            cls._loggers[log_file] = logging.getLogger(logger_key)
+
+            # Not a child of the configured logger, fileConfig would remove its handlers
+            logger = logging.getLogger("{}_{}".format(logger_key, os.path.splitext(os.path.basename(log_file))[0]))
+            logger.handlers = [ QueueLogHandler(LogWriter.get_writer(log_file, list(logging.getLogger(logger_key).handlers), structured_format)) ]
+            logger.propagate = False
+            cls._loggers[log_file] = logger
         
         return cls._loggers[log_file]
-    
+
+    # Writers, files and loggers of the log files, a worker executes the nodes of many executions
+    @classmethod
+    def _release_loggers(cls):
+        for log_file, logger in list(cls._loggers.items()):
+            for handler in logger.handlers:
+                handler.get_writer().close_handlers()
+                handler.close()
+            logger.handlers = []
+            logging.Logger.manager.loggerDict.pop(logger.name, None)
+            del cls._loggers[log_file]
+        Component._log_file = None
+
     # Abstract method. Must be implemented on all subclasses of this class
     def _read_input(self, input_list):
         raise NotImplementedError("Function {} not implemented".format("_read_input"))
 
+    # Files of the inputs, the folders are walked once and filtered by the patterns while walking
+    # The listing is kept in self._input_listing for the size and the modification time of the files
+    def _list_input_files(self, input_list, patterns=None, glob=False, full_path=False, streams=False):
+        self._input_listing = InputListing(input_list, patterns, glob, full_path, streams)
+        self._metrics.count("files_read", len(self._input_listing.get_files()))
+        self._metrics.count("bytes_read", self._input_listing.get_total_size())
+        return self._input_listing.get_files()
+
     def _read_flow(self, config_file):
         if config_file is None or config_file == "":
             raise ImportError("No flow configuration is provided: {}".format(config_file))
@@ -146,6 +191,18 @@ class Component(object):
                 raise ImportError("Node with ID {} not found in flow {}".format(self._component_id, config_files))
             return flow_config.get("nodes", {}).get(self.whoami(), {})
 
+    # Node configuration given by the executor, the dynamic values still have to be replaced
+    def _read_node(self, node_info):
+        return json.loads(
+            json.dumps(node_info),
+            object_pairs_hook=lambda dictionary : json_custom_process(dictionary, self._execution_variables)
+        )
+
+    # Node configuration of the compiled plan of the flow, the rest of the flow is not read
+    def _read_node_file(self, node_file):
+        with open(node_file, "r") as fr:
+            return json.load(fr, object_pairs_hook=lambda dictionary : json_custom_process(dictionary, self._execution_variables))
+
     # Can be overwritted by subclass method
     def _read_config (self, node_info):
         config = node_info.get("config", {})
@@ -156,20 +213,76 @@ class Component(object):
         return config
 
     # Can be overwritted by subclass method
+    # The process phase ends when the component is closed
     def process(self):
+        self._process_start = time.time()
         self.__clean_output()
 
+    # (name, lines) of the input files, a stream can contain many files
+    def _iter_input_files(self, files):
+        for filepath in files:
+            if is_stream(filepath):
+                for name, lines in StreamReader(filepath):
+                    yield name, self.__count_rows(lines)
+            else:
+                yield filepath, self.__count_rows(read_file_line_by_line(filepath))
+
+    def __count_rows(self, lines):
+        rows = 0
+        try:
+            for line in lines:
+                rows += 1
+                yield line
+        finally:
+            self._metrics.count("rows_read", rows)
+
+    # File to write the output, or the file inside the output stream
+    # Its lines are counted as rows_written and its writes timed in the write phase
+    def _open_output(self, filepath, buffering=-1):
+        if self._output_stream is not None:
+            return MeteredOutput(self._output_stream.open_file(os.path.basename(filepath)), self._metrics)
+        return MeteredOutput(open(filepath, "w", buffering=buffering), self._metrics)
+
+    # Can be overwritted by subclass method
+    # Release the resources of the component, it can be called more than once
+    def close(self):
+        # End of the stream for the next node
+        if getattr(self, "_output_stream", None) is not None:
+            self._output_stream.close()
+            self._output_stream = None
+        # Listing and metrics of the output for the next nodes and the flow, written once
+        if getattr(self, "_OUTPUT_PATH", None) is not None and not getattr(self, "_output_listed", False):
+            self._output_listed = True
+            if getattr(self, "_process_start", None) is not None:
+                self._metrics.add_time("process", time.time() - self._process_start)
+            try:
+                if os.path.isdir(self._OUTPUT_PATH):
+                    files, size = InputListing.write(self._OUTPUT_PATH)
+                    self._metrics.count("files_written", files)
+                    self._metrics.count("bytes_written", size)
+                self._metrics.write(self._OUTPUT_PATH)
+            except OSError as e:
+                # The next nodes walk the folder
+                self.log_error("Listing and metrics of the output not written: {}".format(e))
+        # The worker can end after the node, the records of the node are written before
+        if getattr(self, "_LOG_FILE", None) in self._loggers:
+            for handler in self._loggers[self._LOG_FILE].handlers:
+                handler.flush()
+
+    # Previous outputs moved to the trash, they are deleted by the flow in background
     def __clean_output(self):
+        trash = Trash(os.path.join(self._BASE_PATH, "execution", ".trash"))
         self.log_info("Output folder: {}".format(self._OUTPUT_PATH))
+        InputListing.remove(self._OUTPUT_PATH)
         if os.path.exists(self._OUTPUT_PATH):
             self.log_info("Output folder exists, proceed empty data")
-            shutil.rmtree(self._OUTPUT_PATH)
+            trash.move(self._OUTPUT_PATH)
         os.makedirs(self._OUTPUT_PATH)
         if self._TMP_PATH:
             self.log_info("Tmp folder: {}".format(self._TMP_PATH))
             if os.path.exists(self._TMP_PATH):
                 self.log_info("Tmp folder exists, proceed empty data")
-                shutil.rmtree(self._TMP_PATH)
+                trash.move(self._TMP_PATH)
             os.makedirs(self._TMP_PATH)
 
     def get_args(self):
@@ -193,6 +306,9 @@ class Component(object):
         parser.add_argument("-z", "--component_id", required=True, type=str, help="Component ID")
         parser.add_argument("-f", "--flow", required=True, type=str, help="Flow File")
         parser.add_argument("-i", "--input", type=str, action='append', default=[], help="Input Data")
+        parser.add_argument("-s", "--stream", type=str, help="Output Stream")
+        parser.add_argument("-n", "--node_file", type=str, help="Node configuration of the compiled flow")
+        parser.add_argument("-l", "--structured_log", type=str, help="Format of the structured log of the execution")
 
         # Version
         parser.add_argument("-v", "--version", action="version", help="Version", version="%(prog)s - Version 1.0")
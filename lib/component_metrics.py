@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import functools
+import threading
+import contextlib
+
+import concurrent.futures
+
+from collections import OrderedDict
+
+# Counters (rows, bytes, files) and seconds by phase of a component
+# Written by the component in <output path>.metrics.json, the flow adds the ones of all its nodes
+class ComponentMetrics:
+
+    FILE_EXTENSION = ".metrics.json"
+
+    # Metrics of the component running in the thread, the tasks of the pools have their own
+    __local = threading.local()
+
+    def __init__(self):
+        self.__counters = OrderedDict()
+        self.__timers = OrderedDict()
+        # The metrics of the tasks are added by the threads of the pools
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def get_current(cls):
+        metrics = getattr(cls.__local, "metrics", None)
+        if metrics is None:
+            metrics = cls.__local.metrics = cls()
+        return metrics
+
+    # None: new metrics are created by the next get_current
+    @classmethod
+    def set_current(cls, metrics):
+        cls.__local.metrics = metrics
+
+    def count(self, name, value=1):
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    # default: if the counter was never counted
+    def get_counter(self, name, default=None):
+        with self.__lock:
+            return self.__counters.get(name, default)
+
+    def add_time(self, phase, seconds):
+        with self.__lock:
+            self.__timers[phase] = self.__timers.get(phase, 0.0) + seconds
+
+    # Seconds of the block added to the phase
+    @contextlib.contextmanager
+    def timer(self, phase):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.time() - start)
+
+    def is_empty(self):
+        return len(self.__counters) == 0 and len(self.__timers) == 0
+
+    def to_dict(self):
+        with self.__lock:
+            return OrderedDict([
+                ("counters", OrderedDict(self.__counters)),
+                ("timers", OrderedDict(self.__timers))
+            ])
+
+    # Adds the counters and the seconds of other metrics, as given by to_dict
+    def merge(self, data):
+        with self.__lock:
+            for name, value in data.get("counters", {}).items():
+                self.__counters[name] = self.__counters.get(name, 0) + value
+            for phase, seconds in data.get("timers", {}).items():
+                self.__timers[phase] = self.__timers.get(phase, 0.0) + seconds
+
+    @classmethod
+    def get_metrics_file(cls, output_path):
+        return os.path.normpath(output_path) + cls.FILE_EXTENSION
+
+    def write(self, output_path):
+        metrics_file = self.get_metrics_file(output_path)
+        tmp_metrics_file = "{}.{}.tmp".format(metrics_file, os.getpid())
+        with open(tmp_metrics_file, "w") as fw:
+            json.dump(self.to_dict(), fw, indent=4)
+        os.replace(tmp_metrics_file, metrics_file)
+
+    # None if the node did not write its metrics
+    @classmethod
+    def read(cls, output_path):
+        try:
+            with open(cls.get_metrics_file(output_path), "r") as fr:
+                return json.load(fr, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError):
+            return None
+
+# Text file of an output, the lines written are counted as rows_written and the seconds of the writes in the write phase
+# Added to the metrics when closed, the writes are not locked one by one
+# count_rows: False if the lines are not rows, the component counts them
+class MeteredOutput:
+
+    def __init__(self, file, metrics, count_rows=True):
+        self.__file = file
+        self.__metrics = metrics
+        self.__count_rows = count_rows
+        self.__rows = 0
+        self.__seconds = 0.0
+        self.__closed = False
+
+    def write(self, text):
+        start = time.time()
+        written = self.__file.write(text)
+        self.__seconds += time.time() - start
+        if self.__count_rows:
+            self.__rows += text.count("\n")
+        return written
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    # Seconds of the writes until now, for the components timing the phase that writes
+    def get_seconds(self):
+        return self.__seconds
+
+    def close(self):
+        if self.__closed:
+            return
+        self.__closed = True
+        start = time.time()
+        try:
+            self.__file.close()
+        finally:
+            self.__seconds += time.time() - start
+            if self.__count_rows:
+                self.__metrics.count("rows_written", self.__rows)
+            self.__metrics.add_time("write", self.__seconds)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+# Task executed in a worker of the pool with its own metrics, returned with the result
+# The metrics are created only if the function uses them
+def _run_task(function, args, kwargs):
+    previous_metrics = ComponentMetrics.get_current()
+    ComponentMetrics.set_current(None)
+    try:
+        result = function(*args, **kwargs)
+        metrics = ComponentMetrics.get_current()
+    finally:
+        ComponentMetrics.set_current(previous_metrics)
+    return result, None if metrics.is_empty() else metrics.to_dict()
+
+# Pool of a component, the metrics of the tasks are added to the metrics of the component
+# The futures returned give the result of the functions as the pool does
+class MetricsExecutor(concurrent.futures.Executor):
+
+    def __init__(self, executor, metrics):
+        self.__executor = executor
+        self.__metrics = metrics
+
+    def submit(self, function, *args, **kwargs):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        self.__executor.submit(_run_task, function, args, kwargs).add_done_callback(functools.partial(self.__on_task_done, future))
+        return future
+
+    def __on_task_done(self, future, task_future):
+        try:
+            result, metrics = task_future.result()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        if metrics is not None:
+            self.__metrics.merge(metrics)
+        future.set_result(result)
+
+    def shutdown(self, wait=True):
+        self.__executor.shutdown(wait=wait)
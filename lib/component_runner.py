@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import ctypes
+import signal
+import inspect
+import functools
+import subprocess
+import traceback
+import importlib.util
+import concurrent.futures
+
+# Runs the components inside the executor worker processes instead of a new interpreter
+# The components import the lib modules without package, so lib folder is added to the sys.path
+_LIB_PATH = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
+
+# script path -> component class, loaded once per worker
+_component_classes = {}
+
+# prctl option of the signal received when the parent finishes
+_PR_SET_PDEATHSIG = 1
+
+# Set by the first task of the worker, see WorkerPool
+_worker_initialized = False
+
+# parent_pid: the flow, the workers are stopped with it even if it is killed
+def init_worker(script_paths=[], parent_pid=None):
+    global _worker_initialized
+    _worker_initialized = True
+
+    # The flow cancels its nodes on SIGTERM and SIGHUP, the workers keep the default action
+    for sig in [signal.SIGTERM, signal.SIGHUP]:
+        signal.signal(sig, signal.SIG_DFL)
+    set_parent_death_signal(parent_pid)
+
+    # Warm up the worker, so the first node does not pay the imports
+    for script_path in script_paths:
+        try:
+            load_component_class(script_path)
+        except Exception:
+            # Loaded again by its nodes, the error is reported by them
+            pass
+
+# Task of a WorkerPool, the worker is initialized before its first task
+def run_in_worker(worker_args, function, *args, **kwargs):
+    if not _worker_initialized:
+        init_worker(*worker_args)
+    return function(*args, **kwargs)
+
+# Process pool whose workers are initialized by init_worker
+# The pools of Python 3.4 have no initializer, so it is run by the first task of every worker
+class WorkerPool(concurrent.futures.ProcessPoolExecutor):
+
+    def __init__(self, max_workers, script_paths=[], parent_pid=None):
+        super().__init__(max_workers=max_workers)
+        self.__worker_args = (script_paths, parent_pid)
+
+    def submit(self, function, *args, **kwargs):
+        return super().submit(run_in_worker, self.__worker_args, function, *args, **kwargs)
+
+def load_component_class(script_path):
+    if script_path not in _component_classes:
+        if _LIB_PATH not in sys.path:
+            sys.path.append(_LIB_PATH)
+
+        from component import Component
+
+        script_directory = os.path.dirname(script_path)
+        if script_directory not in sys.path:
+            sys.path.append(script_directory)
+
+        module_name = os.path.splitext(os.path.basename(script_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        # Registered to be picklable by the pools created inside the components
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+        component_classes = [
+            member
+            for name, member
+            in inspect.getmembers(module, inspect.isclass)
+            if issubclass(member, Component) and member.__module__ == module.__name__
+        ]
+
+        if len(component_classes) != 1:
+            raise ImportError("Expected one component in {} and {} found".format(script_path, len(component_classes)))
+
+        _component_classes[script_path] = component_classes[0]
+
+    return _component_classes[script_path]
+
+# Only in Linux, the process is killed when its parent finishes, so no process outlives a killed flow
+def set_parent_death_signal(parent_pid=None):
+    try:
+        ctypes.CDLL(None, use_errno=True).prctl(_PR_SET_PDEATHSIG, int(signal.SIGKILL))
+    except (OSError, AttributeError):
+        return
+    # The parent finished before the signal was set
+    if parent_pid is not None and os.getppid() != parent_pid:
+        os._exit(1)
+
+# Result of a node: exit code, times and resources used
+def get_result(returncode, start, end, user=0.0, system=0.0, max_rss=0):
+    return {
+        "returncode" : returncode,
+        "pid" : os.getpid(),
+        "start" : start,
+        "end" : end,
+        "user" : user,
+        "system" : system,
+        # KB
+        "max_rss" : max_rss
+    }
+
+# Process to terminate if the node has to be cancelled
+def write_pid_file(pid_file, pid):
+    if pid_file is not None:
+        with open(pid_file, "w") as fw:
+            fw.write(str(pid))
+
+# Exit code, times and resources of a finished child process of the worker
+def wait_process(pid, start):
+    pid, status, usage = os.wait4(pid, 0)
+    returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    return get_result(returncode, start, time.time(), usage.ru_utime, usage.ru_stime, usage.ru_maxrss)
+
+# Component executed in a new process, the resources are the ones of the process
+def run_command(command, pid_file=None):
+    start = time.time()
+    # Own process group, so the component and its pools can be terminated together
+    # exec: the component replaces the shell, so it is killed if the worker finishes
+    process = subprocess.Popen("exec " + command, shell=True, start_new_session=True, preexec_fn=functools.partial(set_parent_death_signal, os.getpid()))
+    write_pid_file(pid_file, process.pid)
+    result = wait_process(process.pid, start)
+    process.returncode = result["returncode"]
+
+    return result
+
+# Same behaviour as the __main__ block of the components, returns the result with the exit code
+# The component runs in a fork of the worker, so the imports of the worker are reused
+# The fork has its own process group as run_command, a cancelled node terminates it and its pools, not the worker
+def run_component(parameters):
+    start = time.time()
+    try:
+        # Kept by the worker for the next nodes
+        load_component_class(parameters["script"])
+    except Exception:
+        # Loaded again by the fork, the error is reported by the node
+        pass
+
+    worker_pid = os.getpid()
+    pid = os.fork()
+    if pid == 0:
+        returncode = 1
+        try:
+            os.setpgid(0, 0)
+            set_parent_death_signal(worker_pid)
+            returncode = _run_component(parameters)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # The worker state, like the queues of the pool, is not cleaned up by the fork
+            os._exit(returncode)
+
+    try:
+        # Also set here, so the process group exists when the pid file is read
+        os.setpgid(pid, pid)
+    except OSError:
+        # Already set by the fork, or already finished
+        pass
+    write_pid_file(parameters.get("pid_file"), pid)
+
+    return wait_process(pid, start)
+
+def _run_component(parameters):
+    component = None
+    try:
+        component = load_component_class(parameters["script"])(parameters)
+        component.init()
+        component.process()
+        return 0
+    except:
+        if component is not None:
+            component.log_exception("Exception Occured !!!")
+        else:
+            traceback.print_exc()
+        return 1
+    finally:
+        # Not left to the garbage collector, the pools of the component would keep the process alive
+        if component is not None:
+            component.close()
+            component._release_loggers()
@@ -0,0 +1,68 @@
+import os
+import fcntl
+
+# CPU budget shared by all the processes of a flow
+# Each token is a slot file locked with flock, so a token is released even if the process holding it dies
+# The folder is inherited by the components through an environment variable
+class CPUTokens:
+
+    ENVIRONMENT_VARIABLE = "DATA_PROCESS_CPU_TOKENS"
+
+    def __init__(self, path, size=None):
+        self.__path = path
+
+        if size is not None:
+            if not os.path.exists(self.__path):
+                os.makedirs(self.__path)
+            for idx in range(size):
+                slot_file = os.path.join(self.__path, "slot_{}".format(str(idx).zfill(5)))
+                if not os.path.exists(slot_file):
+                    open(slot_file, "w").close()
+
+        self.__slots = sorted(
+            os.path.join(self.__path, filename)
+            for filename
+            in os.listdir(self.__path)
+            if filename.startswith("slot_")
+        )
+
+    @classmethod
+    def from_environment(cls):
+        path = os.environ.get(cls.ENVIRONMENT_VARIABLE)
+        if path is None or not os.path.isdir(path):
+            return None
+        return cls(path)
+
+    def get_path(self):
+        return self.__path
+
+    def get_size(self):
+        return len(self.__slots)
+
+    # Non blocking, returns the acquired tokens to be released later
+    # partial: take as many free tokens as possible up to count, otherwise all or nothing
+    def acquire(self, count, partial=False):
+        tokens = []
+
+        for slot_file in self.__slots:
+            if len(tokens) >= count:
+                break
+            token = open(slot_file, "r")
+            try:
+                fcntl.flock(token, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                tokens.append(token)
+            except (BlockingIOError, PermissionError):
+                token.close()
+
+        if len(tokens) < count and not partial:
+            self.release(tokens)
+            return []
+
+        return tokens
+
+    @staticmethod
+    def release(tokens):
+        for token in tokens:
+            # Explicit unlock, forked processes may still share the file descriptor
+            fcntl.flock(token, fcntl.LOCK_UN)
+            token.close()
@@ -1,3 +1,6 @@
+import itertools
+import collections
+
 class DirectedGraph:
 
     def __init__(self):
@@ -42,6 +45,30 @@ class DirectedGraph:
     def get_length(self):
         return len(self.__nodes)
 
+    # Nodes that the node depends on, directly or not
+    def get_ancestors(self, node):
+        return self.__get_reachable(node, self.__reversed_edges)
+
+    # Nodes that depend on the node, directly or not
+    def get_descendants(self, node):
+        return self.__get_reachable(node, self.__edges)
+
+    def __get_reachable(self, node, edges):
+        if node not in edges:
+            raise KeyError("Key {} not in edges".format(node))
+
+        reachable = set()
+        queue = collections.deque([node])
+        while len(queue) > 0:
+            node_key = queue.popleft()
+            for next_node in edges[node_key]:
+                if next_node not in reachable:
+                    reachable.add(next_node)
+                    queue.append(next_node)
+
+        reachable.discard(node)
+        return reachable
+
     # A graph is connected if after DFS from one node in its edges and reversed_edges reaches all nodes
     def is_connected(self):
         node_keys = list(self.__nodes.keys())
@@ -51,19 +78,19 @@ class DirectedGraph:
 
         visited = { key : False for key in node_keys }
         
-        queue = [node_keys[0]]
+        queue = collections.deque([node_keys[0]])
         visited[node_keys[0]] = True
         while len(queue) > 0:
-            node_key = queue.pop(0)
+            node_key = queue.popleft()
             for node in self.__edges.get(node_key, []):
                 if not visited[node]:
                     visited[node] = True
                     queue.append(node)
 
-        queue = [node_keys[0]]
+        queue = collections.deque([node_keys[0]])
         while len(queue) > 0:
-            node_key = queue.pop(0)
-            for node in self.reversed_edges.get(node_key, []):
+            node_key = queue.popleft()
+            for node in self.__reversed_edges.get(node_key, []):
                 if not visited[node]:
                     visited[node] = True
                     queue.append(node)
@@ -79,32 +106,131 @@ class DirectedGraph:
 
         visited = { key : False for key in node_keys }
         
-        queue = [node_keys[0]]
+        queue = collections.deque([node_keys[0]])
         visited[node_keys[0]] = True
         while len(queue) > 0:
-            node_key = queue.pop(0)
-            for node in self.__edges.get(node_key, []) + self.__reversed_edges.get(node_key, []):
+            node_key = queue.popleft()
+            for node in itertools.chain(self.__edges.get(node_key, []), self.__reversed_edges.get(node_key, [])):
                 if not visited[node]:
                     visited[node] = True
                     queue.append(node)
                     
         return all(visited.values())
 
-    # A graph has cycle if after DFS from any node it can return back to the same node it started, need to check all nodes
     def has_cycle(self):
-        node_keys = list(self.__nodes.keys())
+        return self.find_cycle() is not None
+
+    # Path of one cycle, [A, B, ..., A], or None without cycles
+    # DFS without recursion, a node reached again while it is still in the path closes a cycle
+    def find_cycle(self):
+        # 0: not visited, 1: in the path, 2: finished
+        states = { key : 0 for key in self.__nodes }
+
+        for start in self.__nodes:
+            if states[start] != 0:
+                continue
+            states[start] = 1
+            path = [start]
+            stack = [iter(self.__edges[start])]
+            while len(stack) > 0:
+                node = next(stack[-1], None)
+                if node is None:
+                    states[path.pop()] = 2
+                    stack.pop()
+                elif states[node] == 1:
+                    return path[path.index(node):] + [node]
+                elif states[node] == 0:
+                    states[node] = 1
+                    path.append(node)
+                    stack.append(iter(self.__edges[node]))
+
+        return None
+
+    # Kahn algorithm, nodes without pending origins first
+    def topological_sort(self):
+        return [ node_key for level in self.__get_kahn_levels() for node_key in level ]
+
+    # Waves of parallel work, the nodes of a level only depend on nodes of previous levels
+    def get_levels(self):
+        return self.__get_kahn_levels()
+
+    def __get_kahn_levels(self):
+        in_degrees = { key : len(origins) for key, origins in self.__reversed_edges.items() }
+        level = [ key for key in self.__nodes if in_degrees[key] == 0 ]
+        levels = []
+        sorted_nodes = 0
+
+        while len(level) > 0:
+            levels.append(level)
+            sorted_nodes += len(level)
+            next_level = []
+            for node_key in level:
+                for node in self.__edges[node_key]:
+                    in_degrees[node] -= 1
+                    if in_degrees[node] == 0:
+                        next_level.append(node)
+            level = next_level
+
+        if sorted_nodes != len(self.__nodes):
+            raise AssertionError("The graph has cycles: {}".format(" -> ".join(self.find_cycle())))
 
-        for node_to_check in node_keys:
-            queue = [node_to_check]
-            visited = []
-            while len(queue) > 0:
-                node_key = queue.pop(0)
-                for node in self.__edges.get(node_key, []):
-                    visited.append(node)
-                    if node_to_check in visited:
-                        return True
-                    else: 
-                        queue.append(node)
+        return levels
+
+    # Longest path from each node to the end of the flow, including the node itself
+    # weights: node -> weight, default 1 so the result is the number of nodes of the path
+    def get_longest_paths(self, weights=None):
+        weights = weights if weights is not None else {}
+        longest_paths = {}
+
+        for node_key in reversed(self.topological_sort()):
+            longest_paths[node_key] = weights.get(node_key, 1) + max(
+                [ longest_paths[node] for node in self.__edges[node_key] ] or [0]
+            )
+
+        return longest_paths
+
+    # Path with the highest sum of weights, the critical path of the flow, and its weight
+    def get_longest_path(self, weights=None):
+        if len(self.__nodes) == 0:
+            return [], 0
+
+        longest_paths = self.get_longest_paths(weights)
+        node_key = max(
+            (node_key for node_key in self.__nodes if len(self.__reversed_edges[node_key]) == 0),
+            key=lambda node_key : longest_paths[node_key]
+        )
+        path = [node_key]
+        while len(self.__edges[node_key]) > 0:
+            node_key = max(self.__edges[node_key], key=lambda node : longest_paths[node])
+            path.append(node_key)
+
+        return path, longest_paths[path[0]]
+
+    # Same graph without the edges implied by other paths, A -> C is removed if A -> B -> C
+    # Reachable nodes as bits of an integer, O(V * E / word size), released when all the origins are reduced
+    def get_transitive_reduction(self):
+        node_keys = self.topological_sort()
+        positions = { key : idx for idx, key in enumerate(node_keys) }
+        pending_origins = { key : len(self.__reversed_edges[key]) for key in node_keys }
+        reachable = {}
+
+        graph = DirectedGraph()
+        for node_key in node_keys:
+            graph.add_node(node_key, self.__nodes[node_key])
+
+        for node_key in reversed(node_keys):
+            covered = 0
+            # A destination can only be reached through the destinations before it in topological order
+            for node in sorted(self.__edges[node_key], key=lambda node : positions[node]):
+                if not covered >> positions[node] & 1:
+                    graph.add_edge(node_key, node)
+                covered |= reachable[node] | 1 << positions[node]
+                pending_origins[node] -= 1
+                if pending_origins[node] == 0:
+                    del reachable[node]
+            reachable[node_key] = covered
+
+        return graph
 
     def draw(self):
         node_keys = sorted(list(self.__nodes.keys()))
@@ -116,13 +242,15 @@ class DirectedGraph:
         # Initialize matrix 
         matrix = [[" " * cell_space for x in range(len(node_keys) * scale)] for y in range(len(node_keys) * scale)]
 
+        positions = {}
         for idx, node_key in enumerate(node_keys):
             matrix[idx * scale][idx * scale] = node_key.rjust(cell_space)
+            positions[node_key] = idx * scale
         
         for origin, destinations in self.__edges.items():
             for destination in destinations:
-                origin_index = node_keys.index(origin) * scale
-                destination_index = node_keys.index(destination) * scale
+                origin_index = positions[origin]
+                destination_index = positions[destination]
                 for i in range(abs(origin_index - destination_index)):
                     y_move = (i + 1) * (1 if origin_index < destination_index else -1)
                     if matrix[origin_index + y_move][origin_index] == " " * cell_space:
@@ -153,6 +281,30 @@ class DirectedGraph:
 
         return "\n".join(map(lambda row : "".join(row), matrix))
 
+    # Graphviz DOT, labels: node -> text shown instead of the key
+    def to_dot(self, name="graph", labels=None):
+        labels = labels if labels is not None else {}
+        quote = lambda text : '"{}"'.format(str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+
+        lines = ["digraph {} {{".format(quote(name))]
+        for node_key in self.__nodes:
+            lines.append("    {} [label={}];".format(quote(node_key), quote(labels.get(node_key, node_key))))
+        for origin, destinations in self.__edges.items():
+            for destination in destinations:
+                lines.append("    {} -> {};".format(quote(origin), quote(destination)))
+        lines.append("}")
+
+        return "\n".join(lines)
+
+    # One line per node with its destinations, "origin: destination, destination"
+    def to_adjacency(self):
+        return "\n".join(
+            "{}: {}".format(node_key, ", ".join(self.__edges[node_key]))
+            for node_key
+            in self.__nodes
+        )
+
+    # Table of the nodes and edges and the drawing of the graph, its size grows with nodes x nodes
     def __str__(self):
         # 2 os Header + separator
         output_rows = max(len(self.__nodes), len(self.__edges), len(self.__reversed_edges)) + 2
@@ -0,0 +1,41 @@
+import os
+import fcntl
+
+# Lock of a running execution of a flow, a batch or a daemon, execution/<id>/.lock
+# Held with flock while the execution runs, released by the system if its process dies
+# The executions with the lock held are not collected by the other flows
+class ExecutionLock:
+
+    def __init__(self, path):
+        self.__path = path
+        self.__file = None
+
+    # Shared, it does not wait for other holders, only is_locked takes it exclusive
+    def acquire(self):
+        if not os.path.exists(os.path.dirname(self.__path)):
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        self.__file = open(self.__path, "a")
+        fcntl.flock(self.__file, fcntl.LOCK_SH)
+
+    def release(self):
+        if self.__file is not None:
+            # Explicit unlock, the workers forked by the execution share the file descriptor
+            fcntl.flock(self.__file, fcntl.LOCK_UN)
+            self.__file.close()
+            self.__file = None
+
+    # Held by any running process, False if the lock file does not exist
+    @staticmethod
+    def is_locked(path):
+        try:
+            lock_file = open(path, "r")
+        except OSError:
+            return False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+        except (BlockingIOError, PermissionError):
+            return True
+        finally:
+            lock_file.close()
@@ -0,0 +1,34 @@
+import os
+
+from lib import component_runner
+from lib.remote_executor import RemoteExecutor
+
+# Backends execute the nodes of the flows, they are concurrent.futures executors
+# submit(function, *args) receives component_runner.run_command or component_runner.run_component
+# Backends running the nodes in other hosts implement signal_component(future, sig) to cancel them
+# Backends with CPU_METERED take the CPU tokens of the nodes in their hosts, submit(function, *args, cpu=1)
+# config: configuration of the flow, every backend reads its own keys
+# The local workers are stopped with the flow, see component_runner.init_worker
+
+def create_local_backend(execution_mode, max_workers, script_paths, config):
+    if execution_mode == "inprocess":
+        return component_runner.WorkerPool(max_workers, sorted(set(script_paths)), os.getpid())
+    if execution_mode == "subprocess":
+        return component_runner.WorkerPool(max_workers, [], os.getpid())
+    raise ImportError("Execution mode {} not supported".format(execution_mode))
+
+# The nodes are executed by the agents connected to REMOTE_ADDRESS, see agent.py
+def create_remote_backend(execution_mode, max_workers, script_paths, config):
+    if execution_mode not in ["subprocess", "inprocess"]:
+        raise ImportError("Execution mode {} not supported".format(execution_mode))
+    return RemoteExecutor(config["REMOTE_ADDRESS"], config["REMOTE_AUTHKEY"], config["REMOTE_LEASE"])
+
+BACKENDS = {
+    "local" : create_local_backend,
+    "remote" : create_remote_backend
+}
+
+def create_backend(backend, execution_mode, max_workers, script_paths, config={}):
+    if backend not in BACKENDS:
+        raise ImportError("Backend {} not supported".format(backend))
+    return BACKENDS[backend](execution_mode, max_workers, script_paths, config)
@@ -0,0 +1,171 @@
+import os
+import json
+import shutil
+import hashlib
+
+from collections import OrderedDict
+
+from lib.utils import json_raise_on_duplicates
+from lib.directed_graph import DirectedGraph
+
+# Flow file compiled once into a validated plan, cached until the file changes
+# <path>/<hash of the flow path>.json: modification time and size of the flow file, and hash of its content
+# <path>/<hash of the content>/plan.json: config of the flow, dependencies by node and streams
+# <path>/<hash of the content>/nodes/<index>.json: configuration of one node, the only part read by its component
+class FlowPlan:
+
+    # Changes of the format of the plan invalidate the cached ones
+    VERSION = 1
+
+    def __init__(self, path, flow_file):
+        self.__path = path
+        self.__flow_file = flow_file
+        self.__cached = True
+
+        if not os.path.exists(self.__path):
+            os.makedirs(self.__path)
+
+        flow_hash = self.__get_cached_hash()
+        if flow_hash is None:
+            with open(self.__flow_file, "rb") as fr:
+                content = fr.read()
+            flow_hash = hashlib.sha1("{}\n".format(self.VERSION).encode("utf-8") + content).hexdigest()
+            if not os.path.exists(self.__get_plan_file(flow_hash)):
+                self.__cached = False
+                self.__compile(flow_hash, content.decode("utf-8"))
+            self.__set_cached_hash(flow_hash)
+
+        self.__hash = flow_hash
+        with open(self.__get_plan_file(self.__hash), "r") as fr:
+            plan = json.load(fr, object_pairs_hook=OrderedDict)
+
+        self.__config = plan["config"]
+        self.__dependencies = plan["dependencies"]
+        self.__streams = plan["streams"]
+        self.__node_indexes = { node : idx for idx, node in enumerate(self.__config["nodes"]) }
+
+    def __get_index_file(self):
+        return os.path.join(self.__path, hashlib.sha1(os.path.abspath(self.__flow_file).encode("utf-8")).hexdigest() + ".json")
+
+    def __get_plan_file(self, flow_hash):
+        return os.path.join(self.__path, flow_hash, "plan.json")
+
+    # Same modification time and size, the flow file is not read again
+    def __get_cached_hash(self):
+        try:
+            with open(self.__get_index_file(), "r") as fr:
+                index = json.load(fr)
+        except (OSError, ValueError):
+            return None
+
+        stat = os.stat(self.__flow_file)
+        if index.get("mtime") != stat.st_mtime or index.get("size") != stat.st_size:
+            return None
+        if not os.path.exists(self.__get_plan_file(index.get("hash", ""))):
+            return None
+        return index["hash"]
+
+    def __set_cached_hash(self, flow_hash):
+        stat = os.stat(self.__flow_file)
+        self.__write_json(self.__get_index_file(), { "mtime" : stat.st_mtime, "size" : stat.st_size, "hash" : flow_hash })
+
+    # Written to a temporary file first, other flows can read it at the same time
+    def __write_json(self, filepath, data):
+        tmp_filepath = "{}.{}.tmp".format(filepath, os.getpid())
+        with open(tmp_filepath, "w") as fw:
+            json.dump(data, fw)
+        os.replace(tmp_filepath, filepath)
+
+    def __compile(self, flow_hash, content):
+        config = json.loads(content, object_pairs_hook=lambda dictionary : json_raise_on_duplicates(dictionary, [
+            # Reservation for comments, not check, for example "__comment"
+            lambda key : key.startswith("__")
+        ], OrderedDict))
+
+        for key in ["nodes", "dependencies"]:
+            if key not in config:
+                raise ImportError("Parameter {} not declared in the flow {}".format(key, self.__flow_file))
+
+        graph = DirectedGraph()
+        for node in config["nodes"]:
+            graph.add_node(node, None)
+
+        dependencies = OrderedDict()
+        # Streams between the nodes, origin -> destination
+        streams = OrderedDict()
+
+        for destination, origins in config["dependencies"].items():
+            if destination not in config["nodes"]:
+                raise ImportError("Component {} of the dependencies not found in the nodes".format(destination))
+            dependencies[destination] = []
+            for origin in origins:
+                # "origin" waits for the files of the origin node
+                # { "node" : "origin", "type" : "stream" } runs both nodes at the same time connected by a stream
+                if isinstance(origin, dict):
+                    if origin.get("type", "file") not in ["file", "stream"]:
+                        raise ImportError("Dependency type {} not supported for the component {}".format(origin.get("type"), destination))
+                    if origin.get("type", "file") == "stream":
+                        streams[origin["node"]] = destination
+                    origin = origin["node"]
+                if origin not in config["nodes"]:
+                    raise ImportError("Component {} depends on {} that is not found in the nodes".format(destination, origin))
+                graph.add_edge(origin, destination)
+                dependencies[destination].append(origin)
+
+        # If has cycles, the flow will never end
+        cycle = graph.find_cycle()
+        if cycle is not None:
+            raise ImportError("The flow has cycles so the process will never end: {}".format(" -> ".join(cycle)))
+
+        # The stream is the only input of the destination and the only output of the origin
+        # Otherwise both nodes could wait for each other
+        for origin, destination in streams.items():
+            if len(graph.get_edge(origin)) != 1:
+                raise ImportError("Component {} streams to {} and can not have other outputs".format(origin, destination))
+            if len(graph.get_reversed_edge(destination)) != 1:
+                raise ImportError("Component {} reads the stream of {} and can not have other inputs".format(destination, origin))
+
+        # Built aside and renamed, a plan folder is always complete
+        plan_path = os.path.join(self.__path, flow_hash)
+        tmp_plan_path = "{}.{}.tmp".format(plan_path, os.getpid())
+        if os.path.exists(tmp_plan_path):
+            shutil.rmtree(tmp_plan_path)
+        os.makedirs(os.path.join(tmp_plan_path, "nodes"))
+
+        for idx, (node, parameters) in enumerate(config["nodes"].items()):
+            with open(os.path.join(tmp_plan_path, "nodes", "{}.json".format(idx)), "w") as fw:
+                json.dump(parameters, fw)
+
+        with open(os.path.join(tmp_plan_path, "plan.json"), "w") as fw:
+            json.dump({
+                "config" : config,
+                "dependencies" : dependencies,
+                "streams" : streams
+            }, fw)
+
+        try:
+            os.rename(tmp_plan_path, plan_path)
+        except OSError:
+            # Compiled at the same time by other flow
+            shutil.rmtree(tmp_plan_path)
+
+    # False if the flow file was compiled by this plan
+    def is_cached(self):
+        return self.__cached
+
+    def get_hash(self):
+        return self.__hash
+
+    def get_config(self):
+        return self.__config
+
+    # destination -> origins
+    def get_dependencies(self):
+        return self.__dependencies
+
+    # origin -> destination
+    def get_streams(self):
+        return self.__streams
+
+    def get_node_file(self, node):
+        return os.path.join(self.__path, self.__hash, "nodes", "{}.json".format(self.__node_indexes[node]))
@@ -0,0 +1,102 @@
+import json
+import time
+
+# Timing and resources of every node of a flow
+# ready: all the inputs completed, submitted: sent to the pool, start/end: execution in the worker
+class FlowTrace:
+
+    def __init__(self, execution_id, workers):
+        self.__execution_id = execution_id
+        self.__workers = workers
+        self.__start = time.time()
+        self.__ready = {}
+        self.__submitted = {}
+        self.__results = {}
+
+    def set_ready(self, node, ready_time=None):
+        self.__ready[node] = ready_time if ready_time is not None else time.time()
+
+    def set_submitted(self, node, submitted_time=None):
+        self.__submitted[node] = submitted_time if submitted_time is not None else time.time()
+
+    def set_result(self, node, result):
+        self.__results[node] = result
+
+    # Wait since the node was ready until it started in the worker
+    def get_queue_wait(self, node):
+        result = self.__results[node]
+        return max(0.0, result["start"] - self.__ready.get(node, self.__submitted.get(node, result["start"])))
+
+    def get_makespan(self):
+        if len(self.__results) == 0:
+            return 0.0
+        return max(result["end"] for result in self.__results.values()) - self.__start
+
+    # Part of the available workers time used by the nodes
+    def get_utilization(self):
+        makespan = self.get_makespan()
+        if makespan <= 0:
+            return 0.0
+        return sum(result["end"] - result["start"] for result in self.__results.values()) / (makespan * self.__workers)
+
+    # Chrome trace event format, it can be opened with chrome://tracing or https://ui.perfetto.dev
+    def export_chrome_trace(self, filepath):
+        events = [{
+            "name" : "process_name",
+            "ph" : "M",
+            "pid" : self.__execution_id,
+            "args" : { "name" : self.__execution_id }
+        }]
+
+        for node, result in sorted(self.__results.items(), key=lambda item : item[1]["start"]):
+            events.append({
+                "name" : node,
+                "cat" : "node",
+                "ph" : "X",
+                "pid" : self.__execution_id,
+                "tid" : result["pid"],
+                "ts" : int((result["start"] - self.__start) * 1000000),
+                "dur" : int((result["end"] - result["start"]) * 1000000),
+                "args" : {
+                    "returncode" : result["returncode"],
+                    "queue_wait_s" : round(self.get_queue_wait(node), 6),
+                    "user_s" : round(result["user"], 6),
+                    "system_s" : round(result["system"], 6),
+                    "max_rss_kb" : result["max_rss"]
+                }
+            })
+
+        with open(filepath, "w") as fw:
+            json.dump({ "traceEvents" : events, "displayTimeUnit" : "ms" }, fw)
+
+        return filepath
+
+    def get_summary(self):
+        header = ["Node", "Wait(s)", "Wall(s)", "User(s)", "System(s)", "RSS(MB)", "Result"]
+        rows = [
+            [
+                node,
+                "{:.3f}".format(self.get_queue_wait(node)),
+                "{:.3f}".format(result["end"] - result["start"]),
+                "{:.3f}".format(result["user"]),
+                "{:.3f}".format(result["system"]),
+                "{:.1f}".format(result["max_rss"] / 1024),
+                str(result["returncode"])
+            ]
+            for node, result
+            in sorted(self.__results.items(), key=lambda item : item[1]["start"])
+        ]
+
+        widths = [ max(len(row[idx]) for row in [header] + rows) for idx in range(len(header)) ]
+
+        lines = [
+            "",
+            "Makespan: {:.3f}s, Workers: {}, Utilization: {:.1f}%".format(self.get_makespan(), self.__workers, 100 * self.get_utilization()),
+            ""
+        ]
+        lines.append("| {} |".format(" | ".join(value.ljust(widths[idx]) for idx, value in enumerate(header))))
+        lines.append("| {} |".format(" | ".join("-" * width for width in widths)))
+        for row in rows:
+            lines.append("| {} |".format(" | ".join(value.ljust(widths[idx]) for idx, value in enumerate(row))))
+
+        return "\n".join(lines)
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import fnmatch
+import operator
+
+from stream import is_stream
+
+try:
+    from os import scandir
+except ImportError:
+    # Python 3.4, package scandir
+    from scandir import scandir
+
+# Input files of a component found with one pass of os.scandir per folder, in the order of the names
+# The patterns are checked on the names while walking, the size and the modification time are taken from the
+# entries of the same pass only for the files matched and only if they are asked
+# The components write the listing of their output folder in <output path>.listing.json when they end,
+# the next nodes read it instead of walking the folder again
+class InputListing:
+
+    EXTENSION = ".listing.json"
+    # Changes of the format of the listing invalidate the written ones
+    VERSION = 1
+
+    # patterns: regular expressions searched in the names of the files, glob patterns if glob, None for all the files
+    # full_path: the patterns are checked against the full path of the files
+    # streams: named pipes of the streams accepted as inputs
+    def __init__(self, paths, patterns=None, glob=False, full_path=False, streams=False):
+        self.__patterns = None
+        if patterns is not None:
+            self.__patterns = [ re.compile(fnmatch.translate(pattern) if glob else pattern) for pattern in patterns ]
+        self.__full_path = full_path
+        self.__files = []
+        # path -> (size, modification time in ns), or the entry of os.scandir until they are asked
+        self.__metadata = {}
+
+        for path in paths:
+            if streams and is_stream(path):
+                self.__files.append(path)
+                self.__metadata[path] = None
+            elif os.path.isdir(path):
+                self.__list_folder(path)
+            elif os.path.isfile(path):
+                if self.__match(os.path.dirname(path), os.path.basename(path)):
+                    stat = os.stat(path)
+                    self.__files.append(path)
+                    self.__metadata[path] = (stat.st_size, stat.st_mtime_ns)
+            else:
+                raise ImportError("Path {} is incorrect".format(path))
+
+    # The full path is built only if the patterns are checked against it
+    def __match(self, folder, name):
+        if self.__patterns is None:
+            return True
+        if self.__full_path:
+            name = os.path.join(folder, name)
+        return any(pattern.search(name) for pattern in self.__patterns)
+
+    # Files of the listing of the folder if it is still valid, otherwise the folder is walked
+    def __list_folder(self, path):
+        folders = self.read(path)
+        if folders is None:
+            for folder, mtime_ns, entries in self.__scan(path):
+                for entry in entries:
+                    if self.__match(folder, entry.name):
+                        self.__files.append(entry.path)
+                        self.__metadata[entry.path] = entry
+            return
+
+        for folder, files in folders:
+            for name, size, mtime_ns in files:
+                if self.__match(folder, name):
+                    filepath = os.path.join(folder, name)
+                    self.__files.append(filepath)
+                    self.__metadata[filepath] = (size, mtime_ns)
+
+    def __get_metadata(self, filepath):
+        metadata = self.__metadata[filepath]
+        if metadata is not None and not isinstance(metadata, tuple):
+            stat = metadata.stat()
+            metadata = self.__metadata[filepath] = (stat.st_size, stat.st_mtime_ns)
+        return metadata
+
+    def get_files(self):
+        return list(self.__files)
+
+    def get_size(self, filepath):
+        return self.__get_metadata(filepath)[0]
+
+    def get_mtime_ns(self, filepath):
+        return self.__get_metadata(filepath)[1]
+
+    # Bytes of the files, the streams are not counted
+    def get_total_size(self):
+        return sum(self.get_size(filepath) for filepath in self.__files if self.__metadata[filepath] is not None)
+
+    @classmethod
+    def get_listing_file(cls, path):
+        return os.path.normpath(path) + cls.EXTENSION
+
+    # (folder, modification time in ns, entries of its files) of the folder and its subfolders
+    # A folder before its subfolders, the subfolders and the files in the order of the names
+    @staticmethod
+    def __scan(path):
+        pending = [os.path.normpath(path)]
+
+        while len(pending) > 0:
+            folder = pending.pop()
+            mtime_ns = os.stat(folder).st_mtime_ns
+            subfolders = []
+            files = []
+            # Like os.walk, what is not a folder is a file
+            for entry in sorted(scandir(folder), key=operator.attrgetter("name")):
+                if entry.is_dir():
+                    # Links to folders are not followed
+                    if not entry.is_symlink():
+                        subfolders.append(entry.path)
+                else:
+                    files.append(entry)
+            yield folder, mtime_ns, files
+            # Popped in the order of the names
+            pending.extend(reversed(subfolders))
+
+    # [(folder, [(name, size, modification time in ns)])] of the listing of the folder
+    # None if not found or a folder changed after it was written
+    @classmethod
+    def read(cls, path):
+        try:
+            with open(cls.get_listing_file(path), "r") as fr:
+                listing = json.load(fr)
+        except (OSError, ValueError):
+            return None
+
+        if listing.get("version") != cls.VERSION:
+            return None
+
+        folders = []
+        try:
+            for folder, mtime_ns, files in listing["folders"]:
+                folder = os.path.normpath(os.path.join(path, folder))
+                if os.stat(folder).st_mtime_ns != mtime_ns:
+                    return None
+                folders.append((folder, files))
+        except OSError:
+            return None
+
+        return folders
+
+    # Written to a temporary file first, the next nodes can be reading it
+    # Returns the number of files and their bytes
+    @classmethod
+    def write(cls, path):
+        folders = []
+        for folder, mtime_ns, entries in cls.__scan(path):
+            files = []
+            for entry in entries:
+                stat = entry.stat()
+                files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+            folders.append((os.path.relpath(folder, path), mtime_ns, files))
+
+        listing_file = cls.get_listing_file(path)
+        tmp_listing_file = "{}.{}.tmp".format(listing_file, os.getpid())
+        with open(tmp_listing_file, "w") as fw:
+            json.dump({
+                "version" : cls.VERSION,
+                "folders" : folders
+            }, fw)
+        os.replace(tmp_listing_file, listing_file)
+
+        return sum(len(files) for folder, mtime_ns, files in folders), sum(size for folder, mtime_ns, files in folders for name, size, mtime_ns in files)
+
+    @classmethod
+    def remove(cls, path):
+        try:
+            os.remove(cls.get_listing_file(path))
+        except OSError:
+            pass
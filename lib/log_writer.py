@@ -0,0 +1,169 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+
+# Records of the loggers written by a background thread, logging does not wait for the screen or the disk
+# One writer per log file and process, so per execution id, the waiting records are written together
+# with one write and one flush per handler
+class LogWriter:
+
+    # Format of the structured log written besides the log file
+    STRUCTURED_FORMATS = ["json"]
+    # Max records written together
+    BATCH_SIZE = 1000
+
+    # log file -> writer of this process
+    __writers = {}
+    # Held by the threads while writing and by fork, a forked process would inherit the locks of the streams taken
+    _fork_lock = threading.Lock()
+
+    # structured_format: None or json, the records are written also as JSON lines in <log file>.jsonl
+    def __init__(self, log_file, handlers, structured_format=None):
+        if structured_format is not None and structured_format not in self.STRUCTURED_FORMATS:
+            raise ImportError("Structured log {} not supported".format(structured_format))
+
+        self.__log_file = log_file
+        self.__handlers = handlers
+        self.__structured_file = os.path.splitext(log_file)[0] + ".jsonl" if structured_format is not None else None
+        self.__structured_stream = None
+        self.__pid = os.getpid()
+        self.__closed = False
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+        # Records still in the queue when the process ends
+        atexit.register(self.close)
+
+    # The handlers and the format are the ones of the first call for the log file
+    @classmethod
+    def get_writer(cls, log_file, handlers, structured_format=None):
+        if log_file not in cls.__writers:
+            cls.__writers[log_file] = cls(log_file, handlers, structured_format)
+        return cls.__writers[log_file]
+
+    def put(self, record):
+        # A forked process, like the pools of the components, does not have the thread of the writer
+        if self.__closed or os.getpid() != self.__pid:
+            self.__write([record])
+        else:
+            self.__queue.put(record)
+
+    # Waits until the records given until now are written
+    def flush(self):
+        if not self.__closed and os.getpid() == self.__pid:
+            self.__queue.join()
+
+    # The records given later are written without the thread
+    def close(self):
+        if not self.__closed and os.getpid() == self.__pid:
+            self.__queue.put(None)
+            self.__thread.join()
+            self.__closed = True
+            atexit.unregister(self.close)
+            if self.__writers.get(self.__log_file) is self:
+                del self.__writers[self.__log_file]
+        if self.__structured_stream is not None:
+            self.__structured_stream.close()
+            self.__structured_stream = None
+
+    # Also the files of the handlers, for the writers that own their handlers
+    def close_handlers(self):
+        self.close()
+        for handler in self.__handlers:
+            handler.close()
+
+    def __run(self):
+        while True:
+            records = [self.__queue.get()]
+            while len(records) < self.BATCH_SIZE:
+                try:
+                    records.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with self._fork_lock:
+                self.__write([ record for record in records if record is not None ])
+            for record in records:
+                self.__queue.task_done()
+            if None in records:
+                return
+
+    def __write(self, records):
+        for handler in self.__handlers:
+            records_to_write = [ record for record in records if record.levelno >= handler.level and handler.filter(record) ]
+            if len(records_to_write) == 0:
+                continue
+            if not isinstance(handler, logging.StreamHandler):
+                for record in records_to_write:
+                    handler.handle(record)
+                continue
+
+            handler.acquire()
+            try:
+                # Files opened with delay, or closed by a new configuration of the logging
+                if handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write("".join(handler.format(record) + handler.terminator for record in records_to_write))
+                handler.flush()
+            except Exception:
+                handler.handleError(records_to_write[0])
+            finally:
+                handler.release()
+
+        if self.__structured_file is not None and len(records) > 0:
+            if self.__structured_stream is None:
+                self.__structured_stream = open(self.__structured_file, "a")
+            self.__structured_stream.write("".join(
+                json.dumps({
+                    "time" : record.created,
+                    "level" : record.levelname,
+                    "pid" : record.process,
+                    "logger" : record.name,
+                    "message" : record.getMessage()
+                }) + "\n"
+                for record
+                in records
+            ))
+            self.__structured_stream.flush()
+
+# Handler of the loggers, the records are formatted here and written by the writer
+class QueueLogHandler(logging.Handler):
+
+    def __init__(self, writer):
+        super().__init__()
+        self.__writer = writer
+
+    # The message is built in the thread of the call, its arguments and exception could change later
+    def emit(self, record):
+        try:
+            record.msg = self.format(record)
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            record.stack_info = None
+            self.__writer.put(record)
+        except Exception:
+            self.handleError(record)
+
+    def get_writer(self):
+        return self.__writer
+
+    def flush(self):
+        self.__writer.flush()
+
+    def close(self):
+        self.__writer.close()
+        super().close()
+
+# Python 3.7+, before the fork waits for the writes in progress
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=LogWriter._fork_lock.acquire,
+        after_in_parent=LogWriter._fork_lock.release,
+        after_in_child=LogWriter._fork_lock.release
+    )
@@ -0,0 +1,162 @@
+import os
+import json
+import stat
+import time
+import shutil
+import hashlib
+import threading
+
+# Outputs of the nodes stored by the hash of everything that can change them
+# config of the node, source of the component and the lib, and fingerprint of the inputs
+# The modification time of an entry is the time of its last use, the entries not used in retention_days are collected
+class NodeCache:
+
+    FINGERPRINTS = ["stat", "content"]
+
+    # trash: previous outputs replaced by the cache and collected entries are moved to it instead of deleted
+    # retention_days: None keeps all the entries
+    def __init__(self, path, lib_path, fingerprint="stat", trash=None, retention_days=None):
+        if fingerprint not in self.FINGERPRINTS:
+            raise ImportError("Cache fingerprint {} not supported".format(fingerprint))
+
+        self.__path = path
+        self.__trash = trash
+        self.__fingerprint = fingerprint
+        self.__retention_days = retention_days
+        self.__sources = {}
+        self.__lib_hash = self.__hash_files(sorted(
+            os.path.join(lib_path, filename)
+            for filename
+            in os.listdir(lib_path)
+            if filename.endswith(".py")
+        ))
+
+        if not os.path.exists(self.__path):
+            os.makedirs(self.__path)
+
+    # node_info: configuration of the node with the values of the execution already replaced
+    # input_paths: folders or files read by the node, the missing ones are skipped
+    def get_key(self, node_info, script_path, input_paths):
+        if script_path not in self.__sources:
+            self.__sources[script_path] = self.__hash_files([script_path])
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps(node_info, sort_keys=True).encode("utf-8"))
+        digest.update(self.__sources[script_path].encode("utf-8"))
+        digest.update(self.__lib_hash.encode("utf-8"))
+
+        # Paths of the inputs change with the execution id, only the position is kept
+        for idx, input_path in enumerate(input_paths):
+            digest.update("input {}".format(idx).encode("utf-8"))
+            for fingerprint in self.__get_fingerprints(input_path):
+                digest.update(fingerprint.encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def get_entry(self, key):
+        return os.path.join(self.__path, key)
+
+    def contains(self, key):
+        return os.path.isdir(self.get_entry(key))
+
+    # Output folder is rebuilt with links to the cached files, they are read-only
+    def restore(self, key, output_path):
+        if self.__trash is not None:
+            self.__trash.move(output_path)
+        else:
+            remove_path(output_path)
+        os.utime(self.get_entry(key))
+        link_tree(self.get_entry(key), output_path)
+
+    # The files of the output are linked, not copied, so they are made read-only
+    # A component writing in place into a stored or restored output fails instead of changing the entry
+    # Called by other threads, nodes of the same flow can store the same key
+    def store(self, key, output_path):
+        if self.contains(key) or not os.path.isdir(output_path):
+            return
+        # Entry is visible only when completed
+        tmp_entry = "{}.{}.{}.tmp".format(self.get_entry(key), os.getpid(), threading.get_ident())
+        remove_path(tmp_entry)
+        link_tree(output_path, tmp_entry)
+        make_files_read_only(tmp_entry)
+        try:
+            os.rename(tmp_entry, self.get_entry(key))
+        except OSError:
+            # Stored at the same time by other flow
+            remove_path(tmp_entry)
+
+    # Entries not used in the last retention_days, and the ones left by stores that did not finish
+    def collect(self):
+        if self.__retention_days is None:
+            return []
+
+        limit = time.time() - self.__retention_days * 24 * 3600
+        collected = []
+        for entry in os.listdir(self.__path):
+            entry_path = os.path.join(self.__path, entry)
+            try:
+                if os.path.getmtime(entry_path) >= limit:
+                    continue
+            except OSError:
+                # Collected at the same time by other flow
+                continue
+            if self.__trash is not None:
+                self.__trash.move(entry_path)
+            else:
+                remove_path(entry_path)
+            collected.append(entry)
+        return collected
+
+    def __get_fingerprints(self, input_path):
+        if os.path.isfile(input_path):
+            yield self.__get_file_fingerprint(input_path)
+        elif os.path.isdir(input_path):
+            for root, dirs, files in os.walk(input_path):
+                dirs.sort()
+                for filename in sorted(files):
+                    filepath = os.path.join(root, filename)
+                    yield "{}:{}".format(os.path.relpath(filepath, input_path), self.__get_file_fingerprint(filepath))
+
+    def __get_file_fingerprint(self, filepath):
+        if self.__fingerprint == "content":
+            return self.__hash_files([filepath])
+        stat = os.stat(filepath)
+        return "{}:{}".format(stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def __hash_files(filepaths):
+        digest = hashlib.sha256()
+        for filepath in filepaths:
+            with open(filepath, "rb") as fr:
+                for block in iter(lambda : fr.read(1024 * 1024), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
+def remove_path(path):
+    if os.path.islink(path) or os.path.isfile(path):
+        os.unlink(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+# Folders are kept writable, so the entries and the outputs can be deleted
+def make_files_read_only(path):
+    for root, dirs, files in os.walk(path):
+        for filename in files:
+            filepath = os.path.join(root, filename)
+            if os.path.islink(filepath):
+                continue
+            mode = stat.S_IMODE(os.stat(filepath).st_mode)
+            os.chmod(filepath, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+# Copy of a folder with hard links, the files are copied if links are not possible
+def link_tree(source, destination):
+    os.makedirs(destination)
+    for root, dirs, files in os.walk(source):
+        relative_root = os.path.relpath(root, source)
+        for directory in dirs:
+            os.makedirs(os.path.join(destination, relative_root, directory))
+        for filename in files:
+            try:
+                os.link(os.path.join(root, filename), os.path.join(destination, relative_root, filename))
+            except OSError:
+                shutil.copy2(os.path.join(root, filename), os.path.join(destination, relative_root, filename))
@@ -0,0 +1,38 @@
+import concurrent.futures
+
+# Results of function(*args) for the args of the tasks, in the order of the tasks, executed by the executor
+# Each task has its sequence number, the results done before the ones of the previous tasks wait in a reorder buffer
+# window: tasks submitted and not yet returned, the buffer included
+# A slow task stops the submissions when the window is full instead of growing the buffer
+def ordered_map(executor, function, tasks, window):
+    tasks = iter(tasks)
+    # future -> sequence number, of the tasks not done
+    pending = {}
+    # sequence number -> future, of the tasks done before the previous ones
+    buffer = {}
+    submitted = 0
+    returned = 0
+    exhausted = False
+
+    while True:
+        while not exhausted and submitted - returned < window:
+            try:
+                args = next(tasks)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(function, *args)] = submitted
+            submitted += 1
+
+        if returned == submitted:
+            return
+
+        if returned not in buffer:
+            done, not_done = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                buffer[pending.pop(future)] = future
+
+        while returned in buffer:
+            result = buffer.pop(returned).result()
+            returned += 1
+            yield result
@@ -0,0 +1,313 @@
+import os
+import time
+import queue
+import signal
+import socket
+import itertools
+import threading
+import concurrent.futures
+
+from multiprocessing.managers import BaseManager, BaseProxy, DictProxy
+from concurrent.futures.process import BrokenProcessPool
+
+from lib import component_runner
+from lib.cpu_tokens import CPUTokens
+
+# Nodes executed by agents in other hosts, the coordinator is the executor of the flow
+# The agents pull the tasks when they have free workers and push back the results
+# The hosts share the folders of the flow at the same paths, the outputs are written there by the components
+# task: (task id, function of component_runner, arguments, current directory of the coordinator, CPU tokens of the node)
+# The agents send a heartbeat, the nodes of an agent without heartbeat for the lease fail
+
+# Seconds between the heartbeats of the agents
+HEARTBEAT_INTERVAL = 1
+
+def parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return (host, int(port))
+
+class CoordinatorManager(BaseManager):
+    pass
+
+class AgentManager(BaseManager):
+    pass
+
+AgentManager.register("get_tasks")
+AgentManager.register("get_results")
+AgentManager.register("get_signals", proxytype=DictProxy)
+
+class RemoteExecutor(concurrent.futures.Executor):
+
+    # REMOTE_AUTHKEY of the flows and of the agents, when it is not in the flow or in the arguments
+    ENVIRONMENT_VARIABLE = "DATA_PROCESS_REMOTE_AUTHKEY"
+    FUNCTIONS = ["run_command", "run_component"]
+    # The CPU tokens of the nodes are taken by the agents, each one has the budget of its host
+    CPU_METERED = True
+
+    # lease: seconds without heartbeat for an agent to be lost
+    def __init__(self, address, authkey, lease=30):
+        self.__lease = lease
+        self.__tasks = queue.Queue()
+        self.__results = queue.Queue()
+        # task id -> signal to send to the node by its agent
+        self.__signals = {}
+        self.__futures = {}
+        # task id -> agent running it, agent -> time of its last message
+        self.__task_agents = {}
+        self.__agents_seen = {}
+        self.__task_ids = itertools.count()
+        self.__lock = threading.Lock()
+        self.__shutdown = False
+
+        # One manager class per executor, the registry of the manager is shared by its instances
+        manager_class = type("CoordinatorManager", (CoordinatorManager,), {})
+        manager_class.register("get_tasks", callable=lambda : self.__tasks)
+        manager_class.register("get_results", callable=lambda : self.__results)
+        manager_class.register("get_signals", callable=lambda : self.__signals, proxytype=DictProxy)
+
+        self.__server = manager_class(address=parse_address(address), authkey=authkey.encode("utf-8")).get_server()
+        self.__server_thread = threading.Thread(target=self.__server.serve_forever)
+        self.__server_thread.daemon = True
+        self.__server_thread.start()
+
+        self.__results_thread = threading.Thread(target=self.__read_results)
+        self.__results_thread.daemon = True
+        self.__results_thread.start()
+
+    def get_address(self):
+        return self.__server.address
+
+    def submit(self, function, *args, cpu=1):
+        if function.__name__ not in self.FUNCTIONS:
+            raise ImportError("Function {} can not be executed by the agents".format(function.__name__))
+
+        with self.__lock:
+            if self.__shutdown:
+                raise RuntimeError("Cannot schedule new futures after shutdown")
+            task_id = next(self.__task_ids)
+            future = concurrent.futures.Future()
+            self.__futures[task_id] = future
+
+        self.__tasks.put((task_id, function.__name__, args, os.getcwd(), cpu))
+        return future
+
+    # The node runs in other host, its agent sends the signal to its process group
+    # Returns False if no agent has started the node yet
+    def signal_component(self, future, sig):
+        for task_id, task_future in list(self.__futures.items()):
+            if task_future is future:
+                if not future.running():
+                    return False
+                self.__signals[task_id] = int(sig)
+                return True
+        return False
+
+    # ("started", task id, agent) when an agent takes a task, ("finished", task id, result, error) when it ends
+    # ("heartbeat", None, agent) while the agent is connected
+    def __read_results(self):
+        while True:
+            try:
+                message = self.__results.get(True, HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                message = ("heartbeat", None, None)
+            if message is None:
+                return
+
+            if message[0] in ["started", "heartbeat"] and message[2] is not None:
+                self.__agents_seen[message[2]] = time.time()
+            self.__expire_agents()
+
+            future = self.__futures.get(message[1])
+            if future is None:
+                continue
+
+            if message[0] == "started":
+                self.__task_agents[message[1]] = message[2]
+                # Cancelled before any agent took it, the agent stops it
+                if not future.set_running_or_notify_cancel():
+                    self.__signals[message[1]] = int(signal.SIGKILL)
+            elif message[0] == "finished":
+                self.__futures.pop(message[1], None)
+                self.__signals.pop(message[1], None)
+                self.__task_agents.pop(message[1], None)
+                if future.cancelled():
+                    continue
+                if message[3] is not None:
+                    future.set_exception(RuntimeError(message[3]))
+                else:
+                    future.set_result(message[2])
+
+    # The nodes of a lost agent fail, its results are ignored if it comes back
+    # Not executed again, the agent could still be writing their outputs
+    def __expire_agents(self):
+        limit = time.time() - self.__lease
+        for task_id, agent in list(self.__task_agents.items()):
+            if self.__agents_seen.get(agent, 0) >= limit:
+                continue
+            del self.__task_agents[task_id]
+            self.__signals.pop(task_id, None)
+            future = self.__futures.pop(task_id, None)
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError("Agent {} lost, no heartbeat in {}s".format(agent, self.__lease)))
+
+    def shutdown(self, wait=True, *args, **kwargs):
+        with self.__lock:
+            self.__shutdown = True
+
+        # The tasks not taken by any agent are not executed
+        while True:
+            try:
+                task_id = self.__tasks.get_nowait()[0]
+            except queue.Empty:
+                break
+            future = self.__futures.pop(task_id, None)
+            if future is not None:
+                future.cancel()
+
+        if wait:
+            concurrent.futures.wait(list(self.__futures.values()))
+        self.__results.put(None)
+
+        # The agents see the coordinator gone and wait for other one
+        if hasattr(self.__server, "stop_event"):
+            self.__server.stop_event.set()
+        self.__server.listener.close()
+
+# Executes the tasks of a coordinator with a pool of workers in this host
+class RemoteAgent:
+
+    def __init__(self, address, authkey, workers, pid_path, script_paths=[]):
+        self.__address = parse_address(address)
+        self.__authkey = authkey.encode("utf-8")
+        self.__workers = workers
+        self.__pid_path = pid_path
+        self.__script_paths = script_paths
+        self.__host = socket.gethostname()
+        self.__agent = "{}:{}".format(self.__host, os.getpid())
+
+        if not os.path.exists(self.__pid_path):
+            os.makedirs(self.__pid_path)
+
+        # CPU budget of the host, shared by the nodes and the pools of their components
+        self.__cpu_tokens = CPUTokens(os.path.join(self.__pid_path, ".cpu_tokens"), self.__workers)
+        # Inherited by the workers and the components
+        os.environ[CPUTokens.ENVIRONMENT_VARIABLE] = self.__cpu_tokens.get_path()
+
+    def __get_pid_file(self, task_id):
+        return os.path.join(self.__pid_path, "task_{}".format(task_id))
+
+    # Pid file of the agent, the one of the coordinator is in other host
+    def __get_local_args(self, task_id, function_name, args):
+        if function_name == "run_command":
+            return (args[0], self.__get_pid_file(task_id))
+        parameters = dict(args[0], pid_file=self.__get_pid_file(task_id))
+        return (parameters,)
+
+    def __signal_tasks(self, running_tasks, signals, signalled_tasks):
+        for future, task_id in running_tasks.items():
+            sig = signals.get(task_id)
+            if sig is None or (task_id, sig) in signalled_tasks:
+                continue
+            signalled_tasks.add((task_id, sig))
+            try:
+                with open(self.__get_pid_file(task_id), "r") as fr:
+                    pid = int(fr.read())
+                if os.getpgid(pid) == pid:
+                    os.killpg(pid, sig)
+                else:
+                    os.kill(pid, sig)
+            except (OSError, ValueError):
+                # Not started or already finished
+                pass
+
+    # The next coordinator listens on the same address, the proxies of this one must not reach it
+    # Their references are not released and the connection cached for the address is dropped
+    def __release_proxies(self, proxies):
+        for proxy in proxies:
+            if hasattr(proxy, "_close"):
+                proxy._close.cancel()
+        BaseProxy._address_to_local.pop(self.__address, None)
+
+    # Same workers as the in-process mode, the components are imported once
+    def __create_executor(self):
+        return component_runner.WorkerPool(self.__workers, self.__script_paths, os.getpid())
+
+    def run(self):
+        manager = AgentManager(address=self.__address, authkey=self.__authkey)
+        manager.connect()
+        tasks = manager.get_tasks()
+        results = manager.get_results()
+        signals = manager.get_signals()
+
+        running_tasks = {}
+        signalled_tasks = set()
+        # Task taken and waiting for the CPU tokens of its node
+        waiting_task = None
+        task_tokens = {}
+
+        executor = self.__create_executor()
+        heartbeat_time = 0
+        try:
+            while True:
+                if time.time() - heartbeat_time >= HEARTBEAT_INTERVAL:
+                    heartbeat_time = time.time()
+                    results.put(("heartbeat", None, self.__agent))
+
+                # Pull only with free workers, so the idle agents take the next tasks
+                if waiting_task is None and len(running_tasks) < self.__workers:
+                    try:
+                        waiting_task = tasks.get(True, 0.1)
+                        results.put(("started", waiting_task[0], self.__agent))
+                    except queue.Empty:
+                        pass
+                elif len(running_tasks) > 0:
+                    concurrent.futures.wait(running_tasks, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED)
+                else:
+                    # The CPU tokens are taken by the pools of other processes of this host
+                    time.sleep(0.1)
+
+                if waiting_task is not None:
+                    task_id, function_name, args, cwd, cpu = waiting_task
+                    tokens = []
+                    if signals.get(task_id) is not None:
+                        # Cancelled before it started
+                        waiting_task = None
+                        results.put(("finished", task_id, None, "{}: cancelled".format(self.__host)))
+                    else:
+                        tokens = self.__cpu_tokens.acquire(max(1, min(cpu, self.__cpu_tokens.get_size())))
+                    if len(tokens) > 0:
+                        waiting_task = None
+                        task_args = (run_task, function_name, self.__get_local_args(task_id, function_name, args), cwd)
+                        try:
+                            future = executor.submit(*task_args)
+                        except BrokenProcessPool:
+                            # A worker died, the cancelled nodes stop only their forks of the workers
+                            executor.shutdown(wait=True)
+                            executor = self.__create_executor()
+                            future = executor.submit(*task_args)
+                        running_tasks[future] = task_id
+                        task_tokens[task_id] = tokens
+
+                for future in [ future for future in running_tasks if future.done() ]:
+                    task_id = running_tasks.pop(future)
+                    CPUTokens.release(task_tokens.pop(task_id, []))
+                    if future.exception() is not None:
+                        results.put(("finished", task_id, None, "{}: {}".format(self.__host, future.exception())))
+                    else:
+                        results.put(("finished", task_id, dict(future.result(), host=self.__host), None))
+
+                if len(running_tasks) > 0:
+                    self.__signal_tasks(running_tasks, signals.copy(), signalled_tasks)
+        except (EOFError, ConnectionError):
+            # The coordinator is gone
+            pass
+        finally:
+            executor.shutdown(wait=True)
+            for tokens in task_tokens.values():
+                CPUTokens.release(tokens)
+            self.__release_proxies([tasks, results, signals])
+
+# Executed in the workers of the agent, in the directory of the coordinator so the relative paths are the same
+def run_task(function_name, args, cwd):
+    os.chdir(cwd)
+    return getattr(component_runner, function_name)(*args)
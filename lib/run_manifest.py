@@ -0,0 +1,66 @@
+import os
+import json
+import time
+import hashlib
+
+# State of the nodes of one execution, saved after every change to resume the flow after a failure
+# A node is completed only if it finished with the same configuration that is going to be executed
+class RunManifest:
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    # resume: load the state of the previous execution, otherwise it starts empty
+    def __init__(self, filepath, resume=False):
+        self.__filepath = filepath
+        self.__manifest = { "nodes" : {} }
+
+        if resume:
+            if not os.path.exists(self.__filepath):
+                raise ImportError("No manifest {} to resume the execution".format(self.__filepath))
+            with open(self.__filepath, "r") as fr:
+                self.__manifest = json.load(fr)
+
+    def get_filepath(self):
+        return self.__filepath
+
+    @staticmethod
+    def get_signature(node_info):
+        return hashlib.sha256(json.dumps(node_info, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get_status(self, node):
+        return self.__manifest["nodes"].get(node, {}).get("status", self.PENDING)
+
+    # Completed nodes that can be reused, signatures: node -> current signature
+    def get_completed_nodes(self, signatures):
+        return set(
+            node
+            for node, signature
+            in signatures.items()
+            if self.get_status(node) == self.COMPLETED and self.__manifest["nodes"][node].get("signature") == signature
+        )
+
+    def set_flow(self, flow_file, execution_id):
+        self.__manifest["flow"] = os.path.abspath(flow_file)
+        self.__manifest["id"] = execution_id
+        self.save()
+
+    def set_status(self, node, status, signature=None):
+        self.__manifest["nodes"][node] = {
+            "status" : status,
+            "signature" : signature,
+            "time" : time.time()
+        }
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.__filepath)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_filepath = "{}.tmp".format(self.__filepath)
+        with open(tmp_filepath, "w") as fw:
+            json.dump(self.__manifest, fw, indent=4, sort_keys=True)
+        os.replace(tmp_filepath, self.__filepath)
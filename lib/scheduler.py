@@ -0,0 +1,115 @@
+import os
+import json
+import heapq
+
+# Ready nodes are ranked by the longest remaining path until the end of the flow
+# Starting first the long chains reduces the total time when WORKERS is lower than the ready nodes
+class CriticalPathScheduler:
+
+    # Weight of the last duration of a node in its history
+    DURATION_WEIGHT = 0.3
+
+    def __init__(self, graph, durations=None):
+        self.__graph = graph
+        self.__durations = durations if durations is not None else {}
+
+        node_keys = graph.topological_sort()
+        self.__order = { key : idx for idx, key in enumerate(node_keys) }
+
+        # Nodes without history take the average of the known ones
+        # Without any history all the nodes weight the same, so the path is counted by nodes
+        known_durations = [ self.__durations[key] for key in node_keys if key in self.__durations ]
+        default_weight = sum(known_durations) / len(known_durations) if len(known_durations) > 0 else 1
+        self.__weighted_by_time = len(known_durations) > 0
+        self.__weights = { key : self.__durations.get(key, default_weight) for key in node_keys }
+
+        self.__priorities = graph.get_longest_paths(self.__weights)
+        self.__queue = []
+
+    def __len__(self):
+        return len(self.__queue)
+
+    def is_weighted_by_time(self):
+        return self.__weighted_by_time
+
+    def get_priority(self, node):
+        return self.__priorities[node]
+
+    # nodes: the ones executed, the others were completed before and weight 0, by default all of them
+    def get_critical_path_length(self, nodes=None):
+        priorities = self.__priorities
+        if nodes is not None:
+            priorities = self.__graph.get_longest_paths({ key : self.__weights[key] if key in nodes else 0 for key in self.__order })
+        return max(priorities.values()) if len(priorities) > 0 else 0
+
+    def push(self, node):
+        # Same priority keeps the order of the flow
+        heapq.heappush(self.__queue, (-self.__priorities[node], self.__order[node], node))
+
+    def peek(self):
+        return self.__queue[0][2]
+
+    def pop(self):
+        return heapq.heappop(self.__queue)[2]
+
+    # Drop all the pending nodes, returns them
+    def clear(self):
+        nodes = [ node for _, _, node in sorted(self.__queue) ]
+        self.__queue = []
+        return nodes
+
+    # Simulation of the flow with the same ranking and the weights as durations
+    # nodes: the ones executed, the others were completed before the start, by default all of them
+    def get_expected_makespan(self, workers, nodes=None):
+        nodes = set(self.__order) if nodes is None else set(nodes)
+        in_degrees = {
+            key : len([ edge for edge in self.__graph.get_reversed_edge(key) if edge in nodes ])
+            for key in nodes
+        }
+        ready = []
+        running = []
+        current_time = 0
+
+        for key in self.__order:
+            if key in nodes and in_degrees[key] == 0:
+                heapq.heappush(ready, (-self.__priorities[key], self.__order[key], key))
+
+        while len(ready) > 0 or len(running) > 0:
+            while len(ready) > 0 and len(running) < workers:
+                _, _, key = heapq.heappop(ready)
+                heapq.heappush(running, (current_time + self.__weights[key], self.__order[key], key))
+
+            current_time, _, key = heapq.heappop(running)
+            for node in self.__graph.get_edge(key):
+                if node not in nodes:
+                    continue
+                in_degrees[node] -= 1
+                if in_degrees[node] == 0:
+                    heapq.heappush(ready, (-self.__priorities[node], self.__order[node], node))
+
+        return current_time
+
+    # Unreadable history is ignored, the durations are learned again
+    @staticmethod
+    def load_durations(filepath):
+        try:
+            with open(filepath, "r") as fr:
+                durations = json.load(fr)
+        except (OSError, ValueError):
+            return {}
+        return durations if isinstance(durations, dict) else {}
+
+    # Exponential moving average, a single slow or fast execution does not reorder the flow
+    # Written to a temporary file first, other executions of the flow can read it at the same time
+    @staticmethod
+    def save_durations(filepath, durations):
+        history = CriticalPathScheduler.load_durations(filepath)
+        for key, duration in durations.items():
+            if key in history:
+                duration = CriticalPathScheduler.DURATION_WEIGHT * duration + (1 - CriticalPathScheduler.DURATION_WEIGHT) * history[key]
+            history[key] = duration
+
+        tmp_filepath = "{}.{}.tmp".format(filepath, os.getpid())
+        with open(tmp_filepath, "w") as fw:
+            json.dump(history, fw, indent=4, sort_keys=True)
+        os.replace(tmp_filepath, filepath)
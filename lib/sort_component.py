@@ -1,19 +1,24 @@
 import csv
+import io
 import os
+import time
+import shutil
 import tempfile
 import heapq
 import functools
 
-import concurrent.futures
-
-from async_component import AsyncComponent
-
-from utils import read_file_line_by_line
+from async_component import AsyncComponent, read_chunk
+from component_metrics import ComponentMetrics
+from sorted_output import SortedOutput
 
 class SortComponent(AsyncComponent):
 
-    def __init__(self):
-        super().__init__()
+    # Bytes of memory for each byte of a run while it is sorted, the lines and their keys are objects
+    # About 6 measured with lines of 25 bytes, the shorter the lines the more
+    __MEMORY_PER_BYTE = 8
+
+    def __init__(self, args=None):
+        super().__init__(args)
 
     # Abstract from parent
     def _read_input(self, input_list):
@@ -23,95 +28,149 @@ class SortComponent(AsyncComponent):
         config = super()._read_config(node_info)
 
         # Default Setting 
-        config["CHUNK_SIZE"] = config.get("CHUNK_SIZE", 3)
+        # Memory of a sort, shared by the runs sorted at the same time and then by the buffers of the merges
+        config["SORT_MEMORY_MB"] = config.get("SORT_MEMORY_MB", 256)
+        # Runs merged at once, more runs are merged in several passes
+        config["SORT_FAN_IN"] = config.get("SORT_FAN_IN", 64)
+
+        if config["SORT_MEMORY_MB"] <= 0:
+            raise ImportError("SORT_MEMORY_MB must be positive, {} given".format(config["SORT_MEMORY_MB"]))
+        if config["SORT_FAN_IN"] < 2:
+            raise ImportError("SORT_FAN_IN must be at least 2, {} given".format(config["SORT_FAN_IN"]))
 
         return config
 
+    def process(self):
+        super().process()
+        SortedOutput.remove(self._OUTPUT_PATH)
+        # Output files written sorted by the component, see SortedOutput
+        self._sorted_output = SortedOutput()
+
+    def close(self):
+        if getattr(self, "_sorted_output", None) is not None:
+            sorted_output = self._sorted_output
+            self._sorted_output = None
+            try:
+                sorted_output.write(self._OUTPUT_PATH)
+            except OSError as e:
+                # The next nodes sort the files again
+                self.log_error("Sorted output not written: {}".format(e))
+        super().close()
+
     # Sort files
     # key: this is a condition used to sort the lines, default not change any data
     # if need to take into account the header (not been sortered)
-    def _sort_file(self, filepath, key=None, has_header=False):
-        chunk_size = self._config["CHUNK_SIZE"]
-        header = None
-        chunk = []
-        temp_files = []
-        futures = []
-
-        for line in read_file_line_by_line(filepath):
-            if has_header and not header:
-                header = line
-            else:
-                chunk.append(line)
-
-            # Write by chunks
-            if len(chunk) >= chunk_size:
-                futures.append(
-                    self._executor.submit(
-                        self._write_sorted_temp_file, 
-                        self._TMP_PATH, 
-                        chunk,
-                        key=key
-                    )
-                )
-                chunk = []
-
-        # Write the last chunk
-        if len(chunk) >= 0:
-            futures.append(
-                self._executor.submit(
-                    self._write_sorted_temp_file, 
-                    self._TMP_PATH, 
-                    chunk,
-                    key=key
-                )
-            )
-
-        for future in concurrent.futures.as_completed(futures):
-            temp_files.append(future.result())
+    # columns, delimiter: what key returns, the fields of the columns joined by the delimiter
+    # If given, the files written sorted by the same key by the previous node are not sorted again
+    # output_filepath: the sorted file is written there as an output of the component, by default in the tmp folder
+    def _sort_file(self, filepath, key=None, has_header=False, columns=None, delimiter=None, output_filepath=None):
+        is_output = output_filepath is not None
+        if columns is not None and SortedOutput.is_sorted(filepath, self._INPUT_PATH, columns, delimiter, has_header):
+            self.log_info("Already sorted: {}".format(filepath))
+            self._metrics.count("sorted_inputs")
+            if not is_output:
+                return filepath
+            with open(filepath, "r") as fr, self._open_output(output_filepath) as fw:
+                shutil.copyfileobj(fr, fw)
+            return output_filepath
+
+        memory = int(self._config["SORT_MEMORY_MB"] * 1024 * 1024)
+        fan_in = self._config["SORT_FAN_IN"]
+        # Runs sorted and merges done at the same time, one by worker
+        parallel = 1 if self._executor_kind == "inline" else self._config["WORKERS"]
+        run_bytes = max(1, memory // (parallel * self.__MEMORY_PER_BYTE))
+        # Readers of the runs and writer of each merge
+        buffer_size = max(io.DEFAULT_BUFFER_SIZE, memory // (parallel * (fan_in + 1)))
+
+        # sort: runs of about run_bytes of the file, read, sorted and written by the pool
+        with self._metrics.timer("sort"):
+            header, chunks = self._get_file_chunks(filepath, has_header, run_bytes)
+            # In the order of the chunks, the equal keys are merged in the order of the file
+            temp_files = list(self._submit_bounded(
+                self._write_sorted_temp_file,
+                ((self._TMP_PATH, chunk, key, buffer_size) for chunk in chunks),
+                ordered=True
+            ))
 
         # As only one writer, not concurrency on this part
-        output_filepath = os.path.join(self._TMP_PATH, os.path.basename(os.path.normpath(filepath)))
-
-        # Add header
-        if has_header and header:
-            with open(output_filepath, "w") as fw:
+        if not is_output:
+            output_filepath = os.path.join(self._TMP_PATH, os.path.basename(os.path.normpath(filepath)))
+
+        # merge: runs merged by fan_in by the pool until one pass is left, the last one written by the component
+        # The writes of the output are timed in the write phase, not in merge
+        merge_start = time.time()
+        while len(temp_files) > fan_in:
+            temp_files = list(self._submit_bounded(
+                self._merge_temp_files,
+                ((self._TMP_PATH, temp_files[idx:idx + fan_in], key, buffer_size) for idx in range(0, len(temp_files), fan_in)),
+                ordered=True
+            ))
+            self._metrics.count("merge_passes")
+
+        fw = self._open_output(output_filepath, buffer_size) if is_output else open(output_filepath, "w", buffering=buffer_size)
+        with fw:
+            # Add header
+            if has_header and header:
                 fw.write("{}\n".format(header))
-
-        self._generate_sorted_file_by_temp_files(output_filepath, temp_files, key=key)
+            rows = self.__merge(fw, temp_files, key, buffer_size)
+        self._metrics.count("merge_passes")
+        self._metrics.count("merge_rows", rows)
+        self._metrics.add_time("merge", time.time() - merge_start - (fw.get_seconds() if is_output else 0.0))
         return output_filepath
 
+    # data: chunk of the file or lines, see read_chunk
+    # The empty lines are not kept, the readers of the sorted files stop at them
     @classmethod
-    def _write_sorted_temp_file(cls, temp_directory, data, key=None):
+    def _write_sorted_temp_file(cls, temp_directory, data, key=None, buffer_size=-1):
         key = key if key else lambda line : line
+        # Metrics of the task, added to the ones of the component
+        metrics = ComponentMetrics.get_current()
+
+        with metrics.timer("sort_run_tasks"):
+            lines = read_chunk(data)
+            metrics.count("rows_read", len(lines))
+            lines = [ line for line in lines if line ]
+            lines.sort(key=key)
+
+            with tempfile.NamedTemporaryFile(mode="w", dir=temp_directory, delete=False, buffering=buffer_size) as temp_file:
+                temp_file.writelines("{}\n".format(line) for line in lines)
+                metrics.count("sort_runs")
+                metrics.count("sort_run_rows", len(lines))
+                metrics.count("sort_run_bytes", temp_file.tell())
+                return temp_file.name
+
+    # Run of the merge of the runs, for the passes before the last one
+    @classmethod
+    def _merge_temp_files(cls, temp_directory, temp_files, key=None, buffer_size=-1):
+        if len(temp_files) == 1:
+            return temp_files[0]
 
-        with tempfile.NamedTemporaryFile(mode="w", dir=temp_directory, delete=False) as temp_file:
-            for line in sorted(data, key=key):
-                temp_file.write("{}\n".format(line))
+        with tempfile.NamedTemporaryFile(mode="w", dir=temp_directory, delete=False, buffering=buffer_size) as temp_file:
+            cls.__merge(temp_file, temp_files, key, buffer_size)
             return temp_file.name
 
+    # Lines of the runs written in order, the runs are removed once merged
     @classmethod
-    def _generate_sorted_file_by_temp_files(cls, output_filepath, temp_files, key=None):
+    def __merge(cls, fw, temp_files, key, buffer_size):
         key = key if key else lambda line : line
+        file_handles = [ open(temp_file, "r", buffering=buffer_size) for temp_file in temp_files ]
 
-        with open(output_filepath, "a") as fw:
-            file_handles = [ open(temp_file, "r") for temp_file in temp_files ]
-
-            queue = []
-
-            for idx, fr in enumerate(file_handles):
-                line = fr.readline().strip()
-                if line:
-                    heapq.heappush(queue, (key(line), idx, line))
-
-            while len(queue) > 0:
-                _, idx, line = heapq.heappop(queue)
+        rows = 0
+        try:
+            for _, _, line in heapq.merge(*[ cls.__iter_run(fr, key, idx) for idx, fr in enumerate(file_handles) ]):
                 fw.write("{}\n".format(line))
-
-                line = file_handles[idx].readline().strip()
-                if line:
-                    heapq.heappush(queue, (key(line), idx, line))
-
+                rows += 1
+        finally:
             for fr in file_handles:
                 fr.close()
 
-        return output_filepath
+        for temp_file in temp_files:
+            os.remove(temp_file)
+        return rows
+
+    # (key, run, line) of the lines of a run, the equal keys are merged in the order of the runs
+    @staticmethod
+    def __iter_run(fr, key, idx):
+        for line in fr:
+            line = line.rstrip("\n")
+            yield key(line), idx, line
@@ -0,0 +1,78 @@
+import os
+import json
+
+from collections import OrderedDict
+
+# Files of the output of a node written sorted, with the key they are sorted by
+# Written in <output path>.sorted.json, the nodes sorting their inputs by the same key use them as they are
+class SortedOutput:
+
+    EXTENSION = ".sorted.json"
+
+    def __init__(self):
+        self.__files = OrderedDict()
+
+    # columns: positions of the fields of the key starting at 1, as the key of the components
+    # The lines are sorted by the fields of the columns joined by the delimiter, the header is not sorted
+    def add(self, filepath, columns, delimiter, has_header):
+        self.__files[os.path.normpath(filepath)] = OrderedDict([
+            ("columns", list(columns)),
+            ("delimiter", delimiter),
+            ("header", bool(has_header))
+        ])
+
+    @classmethod
+    def get_sorted_file(cls, path):
+        return os.path.normpath(path) + cls.EXTENSION
+
+    # The size and the modification time of the files are kept, a file changed later is not sorted anymore
+    # Written to a temporary file first, as the listing, nothing is written without sorted files
+    def write(self, path):
+        if len(self.__files) == 0:
+            return
+
+        files = OrderedDict()
+        for filepath, sort in self.__files.items():
+            stat = os.stat(filepath)
+            sort = OrderedDict(sort)
+            sort["size"] = stat.st_size
+            sort["mtime_ns"] = stat.st_mtime_ns
+            files[os.path.relpath(filepath, path)] = sort
+
+        sorted_file = self.get_sorted_file(path)
+        tmp_sorted_file = "{}.{}.tmp".format(sorted_file, os.getpid())
+        with open(tmp_sorted_file, "w") as fw:
+            json.dump({ "files" : files }, fw, indent=4)
+        os.replace(tmp_sorted_file, sorted_file)
+
+    @classmethod
+    def remove(cls, path):
+        try:
+            os.remove(cls.get_sorted_file(path))
+        except OSError:
+            pass
+
+    # If the file of one of the paths, the inputs of a node, was written sorted by the key
+    @classmethod
+    def is_sorted(cls, filepath, paths, columns, delimiter, has_header):
+        filepath = os.path.normpath(filepath)
+        for path in paths:
+            relpath = os.path.relpath(filepath, os.path.normpath(path))
+            if relpath == os.pardir or relpath.startswith(os.pardir + os.sep):
+                continue
+
+            try:
+                with open(cls.get_sorted_file(path), "r") as fr:
+                    sort = json.load(fr).get("files", {}).get(relpath)
+                stat = os.stat(filepath)
+            except (OSError, ValueError):
+                return False
+
+            return sort is not None \
+                and sort["columns"] == list(columns) \
+                and sort["delimiter"] == delimiter \
+                and sort["header"] == bool(has_header) \
+                and sort["size"] == stat.st_size \
+                and sort["mtime_ns"] == stat.st_mtime_ns
+
+        return False
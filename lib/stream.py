@@ -0,0 +1,79 @@
+import os
+import stat
+
+# Stream of files through a named pipe (FIFO) between two nodes running at the same time
+# Many files can go through the same stream, each one starts with a marker line with its name
+# The marker starts with a NUL character that is not expected in the text files
+MARKER = "\x00"
+
+def is_stream(path):
+    return os.path.exists(path) and stat.S_ISFIFO(os.stat(path).st_mode)
+
+class StreamWriter:
+
+    def __init__(self, path):
+        self.__path = path
+        self.__stream = None
+
+    # Blocks until the consumer opens the stream
+    def open(self):
+        if self.__stream is None:
+            self.__stream = open(self.__path, "w")
+        return self
+
+    def open_file(self, name):
+        self.open()
+        self.__stream.write("{}{}\n".format(MARKER, name))
+        return StreamFile(self.__stream)
+
+    # Closing the stream is the end of data for the consumer
+    def close(self):
+        self.open()
+        self.__stream.close()
+
+# File-like object of one file inside a stream, closing it does not close the stream
+class StreamFile:
+
+    def __init__(self, stream):
+        self.__stream = stream
+
+    def write(self, data):
+        return self.__stream.write(data)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+class StreamReader:
+
+    def __init__(self, path):
+        self.__path = path
+        self.__next_marker = None
+
+    # Yields (name, lines) of every file of the stream, the lines are consumed in order
+    def __iter__(self):
+        with open(self.__path, "r") as fr:
+            self.__next_marker = fr.readline()
+            while self.__next_marker:
+                if not self.__next_marker.startswith(MARKER):
+                    raise ImportError("Unexpected data in the stream {}".format(self.__path))
+                name = self.__next_marker[len(MARKER):].rstrip("\n")
+                self.__next_marker = None
+                lines = self.__read_lines(fr)
+                yield name, lines
+                # Skip the lines not consumed
+                for line in lines:
+                    pass
+
+    def __read_lines(self, fr):
+        for line in fr:
+            if line.startswith(MARKER):
+                self.__next_marker = line
+                return
+            yield line.strip()
+        self.__next_marker = ""
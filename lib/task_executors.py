@@ -0,0 +1,41 @@
+import threading
+
+import concurrent.futures
+
+# Executors for the tasks of the components besides the pools of concurrent.futures
+
+# Tasks executed by the thread submitting them, nothing to start, fork or pickle
+# The futures are already done when they are returned
+class InlineExecutor(concurrent.futures.Executor):
+
+    def submit(self, function, *args, **kwargs):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+# Executor created by the first task, a component without tasks does not start a pool
+class LazyExecutor(concurrent.futures.Executor):
+
+    # create_executor: function returning the executor
+    def __init__(self, create_executor):
+        self.__create_executor = create_executor
+        self.__executor = None
+        self.__lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        if self.__executor is None:
+            with self.__lock:
+                if self.__executor is None:
+                    self.__executor = self.__create_executor()
+        return self.__executor.submit(function, *args, **kwargs)
+
+    def is_started(self):
+        return self.__executor is not None
+
+    def shutdown(self, wait=True):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=wait)
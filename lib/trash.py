@@ -0,0 +1,83 @@
+import os
+import time
+import shutil
+import itertools
+import threading
+
+# Folders to delete moved aside with a rename, the deletion is done later by a background thread
+# The trash must be in the same filesystem as the folders, execution/.trash for the outputs of the nodes
+class Trash:
+
+    # Seconds between the passes of the background thread
+    INTERVAL = 1
+
+    __counter = itertools.count()
+
+    def __init__(self, path):
+        self.__path = path
+        self.__thread = None
+        self.__stopped = threading.Event()
+
+        if not os.path.exists(self.__path):
+            os.makedirs(self.__path, exist_ok=True)
+
+    def get_path(self):
+        return self.__path
+
+    # The path is not found anymore when the method returns, deleted now only if it can not be renamed
+    def move(self, path):
+        if not os.path.lexists(path):
+            return
+        trash_path = os.path.join(self.__path, "{}_{}_{}_{}".format(
+            os.path.basename(os.path.normpath(path)), int(time.time()), os.getpid(), next(self.__counter)
+        ))
+        try:
+            os.rename(path, trash_path)
+        except OSError:
+            # Other filesystem
+            self.__remove(path)
+
+    # Deletes the folders in the trash, other processes can be emptying it at the same time
+    def empty(self):
+        try:
+            entries = os.listdir(self.__path)
+        except OSError:
+            return
+        for entry in entries:
+            self.__remove(os.path.join(self.__path, entry))
+
+    @staticmethod
+    def __remove(path):
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    # Background thread emptying the trash until stop
+    # Daemon thread, what is not deleted when the process ends is deleted by the next one
+    def start(self):
+        if self.__thread is not None:
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    # wait: until the last pass of the thread ends
+    def stop(self, wait=False):
+        if self.__thread is None:
+            return
+        self.__stopped.set()
+        if wait:
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        while True:
+            self.empty()
+            if self.__stopped.wait(self.INTERVAL):
+                self.empty()
+                return
@@ -7,9 +7,16 @@ import random
 import string
 import re
 import time
+import signal
 
-from logging.config import fileConfig
-from multiprocessing import Process, Manager
+from collections import OrderedDict
+
+######################## LOGGING
+
+# logging.config imports sockets, threads and pickle, only the processes configuring the logging from a file pay them
+def fileConfig(*args, **kwargs):
+    import logging.config
+    return logging.config.fileConfig(*args, **kwargs)
 
 ######################## PRINTING
 
@@ -19,6 +26,19 @@ def progress_bar(current, total, prefix="Progress", fill="█", length=40):
     bar = fill * filled_length + '-' * (length - filled_length)
     return "{}: {} {}%".format(prefix, bar, percent)
 
+######################## SIGNALS
+
+# SIGTERM and SIGHUP stop the process as Ctrl+C does, so the running nodes are cancelled and waited
+# The next ones are ignored, they would stop the cancellation
+def _interrupt(signum, frame):
+    for sig in [signal.SIGTERM, signal.SIGHUP]:
+        signal.signal(sig, signal.SIG_IGN)
+    raise KeyboardInterrupt()
+
+def handle_termination_signals():
+    for sig in [signal.SIGTERM, signal.SIGHUP]:
+        signal.signal(sig, _interrupt)
+
 ######################## DATES
 
 # Given a date convert into string formatted
@@ -65,14 +85,47 @@ def json_raise_on_duplicates(key_value_pairs, not_check=[], dictionary_type=dict
     
     return registered_keys
 
+# Replace the {word} values of the strings by the mapping values, unknown words are kept
+def json_custom_process(key_value_pairs, mapping_values):
+
+    mapped_key_value_pairs = [ 
+        (
+            key, ( lambda function: function(function, value) )(
+                lambda self, parameter: re.sub(
+                    # {word} pattern
+                    "\\{(\\w+)\\}",
+                    lambda ocurrence : str(mapping_values.get(ocurrence.group(1), ocurrence.group(0))),
+                    parameter
+                ) 
+                if isinstance(parameter, str) 
+                else [ self(self, element) for element in parameter ] if isinstance(parameter, list) 
+                else parameter
+            )
+        )
+        for key, value 
+        in key_value_pairs 
+    ]
+
+    registered_keys = json_raise_on_duplicates(mapped_key_value_pairs, [
+        # Reservation for comments, not check, for example "__comment"
+        lambda key : key.startswith("__")
+    ], OrderedDict)
+
+    return registered_keys
+
 ######################## ASYNC
 
 class FileWriter(object):
 
-    __queue = Manager().Queue()
+    # Started by the first writer, importing utils does not import multiprocessing nor start the manager process
+    __manager = None
+    __queue = None
 
     def __init__(self, mode="a"):
+        from multiprocessing import Process
+
         self.__mode = mode
+        self.__get_queue()
         self.__process = Process(target=self.__process_queue)
         self.__process.start()
 
@@ -99,9 +152,17 @@ class FileWriter(object):
         self.__queue.put((None, None))
         self.__process.join()
 
+    @classmethod
+    def __get_queue(cls):
+        if cls.__queue is None:
+            from multiprocessing import Manager
+            cls.__manager = Manager()
+            cls.__queue = cls.__manager.Queue()
+        return cls.__queue
+
     @classmethod
     def write(cls, filepath, line):
-        cls.__queue.put((filepath, line))
+        cls.__get_queue().put((filepath, line))
             
 ######################## PROGRAM ENTITIES
 
@@ -2,6 +2,8 @@
 # Executed with Python 3.4.10
 import os
 import json
+import time
+import signal
 import argparse
 import subprocess
 import functools
@@ -9,9 +11,23 @@ import functools
 import concurrent.futures
 
 from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
 
 from lib.utils import * 
 from lib.directed_graph import DirectedGraph
+from lib import component_runner
+from lib.scheduler import CriticalPathScheduler
+from lib.cpu_tokens import CPUTokens
+from lib.node_cache import NodeCache
+from lib.run_manifest import RunManifest
+from lib.flow_trace import FlowTrace
+from lib.flow_plan import FlowPlan
+from lib.log_writer import LogWriter, QueueLogHandler
+from lib.trash import Trash
+from lib.execution_lock import ExecutionLock
+from lib.component_metrics import ComponentMetrics
+from lib.executor_backend import create_backend
+from lib.remote_executor import RemoteExecutor
 
 class DataProcessExecutor:
 
@@ -20,15 +36,50 @@ class DataProcessExecutor:
 
         file_basename, file_extension = os.path.splitext(os.path.basename(os.path.normpath(self.__args["file"])))
         self.__id = "_".join([file_basename, self.__args["id"]])
+        # Resumed executions keep the id, so the outputs of the completed nodes are reused
+        if self.__args.get("resume"):
+            self.__id = self.__args["resume"]
 
         self._BASE_PATH = os.path.abspath(os.path.dirname(os.path.realpath(__file__)))
         self._LOG_PATH = os.path.join(self._BASE_PATH, "log")
+        self._EXECUTION_PATH = os.path.join(self._BASE_PATH, "execution")
+        # Durations of the nodes in previous executions of the same flow file
+        self._DURATIONS_FILE = os.path.join(self._LOG_PATH, file_basename + "_durations.json")
 
         create_if_not_exists_folders([
             self._LOG_PATH
         ])
 
-        self.__config = self.__load_config(self.__args["file"])
+        # Validated once per version of the flow file, the components read only the file of their node
+        self.__plan = FlowPlan(os.path.join(self._EXECUTION_PATH, ".plans"), self.__args["file"])
+        self.__config = self.__plan.get_config()
+        # subprocess: each node in a new interpreter, inprocess: each node inside a pre-started worker
+        self.__config["EXECUTION_MODE"] = self.__args.get("execution_mode") or self.__config.get("EXECUTION_MODE", "subprocess")
+        # CPU tokens shared by the flow pool and the pools of the components, a node takes its "cpu" tokens (default 1)
+        # At least WORKERS by default, so the budget does not limit the nodes without "cpu" below WORKERS
+        self.__config["CPU_BUDGET"] = self.__config.get("CPU_BUDGET", max(self.__config["WORKERS"], os.cpu_count()))
+        # Reuse the outputs of the nodes with the same config, component and inputs, can be overwritted by node "cache"
+        self.__config["CACHE"] = self.__config.get("CACHE", False)
+        # stat: size and modification time of the input files, content: hash of the input files
+        self.__config["CACHE_FINGERPRINT"] = self.__config.get("CACHE_FINGERPRINT", "stat")
+        # Seconds for the running nodes to stop after SIGTERM when the flow is cancelled, then SIGKILL
+        self.__config["CANCEL_TIMEOUT"] = self.__config.get("CANCEL_TIMEOUT", 10)
+        # local: pool of processes in this host, remote: agents connected to REMOTE_ADDRESS (agent.py)
+        self.__config["BACKEND"] = self.__args.get("backend") or self.__config.get("BACKEND", "local")
+        self.__config["REMOTE_ADDRESS"] = self.__config.get("REMOTE_ADDRESS", "127.0.0.1:50000")
+        # Secret shared with the agents, the flow or the environment must give it, there is no default one
+        self.__config["REMOTE_AUTHKEY"] = self.__config.get("REMOTE_AUTHKEY", os.environ.get(RemoteExecutor.ENVIRONMENT_VARIABLE))
+        if self.__config["BACKEND"] == "remote" and not self.__config["REMOTE_AUTHKEY"]:
+            raise ImportError("REMOTE_AUTHKEY not declared in the flow or in {}, required by the remote backend".format(RemoteExecutor.ENVIRONMENT_VARIABLE))
+        # Seconds without heartbeat for an agent to be lost, its running nodes fail
+        self.__config["REMOTE_LEASE"] = self.__config.get("REMOTE_LEASE", 30)
+        # Records written also as JSON lines in log/<id>.jsonl, by the flow and its components
+        # Given to the components by their arguments, the flows of a batch can have different ones
+        self.__config["STRUCTURED_LOG"] = self.__config.get("STRUCTURED_LOG")
+        # Executions of any flow not modified in the last days are deleted when a flow starts, None keeps all of them
+        self.__config["EXECUTION_RETENTION_DAYS"] = self.__config.get("EXECUTION_RETENTION_DAYS")
+        # Same for the cache entries not used in the last days, by default the retention of the executions
+        self.__config["CACHE_RETENTION_DAYS"] = self.__config.get("CACHE_RETENTION_DAYS", self.__config["EXECUTION_RETENTION_DAYS"])
         self.__component_paths = self.__check_component_paths()
 
         self._logger = self.__get_logger(os.path.join(self._LOG_PATH, self.__id + ".log"))
@@ -37,7 +88,7 @@ class DataProcessExecutor:
         self.__graph = self.__create_graph(self.__config)
 
         self.log_info("Flow Initialized")
-        self.log_info(str(self.__graph))
+        self.__log_graph()
 
     def log_info(self, message):
         self._logger.info("{} ~> {}".format(self.__id, message))
@@ -51,20 +102,40 @@ class DataProcessExecutor:
     def log_exception(self, message):
         self._logger.exception("{} ~> {}".format(self.__id, message))
 
+    # The graph is rendered only if it is shown, the table grows with nodes x nodes
+    # --show-graph: at INFO in the given format, otherwise the table at DEBUG
+    def __log_graph(self):
+        graph_format = self.__args.get("show_graph")
+        if graph_format is None:
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self.log_debug(str(self.__graph))
+            return
+
+        if graph_format == "dot":
+            self.log_info("\n" + self.__graph.to_dot(self.__id, {
+                node : "{}\n{}".format(node, parameters.get("name", ""))
+                for node, parameters
+                in self.__config["nodes"].items()
+            }))
+        elif graph_format == "adjacency":
+            self.log_info("\n" + self.__graph.to_adjacency())
+        else:
+            self.log_info(str(self.__graph))
+
     def __get_logger(self, log_file):
         logger_key = "flow"
         fileConfig(
             os.path.join(self._BASE_PATH, "config", "logging.ini"),
-            defaults={'LOG_FILE' : log_file}
+            defaults={'LOG_FILE' : log_file},
+            disable_existing_loggers=False
         )
-        return logging.getLogger(logger_key)
-
-    def __load_config(self, config_file):
-        with open(config_file, "r") as fread:
-            return json.load(fread, object_pairs_hook=lambda dictionary : json_raise_on_duplicates(dictionary, [
-                # Reservation for comments, not check, for example "__comment"
-                lambda key : key.startswith("__")
-            ], OrderedDict))
+        # One logger per execution with its own handlers, many flows can be executed in the same process
+        # Not a child of the configured logger, fileConfig would remove its handlers
+        logger = logging.getLogger("{}_{}".format(logger_key, self.__id))
+        # Written by the background writer of the execution
+        logger.handlers = [ QueueLogHandler(LogWriter.get_writer(log_file, list(logging.getLogger(logger_key).handlers), self.__config["STRUCTURED_LOG"])) ]
+        logger.propagate = False
+        return logger
 
     def __check_component_paths(self):
         component_paths = {}
@@ -84,14 +155,52 @@ class DataProcessExecutor:
         for key, value in config["nodes"].items():
             graph.add_node(key, value)
 
-        for destination, origins in config["dependencies"].items():
+        # Streams between the nodes, origin -> destination
+        self.__streams = self.__plan.get_streams()
+
+        for destination, origins in self.__plan.get_dependencies().items():
             for origin in origins:
                 graph.add_edge(origin, destination)
 
         return graph
 
+    def __get_stream_path(self, origin):
+        return os.path.join(self._EXECUTION_PATH, self.__id, ".stream", "{}_{}".format(origin, self.__streams[origin]))
+
+    def __is_streamed(self, node):
+        return node in self.__streams or any(
+            self.__streams.get(origin) == node
+            for origin
+            in self.__graph.get_reversed_edge(node)
+        )
+
+    def __create_streams(self):
+        for origin in self.__streams:
+            stream_path = self.__get_stream_path(origin)
+            create_if_not_exists_folders([os.path.dirname(stream_path)])
+            if os.path.exists(stream_path):
+                os.unlink(stream_path)
+            os.mkfifo(stream_path)
+
+    # A finished node unblocks the other side of its streams, if it is still waiting to open them
+    def __release_streams(self, node):
+        stream_paths = []
+        if node in self.__streams:
+            stream_paths.append((self.__get_stream_path(node), os.O_WRONLY))
+        for origin in self.__graph.get_reversed_edge(node):
+            if self.__streams.get(origin) == node:
+                stream_paths.append((self.__get_stream_path(origin), os.O_RDONLY))
+
+        for stream_path, flags in stream_paths:
+            try:
+                os.close(os.open(stream_path, flags | os.O_NONBLOCK))
+            except OSError:
+                # Nobody waiting on the other side
+                pass
+
     def __generate_commands(self):
         self.__component_commands = {}
+        self.__component_parameters = {}
         
         max_node_length = 0
 
@@ -116,6 +225,18 @@ class DataProcessExecutor:
             command.append(self.__id)
             command.append("-f")
             command.append(self.__args["file"])
+            command.append("-n")
+            command.append(self.__plan.get_node_file(node))
+
+            if node in self.__streams:
+                command.append("-s")
+                command.append(self.__get_stream_path(node))
+
+            if self.__config["STRUCTURED_LOG"] is not None:
+                command.append("-l")
+                command.append(self.__config["STRUCTURED_LOG"])
+
+            inputs = []
 
             for dependency in self.__graph.get_reversed_edge(node):
                 dependency_parameters = self.__config["nodes"][dependency]
@@ -123,18 +244,69 @@ class DataProcessExecutor:
                 if "name" not in dependency_parameters:
                     raise ImportError("Parameter {} not declared for the component {}".format("name", node))
 
+                if self.__streams.get(dependency) == node:
+                    inputs.append(self.__get_stream_path(dependency))
+                else:
+                    inputs.append(self.__get_output_path(dependency))
                 command.append("-i")
-                command.append(os.path.join(self._BASE_PATH, "execution", self.__id, "_".join([dependency, dependency_parameters["name"]])))
+                command.append(inputs[-1])
 
             self.__component_commands[node] = " ".join(command)
+            # Same arguments as the command, used to run the component inside the workers
+            self.__component_parameters[node] = {
+                "script" : self.__component_paths[parameters["script"]],
+                "component_id" : node,
+                "id" : self.__id,
+                "flow" : self.__args["file"],
+                "input" : inputs,
+                "stream" : self.__get_stream_path(node) if node in self.__streams else None,
+                "structured_log" : self.__config["STRUCTURED_LOG"],
+                "node" : parameters
+            }
     
         for node, command in sorted(self.__component_commands.items()):
             self.log_info("Command --> {}: {}".format(node.ljust(max_node_length), command))
 
-    def __check(self):
-        # If has cycles, the flow will never end
-        if self.__graph.has_cycle():
-            raise ImportError("The flow has cycles so the process will never end")
+    def __get_output_path(self, node):
+        return os.path.join(self._EXECUTION_PATH, self.__id, "_".join([node, self.__config["nodes"][node]["name"]]))
+
+    # Nodes depending on the time of the execution always run, streamed data is not stored
+    def __is_cacheable(self, node):
+        return (
+            self.__config["nodes"][node].get("cache", self.__config["CACHE"]) and
+            not self.__is_streamed(node) and
+            "{time_now_" not in json.dumps(self.__config["nodes"][node])
+        )
+
+    def __get_cache_key(self, node):
+        # Values of the execution that do not change between executions
+        node_info = json.loads(json.dumps(self.__config["nodes"][node]), object_pairs_hook=lambda dictionary : json_custom_process(dictionary, {
+            "flow_path" : self.__args["file"],
+            "base_path" : self._BASE_PATH,
+            "log_path" : self._LOG_PATH,
+            "current_path" : os.getcwd()
+        }))
+
+        # Paths in the config are inputs too, for example copy_files.py "path"
+        config_paths = sorted(set(
+            value
+            for value
+            in flatten(node_info.get("config", {}))
+            if isinstance(value, str) and os.sep in value and os.path.exists(value)
+        ))
+
+        return self.__node_cache.get_key(
+            node_info,
+            self.__component_parameters[node]["script"],
+            self.__component_parameters[node]["input"] + config_paths
+        )
+
+    def _check(self):
+        # Cycles and streams are checked when the plan is compiled
+
+        # The named pipes of the streams are not shared between hosts
+        if self.__config["BACKEND"] != "local" and len(self.__streams) > 0:
+            raise ImportError("Streams are only supported by the local backend")
 
         # No need check, the results can be executed in parallel without being one only flow
         # if self.__graph.is_connected_undirected():
@@ -142,51 +314,535 @@ class DataProcessExecutor:
 
         return True
 
+    @staticmethod
+    def _create_executor(execution_mode, max_workers, script_paths, backend="local", config={}):
+        return create_backend(backend, execution_mode, max_workers, script_paths, config)
+
+    def _get_id(self):
+        return self.__id
+
+    def _get_execution_mode(self):
+        return self.__config["EXECUTION_MODE"]
+
+    def _get_backend(self):
+        return self.__config["BACKEND"]
+
+    def _get_workers(self):
+        return self.__config["WORKERS"]
+
+    # Destinations of the streams run at the same time as their origins, out of the WORKERS
+    def _get_executor_size(self):
+        return self.__config["WORKERS"] + len(self.__streams)
+
+    def _get_script_paths(self):
+        return [
+            self.__component_paths[parameters["script"]]
+            for parameters
+            in self.__config["nodes"].values()
+            if parameters.get("script") in self.__component_paths
+        ]
+
+    def _set_executor(self, executor):
+        self.__executor = executor
+
+    def __get_pid_path(self, node):
+        return os.path.join(self._EXECUTION_PATH, self.__id, ".pids", node)
+
+    # The cache key hashes the inputs, it is computed by other thread and the node is executed when it is done
+    def __submit(self, node):
+        if self.__is_cacheable(node):
+            cache_key_task = self.__cache_key_executor.submit(self.__get_cache_key, node)
+            self.__cache_key_tasks.add(cache_key_task)
+            self.__running_components[cache_key_task] = node
+            return
+        self.__execute(node)
+
+    def __execute(self, node):
+        if node in self.__cache_keys and self.__node_cache.contains(self.__cache_keys[node]):
+            self.log_info("Component {} restored from cache {}".format(node, self.__cache_keys[node]))
+            self.__node_cache.restore(self.__cache_keys[node], self.__get_output_path(node))
+            self.__cached_nodes.add(node)
+            component_task = concurrent.futures.Future()
+            component_task.set_result(component_runner.get_result(0, time.time(), time.time()))
+            self.__running_components[component_task] = node
+            return
+
+        self.log_info("Component {} called".format(node))
+        if os.path.exists(self.__get_pid_path(node)):
+            os.unlink(self.__get_pid_path(node))
+        # Backends metering the CPU of their hosts take the "cpu" of the node
+        submit_options = { "cpu" : self.__get_node_cpu(node) } if self.__is_metered_by_backend() else {}
+        if self.__config["EXECUTION_MODE"] == "inprocess":
+            parameters = dict(self.__component_parameters[node], pid_file=self.__get_pid_path(node))
+            component_task = self.__executor.submit(component_runner.run_component, parameters, **submit_options)
+        else:
+            component_task = self.__executor.submit(component_runner.run_command, self.__component_commands[node], self.__get_pid_path(node), **submit_options)
+        self.__running_components[component_task] = node
+        self.__start_times[node] = time.time()
+        self.__trace.set_submitted(node)
+        self.__manifest.set_status(node, RunManifest.RUNNING, self.__signatures[node])
+
+        # The destination of the stream reads while this node writes, so it starts now
+        if node in self.__streams:
+            destination = self.__streams[node]
+            self.__components_waiting_to_be_executed[destination][node] = True
+            self.__node_cpu_tokens[destination] = self.__cpu_tokens.acquire(self.__get_cpu(destination), partial=True)
+            self.__submit(destination)
+
+    def __get_node_cpu(self, node):
+        return int(self.__config["nodes"][node].get("cpu", 1))
+
+    def __get_cpu(self, node):
+        return max(1, min(self.__get_node_cpu(node), self.__cpu_tokens.get_size()))
+
+    # Nodes in other hosts take the CPU tokens of their hosts, not the ones of this flow, see RemoteAgent
+    def __is_metered_by_backend(self):
+        return getattr(self.__executor, "CPU_METERED", False)
+
+    def _can_submit(self):
+        return not self.__cancelled and len(self.__ready_components) > 0 and len(self.__running_components) < self.__config["WORKERS"]
+
+    # Submits the highest ranked node, it waits until enough CPU tokens are released
+    def _submit_next(self):
+        node = self.__ready_components.peek()
+        tokens = []
+        if not self.__is_metered_by_backend():
+            tokens = self.__cpu_tokens.acquire(self.__get_cpu(node))
+            if len(tokens) == 0:
+                return False
+        self.__node_cpu_tokens[node] = tokens
+        try:
+            self.__submit(node)
+        except BrokenProcessPool:
+            CPUTokens.release(self.__node_cpu_tokens.pop(node, []))
+            raise
+        self.__ready_components.pop()
+        return True
+
+    def __submit_ready_components(self):
+        while self._can_submit() and self._submit_next():
+            pass
+
     def run(self):
         if not self.__args["show_command"]:
-            if self.__check():
-                self.__executed_nodes = { node : False for node in self.__config["nodes"] }
-                self.__components_waiting_to_be_executed = {}
-
-                self.log_info("Start Flow")
-                self.__generate_commands()
-
-                self.__executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.__config["WORKERS"])
-
-                for node in self.__config["nodes"]:
-                    if len(self.__graph.get_reversed_edge(node)) == 0:
-                        self.log_info("Component {} called".format(node))
-                        component_task = self.__executor.submit(subprocess.call, self.__component_commands[node], shell=True)
-                        component_task.add_done_callback(functools.partial(self._on_component_finished, node))
-                    else:
-                        self.__components_waiting_to_be_executed[node] = { edge : False for edge in self.__graph.get_reversed_edge(node) }
+            if self._check():
+                self._prepare()
+                self._set_executor(self._create_executor(
+                    self._get_execution_mode(),
+                    self._get_executor_size(),
+                    self._get_script_paths(),
+                    self.__config["BACKEND"],
+                    self.__config
+                ))
+
+                # Results are handled on this thread, an exception raised here stops the flow
+                try:
+                    self.__submit_ready_components()
+                    while self._is_pending():
+                        if len(self.__running_components) == 0:
+                            # CPU tokens are taken outside of this flow
+                            time.sleep(0.1)
+                            self.__submit_ready_components()
+                            continue
+                        # While cancelling, the signals are sent again until every node is stopped
+                        done, not_done = concurrent.futures.wait(
+                            self.__running_components,
+                            timeout=0.1 if self.__cancelled else None,
+                            return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        for future in done:
+                            self._on_future_done(future)
+                        self._signal_cancelled_components()
+                        self.__submit_ready_components()
+                except KeyboardInterrupt:
+                    self.log_error("Flow interrupted")
+                    self._cancel()
+                    raise
+                finally:
+                    self.__executor.shutdown(wait=True)
+                    returncode = self._finish()
+
+                return returncode
             else:
                 raise RuntimeError("Flow check failed")
         else: 
             self.__generate_commands()
+            return 0
+
+    # State of the execution, cpu_tokens: shared with other flows, otherwise the flow creates its own
+    def _prepare(self, cpu_tokens=None):
+        self.__executed_nodes = { node : False for node in self.__config["nodes"] }
+        self.__components_waiting_to_be_executed = {}
+        self.__ready_components = CriticalPathScheduler(self.__graph, CriticalPathScheduler.load_durations(self._DURATIONS_FILE))
+        self.__running_components = {}
+        self.__start_times = {}
+        self.__durations = {}
+        self.__node_cpu_tokens = {}
+        self.__cache_keys = {}
+        self.__cached_nodes = set()
+        self.__cache_key_tasks = set()
+        # future -> node, outputs linked into the cache after the node finished
+        self.__cache_store_tasks = {}
+        # Same size as the flow pool, the nodes computing the key count as running, also stores the outputs
+        self.__cache_key_executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.__config["WORKERS"])
+        self.__failed_nodes = []
+        self.__cancelled = False
+        self.__cancel_signals = {}
+        self.__cancel_groups = {}
+        # Previous outputs of the nodes are deleted in background while the flow runs
+        self.__trash = Trash(os.path.join(self._EXECUTION_PATH, ".trash"))
+        self.__trash.start()
+        self.__node_cache = NodeCache(
+            os.path.join(self._EXECUTION_PATH, ".cache"),
+            os.path.join(self._BASE_PATH, "lib"),
+            self.__config["CACHE_FINGERPRINT"],
+            self.__trash,
+            self.__config["CACHE_RETENTION_DAYS"]
+        )
+
+        self.__cpu_tokens = cpu_tokens
+        if self.__cpu_tokens is None:
+            self.__cpu_tokens = CPUTokens(os.path.join(self._EXECUTION_PATH, self.__id, ".cpu_tokens"), self.__config["CPU_BUDGET"])
+            # Inherited by the workers and the components
+            os.environ[CPUTokens.ENVIRONMENT_VARIABLE] = self.__cpu_tokens.get_path()
+
+        # Not collected by other flows while it runs
+        self.__execution_lock = ExecutionLock(os.path.join(self._EXECUTION_PATH, self.__id, ".lock"))
+        self.__execution_lock.acquire()
+
+        self.log_info("Start Flow")
+        self.__collect_executions()
+        collected_entries = self.__node_cache.collect()
+        if len(collected_entries) > 0:
+            self.log_info("Cache entries not used in {} days deleted: {}".format(self.__config["CACHE_RETENTION_DAYS"], len(collected_entries)))
+        self.__generate_commands()
+
+        self.__manifest = RunManifest(os.path.join(self._EXECUTION_PATH, self.__id, "manifest.json"), resume=bool(self.__args.get("resume")))
+        self.__manifest.set_flow(self.__args["file"], self.__id)
+        reused_nodes = self.__get_reused_nodes()
+        selected_nodes = self.__get_selected_nodes()
+        if selected_nodes is not None:
+            # The selected nodes are executed again, the outputs of the others are reused by them
+            reused_nodes = set(node for node in self.__config["nodes"] if node not in selected_nodes)
+
+        self.__trace = FlowTrace(self.__id, self.__config["WORKERS"])
+        self.__create_streams()
+        create_if_not_exists_folders([os.path.dirname(self.__get_pid_path(""))])
+
+        for node in self.__config["nodes"]:
+            if node in reused_nodes:
+                self.__executed_nodes[node] = True
+                self.log_info("Component {} {}".format(node, "already completed" if selected_nodes is None else "not selected"))
+                continue
+            self.__components_waiting_to_be_executed[node] = { edge : edge in reused_nodes for edge in self.__graph.get_reversed_edge(node) }
+            if all(self.__components_waiting_to_be_executed[node].values()):
+                self.__ready_components.push(node)
+                self.__trace.set_ready(node)
+
+        self.__flow_start_time = time.time()
+
+    def _is_pending(self):
+        return len(self.__running_components) > 0 or len(self.__ready_components) > 0
+
+    def _is_cancelled(self):
+        return self.__cancelled
+
+    def _get_running_components(self):
+        return self.__running_components
+
+    # Returns the future with the end of the node, None if the node is executed now after its cache key
+    def _on_future_done(self, future):
+        node = self.__running_components.pop(future)
+        if future in self.__cache_key_tasks and not future.cancelled() and future.exception() is None:
+            self.__cache_key_tasks.discard(future)
+            self.__cache_keys[node] = future.result()
+            future = concurrent.futures.Future()
+            if self.__cancelled:
+                # Not executed, the flow was cancelled while the key was computed
+                future.cancel()
+            else:
+                try:
+                    self.__execute(node)
+                    return None
+                except BrokenProcessPool as exception:
+                    future.set_exception(exception)
+        self.__cache_key_tasks.discard(future)
+        self._on_component_finished(node, future)
+        return future
+
+    # Trace of the execution and exit code of the flow
+    def _finish(self):
+        self.__cache_key_executor.shutdown(wait=True)
+        for cache_store_task, node in self.__cache_store_tasks.items():
+            if cache_store_task.exception() is not None:
+                # The node is executed again by the next flows
+                self.log_error("Component {} not stored in cache: {}".format(node, cache_store_task.exception()))
+        self.__execution_lock.release()
+        self.__trash.stop()
+        self.log_info("Trace: {}".format(self.__trace.export_chrome_trace(os.path.join(self._LOG_PATH, self.__id + "_trace.json"))))
+        self.log_info(self.__trace.get_summary())
+        self.__write_metrics()
+        # Also the durations of the nodes completed by a failed or cancelled flow
+        CriticalPathScheduler.save_durations(self._DURATIONS_FILE, self.__durations)
+
+        if all(self.__executed_nodes.values()):
+            self.log_info("End Flow")
+            self.__log_makespan(time.time() - self.__flow_start_time)
+            return 0
+
+        self.log_error("Flow failed, components failed: {}, not executed: {}".format(
+            ", ".join(self.__failed_nodes),
+            ", ".join(node for node, executed in self.__executed_nodes.items() if not executed and node not in self.__failed_nodes)
+        ))
+        return 1
+
+    # Metrics written by the components of the execution and their totals, log/<id>_metrics.json
+    def __write_metrics(self):
+        nodes = OrderedDict()
+        total = ComponentMetrics()
+        for node in self.__config["nodes"]:
+            metrics = ComponentMetrics.read(self.__get_output_path(node))
+            if metrics is not None:
+                nodes[node] = metrics
+                total.merge(metrics)
+
+        metrics_file = os.path.join(self._LOG_PATH, self.__id + "_metrics.json")
+        with open(metrics_file, "w") as fw:
+            json.dump(OrderedDict([ ("nodes", nodes), ("total", total.to_dict()) ]), fw, indent=4)
+        self.log_info("Metrics: {}, {}".format(metrics_file, ", ".join(
+            "{} {}".format(name, value)
+            for name, value
+            in total.to_dict()["counters"].items()
+        )))
+
+    # --target: the node and its ancestors, --from: the node and its descendants, --only: the node
+    # None without selection, all the nodes are executed
+    def __get_selected_nodes(self):
+        selection = next((selection for selection in ["target", "from", "only"] if self.__args.get(selection) is not None), None)
+        if selection is None:
+            return None
+
+        node = self.__args[selection]
+        if node not in self.__config["nodes"]:
+            raise ImportError("Component {} of --{} not found in the flow".format(node, selection))
+
+        selected_nodes = set([node])
+        if selection == "target":
+            selected_nodes.update(self.__graph.get_ancestors(node))
+        elif selection == "from":
+            selected_nodes.update(self.__graph.get_descendants(node))
+
+        # Streamed data is not stored, both sides of a stream are executed together
+        streamed_nodes = set()
+        while streamed_nodes != selected_nodes:
+            streamed_nodes = set(selected_nodes)
+            for origin, destination in self.__streams.items():
+                if origin in selected_nodes or destination in selected_nodes:
+                    selected_nodes.update([origin, destination])
+
+        # The inputs of the selected nodes from the other nodes are the outputs of a previous execution
+        for selected_node in selected_nodes:
+            for origin in self.__graph.get_reversed_edge(selected_node):
+                if origin not in selected_nodes and not os.path.exists(self.__get_output_path(origin)):
+                    raise ImportError("Component {} needs the output of {} that is not found in {}, use --resume with an execution that has it".format(
+                        selected_node, origin, os.path.join(self._EXECUTION_PATH, self.__id)
+                    ))
+
+        self.log_info("Components selected by --{} {}: {}".format(selection, node, ", ".join(sorted(selected_nodes))))
+        return selected_nodes
+
+    # Executions older than EXECUTION_RETENTION_DAYS moved to the trash, the running ones are skipped
+    # The running flows, batches and daemons hold their lock until they finish
+    def __collect_executions(self):
+        if self.__config["EXECUTION_RETENTION_DAYS"] is None:
+            return
+
+        limit = time.time() - self.__config["EXECUTION_RETENTION_DAYS"] * 24 * 3600
+        for execution_id in os.listdir(self._EXECUTION_PATH):
+            execution_path = os.path.join(self._EXECUTION_PATH, execution_id)
+            # Hidden folders are shared by the executions: plans, cache, trash and agents
+            if execution_id.startswith(".") or execution_id == self.__id or not os.path.isdir(execution_path):
+                continue
+            try:
+                modification_time = max([os.path.getmtime(execution_path)] + [
+                    os.path.getmtime(os.path.join(execution_path, filename))
+                    for filename
+                    in os.listdir(execution_path)
+                ])
+            except OSError:
+                # Collected at the same time by other flow
+                continue
+            if modification_time < limit and not ExecutionLock.is_locked(os.path.join(execution_path, ".lock")):
+                self.log_info("Execution {} older than {} days deleted".format(execution_id, self.__config["EXECUTION_RETENTION_DAYS"]))
+                self.__trash.move(execution_path)
+
+    # Stops the writer of the log of the execution, for the processes executing many flows
+    def _close_logger(self):
+        for handler in self._logger.handlers:
+            handler.close()
+
+    # Completed nodes of the resumed execution whose inputs are completed nodes too
+    def __get_reused_nodes(self):
+        self.__signatures = {
+            node : RunManifest.get_signature({
+                "node" : self.__config["nodes"][node],
+                "input" : self.__component_parameters[node]["input"]
+            })
+            for node
+            in self.__config["nodes"]
+        }
+        completed_nodes = self.__manifest.get_completed_nodes(self.__signatures)
+
+        reused_nodes = set()
+        for node in self.__graph.topological_sort():
+            if node in completed_nodes and all(edge in reused_nodes for edge in self.__graph.get_reversed_edge(node)):
+                reused_nodes.add(node)
+
+        # Streamed data is not stored, the origin runs again with its destination
+        for node in reversed(self.__graph.topological_sort()):
+            if node in self.__streams and self.__streams[node] not in reused_nodes:
+                reused_nodes.discard(node)
+
+        return reused_nodes
 
     def _on_component_finished(self, node, future):
-        if future.exception() is not None:
-            self.log_error("Component {} finished with result {}".format(node, future.result()))
-            self.log_error("{}".format(future.exception()))
-            raise RuntimeError("Component {} execution failed".format(node))
+        CPUTokens.release(self.__node_cpu_tokens.pop(node, []))
+        self.__release_streams(node)
+
+        if future.cancelled() or future.exception() is not None:
+            if not future.cancelled():
+                self.log_error("Component {} finished with exception".format(node))
+                self.log_error("{}".format(future.exception()))
+            self._on_component_failed(node)
+            return
         
         result = future.result()
-        self.log_info("Component {} finished with result {}".format(node, future.result()))
-        if result != 0:
-            raise RuntimeError("Component {} execution failed".format(node))
+        self.__trace.set_result(node, result)
+        # Backends in other hosts add the host of the node
+        self.log_info("Component {} finished with result {}{}".format(node, result["returncode"], " on {}".format(result["host"]) if "host" in result else ""))
+        if result["returncode"] != 0:
+            self._on_component_failed(node)
+            return
         self.__executed_nodes[node] = True
+        self.__manifest.set_status(node, RunManifest.COMPLETED, self.__signatures[node])
+
+        if node not in self.__cached_nodes:
+            self.__durations[node] = time.time() - self.__start_times[node]
+            if node in self.__cache_keys:
+                # Linking all the files of the output would delay the next nodes
+                cache_store_task = self.__cache_key_executor.submit(self.__node_cache.store, self.__cache_keys[node], self.__get_output_path(node))
+                self.__cache_store_tasks[cache_store_task] = node
 
         for edge in self.__graph.get_edge(node):
+            # Already started with this node, or not selected
+            if self.__streams.get(node) == edge or edge not in self.__components_waiting_to_be_executed:
+                continue
             self.__components_waiting_to_be_executed[edge][node] = True
             if all(self.__components_waiting_to_be_executed[edge].values()):
-                self.log_info("Component {} called".format(edge))
-                component_task = self.__executor.submit(subprocess.call, self.__component_commands[edge], shell=True)
-                component_task.add_done_callback(functools.partial(self._on_component_finished, edge))
+                self.__ready_components.push(edge)
+                self.__trace.set_ready(edge)
+
+    # Without keep_going the first failure cancels the flow, otherwise only its descendants are not executed
+    def _on_component_failed(self, node):
+        # Stopped by the cancellation, or by the pool broken by the cancellation
+        if self.__cancelled:
+            # Processes of the node that ignored SIGTERM
+            if node in self.__cancel_groups:
+                try:
+                    os.killpg(self.__cancel_groups.pop(node), signal.SIGKILL)
+                except OSError:
+                    pass
+            self.log_error("Component {} cancelled".format(node))
+            self.__manifest.set_status(node, RunManifest.CANCELLED, self.__signatures[node])
+            return
+
+        self.log_error("Component {} execution failed".format(node))
+        self.__failed_nodes.append(node)
+        self.__manifest.set_status(node, RunManifest.FAILED, self.__signatures[node])
+
+        if not self.__args.get("keep_going"):
+            self._cancel()
+
+    # Pending nodes are dropped and the running ones are terminated
+    def _cancel(self):
+        if self.__cancelled:
+            return
+        self.__cancelled = True
+        self.__cancel_time = time.time()
+
+        dropped_nodes = self.__ready_components.clear()
+        if len(dropped_nodes) > 0:
+            self.log_info("Components not executed: {}".format(", ".join(dropped_nodes)))
+
+        for future, node in list(self.__running_components.items()):
+            # Not started yet in the pool
+            if future.cancel():
+                self.__cancel_signals[node] = None
+                self._on_component_finished(self.__running_components.pop(future), future)
+
+        self._signal_cancelled_components()
+
+    # SIGTERM to the process group of every running node, SIGKILL after CANCEL_TIMEOUT
+    # The pid file is written when the node starts, the nodes without it are signalled later
+    def _signal_cancelled_components(self):
+        if not self.__cancelled:
+            return
+
+        expired = time.time() - self.__cancel_time >= self.__config["CANCEL_TIMEOUT"]
+        sig = signal.SIGKILL if expired else signal.SIGTERM
+
+        for future, node in list(self.__running_components.items()):
+            if self.__cancel_signals.get(node) in [sig, signal.SIGKILL]:
+                continue
+            # Computing its cache key, it is not executed after it
+            if future in self.__cache_key_tasks:
+                continue
+
+            # Nodes in other hosts are signalled by the backend
+            if hasattr(self.__executor, "signal_component"):
+                if not self.__executor.signal_component(future, sig):
+                    continue
+            elif not self.__signal_local_component(node, sig):
+                continue
+
+            self.log_info("Component {} cancelled with {}".format(node, "SIGKILL" if sig == signal.SIGKILL else "SIGTERM"))
+            self.__cancel_signals[node] = sig
+            # The other side of its streams is not going to be opened
+            self.__release_streams(node)
+
+    def __signal_local_component(self, node, sig):
+        try:
+            with open(self.__get_pid_path(node), "r") as fr:
+                pid = int(fr.read())
+        except (OSError, ValueError):
+            return False
+
+        try:
+            if os.getpgid(pid) == pid:
+                self.__cancel_groups[node] = pid
+                os.killpg(pid, sig)
+            else:
+                os.kill(pid, sig)
+        except OSError:
+            # Already finished
+            pass
+        return True
 
-        if all(self.__executed_nodes.values()):
-            self.log_info("End Flow")
-            self.__executor.shutdown(wait=True)
+    # Only the nodes executed, the ones reused, not selected or restored from the cache are not simulated
+    def __log_makespan(self, makespan):
+        executed_nodes = set(self.__start_times)
+        if self.__ready_components.is_weighted_by_time():
+            self.log_info("Makespan expected {:.3f}s, actual {:.3f}s (critical path {:.3f}s)".format(
+                self.__ready_components.get_expected_makespan(self.__config["WORKERS"], executed_nodes),
+                makespan,
+                self.__ready_components.get_critical_path_length(executed_nodes)
+            ))
+        else:
+            self.log_info("Makespan expected {} steps without durations history, actual {:.3f}s (critical path {} nodes)".format(
+                self.__ready_components.get_expected_makespan(self.__config["WORKERS"], executed_nodes),
+                makespan,
+                self.__ready_components.get_critical_path_length(executed_nodes)
+            ))
 
 def parse_arguments():
     # Create argument parser
@@ -197,9 +853,18 @@ def parse_arguments():
 
     # Optional arguments with parameter
     parser.add_argument("--id", type=str, help="Execution ID", action="append", default=[get_time(dateformat="%Y%m%d%H%M%S")])
+    parser.add_argument("--resume", type=str, help="Execution ID to resume, only the not completed nodes are executed")
+    parser.add_argument("--execution-mode", type=str, help="Overwrite EXECUTION_MODE of the flow", choices=["subprocess", "inprocess"])
+    parser.add_argument("--backend", type=str, help="Overwrite BACKEND of the flow", choices=["local", "remote"])
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument("--target", type=str, help="Execute only the component and the components it depends on")
+    selection.add_argument("--from", type=str, help="Execute only the component and the components depending on it, the others are reused from --resume")
+    selection.add_argument("--only", type=str, help="Execute only the component, its inputs are reused from --resume")
+    parser.add_argument("--show-graph", type=str, help="Show the graph of the flow, table is the default on DEBUG level", choices=["table", "dot", "adjacency"])
     
     # Optional arguments without parameter
     parser.add_argument("--show-command", help="Show the commands to execute the components", action="store_true")
+    parser.add_argument("--keep-going", help="Execute the components that do not depend on a failed component", action="store_true")
 
     # Others
     parser.add_argument("--version", help="Check Version", action="version", version='%(prog)s - Version 1.0')
@@ -212,8 +877,10 @@ def parse_arguments():
 
 if __name__ == '__main__': 
     args = parse_arguments()
+    # Stopped as with Ctrl+C, the nodes are cancelled before the process ends
+    handle_termination_signals()
     data_process = DataProcessExecutor(args)
-    data_process.run()
+    exit(data_process.run())
 
 
 